@@ -1,12 +1,51 @@
+import atexit
 import logging
+import os
 
 from flask import Flask
 from flask_socketio import SocketIO
 
-from application.data.game_manager import GameManager
-from application.data.word_manager import WordManager
+from application.data.board_generator import BoardQuality
+from application.data.dictionary_registry import DEFAULT_MAX_LOADED_DICTIONARIES, DICTIONARIES_FILE, DictionaryRegistry
+from application.data.game_manager import DEFAULT_IDLE_TTL_SECONDS, GameManager
+from application.data.game_snapshot import DEFAULT_SNAPSHOT_FILE_NAME
+from application.data.player_registry import PlayerRegistry
+from application.data.round_history import DEFAULT_HISTORY_FILE_NAME, RoundHistory
+from application.data.state_backend import RedisStateBackend
+from application.data.word_manager import WordManager  # noqa: F401
+from application.util.metrics import REGISTRY
+from application.util.rate_limiter import RateLimiter
+from application.util.startup_profile import StartupProfile
 
+DICTIONARIES_CONFIG_KEY = "dictionaries"
 GAME_MANAGER_CONFIG_KEY = "game_manager"
+PLAYER_REGISTRY_CONFIG_KEY = "player_registry"
+ROUND_HISTORY_CONFIG_KEY = "round_history"
+RATE_LIMITER_CONFIG_KEY = "rate_limiter"
+
+# When set, game state and SocketIO messages are shared through this Redis server so that several
+# workers can serve the same games
+REDIS_URL_ENV = "REDIS_URL"
+
+# The manifest of the dictionaries that games can choose from, and the most of them kept loaded at once
+DICTIONARIES_FILE_ENV = "DICTIONARIES_FILE"
+MAX_LOADED_DICTIONARIES_ENV = "MAX_LOADED_DICTIONARIES"
+
+# Where finished rounds are saved, defaults to the application's instance folder
+ROUND_HISTORY_PATH_ENV = "ROUND_HISTORY_PATH"
+
+# Where games are saved between restarts, defaults to the application's instance folder
+GAME_SNAPSHOT_PATH_ENV = "GAME_SNAPSHOT_PATH"
+
+# Overrides the limits on how often each session and room can send each SocketIO event, as a JSON object such
+# as {"guess": {"session": [10, 40]}} of rates per second and bursts
+RATE_LIMITS_ENV = "RATE_LIMITS"
+
+# When set, the application is created once in gunicorn's master process and shared by the workers it forks
+PRELOAD_APP_ENV = "PRELOAD_APP"
+
+# When set, the time taken and the memory used by each phase of the start up is logged
+STARTUP_PROFILE_ENV = "STARTUP_PROFILE"
 
 socketio = SocketIO()
 
@@ -16,18 +55,129 @@ logging.getLogger("socketio.server").setLevel(logging.WARNING)
 
 
 def create_flask_app() -> Flask:
+    """
+    Creates the application and, unless it is preloaded, starts serving games from this process.
+
+    With PRELOAD_APP set, gunicorn creates the application once in its master process and forks the
+    workers from it, so the workers share the imported modules and the memory-mapped dictionary
+    instead of each loading their own. Each worker then calls start_worker once it is forked.
+    """
+    profile = StartupProfile(_is_set(STARTUP_PROFILE_ENV))
+
     # Create the flask app
     app = Flask(__name__)
 
-    # Create a DAO and add it to the flask app config for access by the blueprints
-    word_manager = WordManager()
-    app.config[GAME_MANAGER_CONFIG_KEY] = GameManager(word_manager)
+    # Dictionaries are read-only memory-mapped tries, so they are safe to share between forked workers. The
+    # default dictionary is loaded up front and the others when a game first chooses them.
+    with profile.phase("dictionary"):
+        dictionaries = DictionaryRegistry.from_file(
+            os.environ.get(DICTIONARIES_FILE_ENV, DICTIONARIES_FILE),
+            int(os.environ.get(MAX_LOADED_DICTIONARIES_ENV, DEFAULT_MAX_LOADED_DICTIONARIES)),
+        )
+        dictionaries.get()
+        app.config[DICTIONARIES_CONFIG_KEY] = dictionaries
 
-    from .networking import main as main_blueprint
+    with profile.phase("networking"):
+        from .networking import main as main_blueprint
 
-    app.register_blueprint(main_blueprint)
-    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 60
+        app.register_blueprint(main_blueprint)
+        app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 60
 
-    socketio.init_app(app)
+    # Route emits to sessions connected to other workers through the same Redis server. Connections to it
+    # and the listener task are only opened on first use, in the worker.
+    with profile.phase("socketio"):
+        socketio.init_app(app, message_queue=os.environ.get(REDIS_URL_ENV))
 
+    if _is_set(PRELOAD_APP_ENV):
+        profile.log("master")
+    else:
+        start_worker(app, profile)
     return app
+
+
+def start_worker(app: Flask, profile: StartupProfile = None):
+    """
+    Starts serving games from this process.
+
+    Everything that holds locks, connections or background tasks is created here rather than in
+    create_flask_app, so that a preloaded application only creates them in the workers.
+
+    Args:
+        app: the application created by create_flask_app
+        profile: the profile of the start up so far, if any
+    """
+    if profile is None:
+        profile = StartupProfile(_is_set(STARTUP_PROFILE_ENV))
+
+    # Create a DAO and add it to the flask app config for access by the blueprints
+    with profile.phase("game manager"):
+        redis_url = os.environ.get(REDIS_URL_ENV)
+        backend = RedisStateBackend.from_url(redis_url, DEFAULT_IDLE_TTL_SECONDS) if redis_url else None
+        game_manager = GameManager(
+            app.config[DICTIONARIES_CONFIG_KEY],
+            backend=backend,
+            board_quality=BoardQuality(),
+            # The pools hold the answers of future rounds so they must not be saved in the public static folder
+            board_pool_directory=app.instance_path,
+        )
+        app.config[GAME_MANAGER_CONFIG_KEY] = game_manager
+        app.config[PLAYER_REGISTRY_CONFIG_KEY] = PlayerRegistry()
+        # Each worker limits the sessions connected to it, which a sticky load balancer keeps on the same worker
+        rate_limiter = RateLimiter.from_json(os.environ.get(RATE_LIMITS_ENV) or "{}")
+        app.config[RATE_LIMITER_CONFIG_KEY] = rate_limiter
+
+    # Every finished round is saved to the history by a background writer
+    with profile.phase("round history"):
+        default_round_history_path = os.path.join(app.instance_path, DEFAULT_HISTORY_FILE_NAME)
+        round_history = RoundHistory(
+            os.environ.get(ROUND_HISTORY_PATH_ENV, default_round_history_path), execute=_blocking_executor()
+        )
+        app.config[ROUND_HISTORY_CONFIG_KEY] = round_history
+        game_manager.add_round_end_listener(
+            lambda game_state: round_history.record_round(game_state.get_round_summary())
+        )
+        REGISTRY.register_collector("game_manager", game_manager.collect_metrics)
+
+    from .networking.events import broadcast_game_over, broadcast_live_feed
+
+    game_manager.add_round_end_listener(broadcast_game_over)
+    game_manager.add_live_feed_listener(broadcast_live_feed)
+
+    # Resume the games that were running when the server last stopped, once their listeners are registered
+    with profile.phase("snapshot"):
+        default_snapshot_path = os.path.join(app.instance_path, DEFAULT_SNAPSHOT_FILE_NAME)
+        snapshot_path = os.environ.get(GAME_SNAPSHOT_PATH_ENV, default_snapshot_path)
+        game_manager.load_snapshot(snapshot_path)
+
+    # A single green thread ends rounds for every game, another expires idle games, another
+    # keeps the board pools full, another sends the live feeds, another saves finished rounds, another
+    # saves every game so that a restart resumes them and another forgets idle rate limiter buckets
+    socketio.start_background_task(game_manager.scheduler.run, socketio.sleep)
+    socketio.start_background_task(game_manager.run_reaper, socketio.sleep)
+    socketio.start_background_task(game_manager.run_board_pool_refiller, socketio.sleep)
+    socketio.start_background_task(game_manager.run_live_feed, socketio.sleep)
+    socketio.start_background_task(round_history.run_writer, socketio.sleep)
+    socketio.start_background_task(
+        game_manager.run_snapshotter, socketio.sleep, snapshot_path, execute=_blocking_executor()
+    )
+    socketio.start_background_task(rate_limiter.run_pruner, socketio.sleep)
+
+    # Gunicorn stops a worker gracefully on SIGTERM, after which the worker process exits normally
+    atexit.register(round_history.close)
+    atexit.register(game_manager.save_snapshot, snapshot_path)
+    atexit.register(game_manager.save_board_pools)
+
+    profile.log(f"worker {os.getpid()}")
+
+
+def _blocking_executor():
+    # SQLite and zlib block in C code that eventlet cannot patch, so that work runs in eventlet's pool of OS threads
+    if socketio.async_mode == "eventlet":
+        from eventlet import tpool
+
+        return tpool.execute
+    return None
+
+
+def _is_set(environment_variable: str) -> bool:
+    return os.environ.get(environment_variable, "") not in ("", "0")
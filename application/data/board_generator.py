@@ -0,0 +1,187 @@
+import logging
+from typing import List, Optional, Tuple
+
+import numpy
+
+from application.data.board_layout import BoardLayout
+from application.data.board_solver import BoardSolution, BoardSolver
+from application.data.word_manager import WordManager
+
+# Number of tiles of the default board that the bounds of the default board quality are tuned for
+REFERENCE_TILES = BoardLayout.for_size().total_tiles
+
+# Number of candidate boards drawn at once
+DEFAULT_BATCH_SIZE = 1024
+# Number of candidates solved before settling for the best board seen
+DEFAULT_MAX_ATTEMPTS = 50
+
+LOG = logging.getLogger("BoardGenerator")
+
+
+class BoardQuality:
+    """
+    Bounds on the solution of a board that make it worth playing.
+
+    Word counts are given for a default sized board and are scaled with the number of tiles by ``for_layout``.
+    Letter fractions are used to cheaply reject candidates before they are solved.
+    """
+
+    def __init__(
+        self,
+        min_words: int = 60,
+        max_words: Optional[int] = None,
+        min_long_words: int = 3,
+        long_word_length: int = 6,
+        min_vowel_fraction: float = 0.24,
+        max_vowel_fraction: float = 0.56,
+        max_rare_fraction: float = 0.16,
+        max_same_letter_fraction: float = 0.2,
+    ):
+        self.min_words = min_words
+        self.max_words = max_words
+        self.min_long_words = min_long_words
+        self.long_word_length = long_word_length
+        self.min_vowel_fraction = min_vowel_fraction
+        self.max_vowel_fraction = max_vowel_fraction
+        self.max_rare_fraction = max_rare_fraction
+        self.max_same_letter_fraction = max_same_letter_fraction
+
+    def for_layout(self, layout: BoardLayout) -> "BoardQuality":
+        """
+        Returns these bounds with the word counts scaled to the number of tiles of the given layout.
+        """
+        scale = layout.total_tiles / REFERENCE_TILES
+        return BoardQuality(
+            min_words=round(self.min_words * scale),
+            max_words=round(self.max_words * scale) if self.max_words is not None else None,
+            min_long_words=round(self.min_long_words * scale),
+            long_word_length=self.long_word_length,
+            min_vowel_fraction=self.min_vowel_fraction,
+            max_vowel_fraction=self.max_vowel_fraction,
+            max_rare_fraction=self.max_rare_fraction,
+            max_same_letter_fraction=self.max_same_letter_fraction,
+        )
+
+    def count_long_words(self, solution: BoardSolution) -> int:
+        return sum(1 for word in solution.words if len(word) >= self.long_word_length)
+
+    def accepts(self, solution: BoardSolution) -> bool:
+        if solution.word_count < self.min_words:
+            return False
+        if self.max_words is not None and solution.word_count > self.max_words:
+            return False
+        return self.count_long_words(solution) >= self.min_long_words
+
+
+class BoardGenerator:
+    """
+    Generates boards whose solutions fall within the bounds of a board quality.
+
+    Candidate boards are drawn in batches with NumPy from the letter distribution of the dictionary, and
+    candidates whose letter counts make a poor board likely (too few or too many vowels, too many rare
+    letters or repeats, a letter without its companion like a Q without a U) are rejected for the whole
+    batch at once. The remaining candidates are solved one at a time until one is accepted, and the
+    solution is handed to the game so the accepted board is not solved twice.
+    """
+
+    def __init__(
+        self,
+        word_manager: WordManager,
+        layout: BoardLayout = None,
+        quality: BoardQuality = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        seed: int = None,
+    ):
+        self.layout = layout if layout else BoardLayout.for_size()
+        self.quality = (quality if quality else BoardQuality()).for_layout(self.layout)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.dictionary = word_manager.name
+        self.solver = BoardSolver(word_manager.trie, self.layout.neighbors)
+
+        self._random = numpy.random.default_rng(seed)
+        distribution = word_manager.letter_distribution
+        self._letters = numpy.array(distribution.letters)
+        letter_counts = numpy.array(distribution.weights)
+        self._probabilities = letter_counts / letter_counts.sum()
+
+        self._vowel_columns = numpy.isin(self._letters, list(distribution.vowels))
+        self._rare_columns = numpy.isin(self._letters, list(distribution.rare_letters))
+        # Columns of each letter and the letter it can only be played next to
+        columns = {letter: column for column, letter in enumerate(distribution.letters)}
+        self._companion_columns = [
+            (columns[letter], columns[companion])
+            for letter, companion in distribution.companions.items()
+            if letter in columns and companion in columns
+        ]
+
+        # Candidates that passed the letter count filters and have not been solved yet
+        self._candidates: List[List[str]] = []
+
+        self.candidates_drawn = 0
+        self.candidates_filtered = 0
+        self.boards_solved = 0
+        self.boards_rejected = 0
+
+    def generate(self) -> Tuple[List[str], BoardSolution]:
+        """
+        Returns the tiles and solution of a board accepted by the board quality.
+
+        If no candidate is accepted within the maximum number of attempts, the candidate with the most
+        words is returned instead so that a new round never waits on an unlucky streak.
+        """
+        best: Tuple[List[str], BoardSolution] = None
+        for _ in range(self.max_attempts):
+            tiles = self._next_candidate()
+            solution = self.solver.solve(tiles)
+            self.boards_solved += 1
+            if self.quality.accepts(solution):
+                return tiles, solution
+
+            self.boards_rejected += 1
+            if best is None or solution.word_count > best[1].word_count:
+                best = (tiles, solution)
+
+        LOG.warning(f"No {self.layout} board accepted after {self.max_attempts} attempts")
+        return best
+
+    def generate_candidates(self, count: int) -> List[List[str]]:
+        """
+        Draws the given number of random boards and returns those that pass the letter count filters.
+        """
+        total_tiles = self.layout.total_tiles
+        indexes = self._draw_indexes(count)
+
+        # Number of tiles of each letter on each board, counted for every board in one pass by giving
+        # each board its own range of bins
+        total_letters = len(self._letters)
+        bins = indexes + numpy.arange(count)[:, numpy.newaxis] * total_letters
+        counts = numpy.bincount(bins.ravel(), minlength=count * total_letters).reshape(count, total_letters)
+        vowels = counts[:, self._vowel_columns].sum(axis=1)
+        rare = counts[:, self._rare_columns].sum(axis=1)
+
+        quality = self.quality
+        feasible = (
+            (vowels >= quality.min_vowel_fraction * total_tiles)
+            & (vowels <= quality.max_vowel_fraction * total_tiles)
+            & (rare <= quality.max_rare_fraction * total_tiles)
+            & (counts.max(axis=1) <= max(quality.max_same_letter_fraction * total_tiles, 1))
+        )
+        for column, companion_column in self._companion_columns:
+            feasible &= ~((counts[:, column] > 0) & (counts[:, companion_column] == 0))
+
+        self.candidates_drawn += count
+        self.candidates_filtered += count - int(feasible.sum())
+        return self._letters[indexes[feasible]].tolist()
+
+    def _draw_indexes(self, count: int) -> numpy.ndarray:
+        return self._random.choice(len(self._letters), size=(count, self.layout.total_tiles), p=self._probabilities)
+
+    def _next_candidate(self) -> List[str]:
+        if not self._candidates:
+            self._candidates = self.generate_candidates(self.batch_size)
+        if not self._candidates:
+            # A whole batch failing means the letter filters do not suit the letters of the dictionary
+            self._candidates = self._letters[self._draw_indexes(self.batch_size)].tolist()
+        return self._candidates.pop()
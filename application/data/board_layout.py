@@ -0,0 +1,59 @@
+from functools import lru_cache
+from typing import List
+
+DEFAULT_ROWS = 5
+DEFAULT_COLUMNS = 5
+
+MIN_DIMENSION = 2
+MAX_DIMENSION = 12
+
+
+class BoardLayout:
+    """
+    Adjacency information for a board with the given number of rows and columns.
+
+    Tiles are indexed row by row starting from the top-left corner. Layouts are immutable, so use
+    ``BoardLayout.for_size`` to share one precomputed instance between every game of the same size.
+    """
+
+    def __init__(self, rows: int, columns: int):
+        if not (MIN_DIMENSION <= rows <= MAX_DIMENSION) or not (MIN_DIMENSION <= columns <= MAX_DIMENSION):
+            raise ValueError(f"Board dimensions must be between {MIN_DIMENSION} and {MAX_DIMENSION}")
+
+        self.rows = rows
+        self.columns = columns
+        self.total_tiles = rows * columns
+
+        # The tile indexes adjacent to each tile index
+        self.neighbors: List[List[int]] = []
+        for tile in range(self.total_tiles):
+            row, column = divmod(tile, columns)
+            self.neighbors.append(
+                [
+                    other_row * columns + other_column
+                    for other_row in range(max(row - 1, 0), min(row + 2, rows))
+                    for other_column in range(max(column - 1, 0), min(column + 2, columns))
+                    if (other_row, other_column) != (row, column)
+                ]
+            )
+
+        # Bitmask of the tiles adjacent to each tile index
+        self.neighbor_masks: List[int] = [sum(1 << neighbor for neighbor in neighbors) for neighbors in self.neighbors]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def for_size(rows: int = DEFAULT_ROWS, columns: int = DEFAULT_COLUMNS) -> "BoardLayout":
+        """
+        Returns the shared layout for the given board size.
+        """
+        return BoardLayout(rows, columns)
+
+    def are_neighbors(self, tile_index_1: int, tile_index_2: int) -> bool:
+        # Ensure we don't go out of bounds
+        if not (0 <= tile_index_1 < self.total_tiles) or not (0 <= tile_index_2 < self.total_tiles):
+            raise ValueError("Tile indexes invalid")
+
+        return (self.neighbor_masks[tile_index_1] >> tile_index_2) & 1 == 1
+
+    def __str__(self) -> str:
+        return f"{self.rows}x{self.columns}"
@@ -0,0 +1,233 @@
+import logging
+import os
+import struct
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+from application.data.board_generator import BoardGenerator
+from application.data.board_solver import BoardSolution
+from application.util.file_util import write_atomically
+
+DEFAULT_POOL_SIZE = 64
+DEFAULT_REFILL_INTERVAL_SECONDS = 1
+
+# Header layout: magic, byte order marker, rows, columns, then the dictionary's word count, node count,
+# source size and source mtime so that boards solved with another dictionary are discarded, and the board count
+_MAGIC = b"SWPOOL02"
+_BYTE_ORDER_MARKER = 0x01020304
+_HEADER = struct.Struct("=8sIBBIIQQI")
+_WORD_COUNT = struct.Struct("=I")
+
+Board = Tuple[List[str], BoardSolution]
+
+LOG = logging.getLogger("BoardPool")
+
+
+class BoardPool:
+    """
+    Boards that have already been generated and solved, ready to be handed to a new round.
+
+    Taking a board is a pop from the pool. The pool is topped back up to its size by a background task
+    once it drops below the refill threshold, and a board is only generated on the request path when
+    the pool has run dry.
+
+    The pool is saved to a compact binary file when the worker stops and loaded on first use, so a restarted
+    worker does not have to generate its boards again. Each board is stored as its tiles followed by the
+    tile path of every word in its solution, which is enough to rebuild the solution without searching.
+    A worker claims the file by renaming it before reading it, and the pool is only written again once the
+    worker no longer hands out its boards, so that two workers never hand out the same boards. The file holds
+    the answers of future rounds, so it must be kept out of any publicly served folder.
+    """
+
+    def __init__(
+        self,
+        generator: BoardGenerator,
+        size: int = DEFAULT_POOL_SIZE,
+        refill_threshold: int = None,
+        directory: str = None,
+    ):
+        """
+        Args:
+            generator: generates the boards of the pool
+            size: the number of boards the pool is filled to
+            refill_threshold: the number of boards below which the pool is refilled, defaults to half the size
+            directory: where the pool is saved in a file for its dictionary and board size, not saved if not given
+        """
+        self.generator = generator
+        self.dictionary = generator.dictionary
+        self.layout = generator.layout
+        self.size = size
+        self.refill_threshold = refill_threshold if refill_threshold is not None else size // 2
+        self.path = os.path.join(directory, f"board_pool_{self.dictionary}_{self.layout}.pool") if directory else None
+
+        self._boards: Deque[Board] = deque()
+        self._loaded = False
+
+        self.hits = 0
+        self.misses = 0
+        self.boards_generated = 0
+        self.boards_loaded = 0
+
+    def generate(self) -> Board:
+        """
+        Returns the tiles and solution of a board from the pool, or of a freshly generated board if it is empty.
+        """
+        self._load()
+        if self._boards:
+            self.hits += 1
+            return self._boards.popleft()
+
+        self.misses += 1
+        self.boards_generated += 1
+        return self.generator.generate()
+
+    def needs_refill(self) -> bool:
+        self._load()
+        return len(self._boards) < self.refill_threshold
+
+    def refill(self, sleep: Callable[[float], None] = None) -> int:
+        """
+        Generates boards until the pool is full.
+
+        Args:
+            sleep: if given, called with 0 after each board to yield to other green threads
+
+        Returns:
+            the number of boards generated
+        """
+        self._load()
+        generated = 0
+        while len(self._boards) < self.size:
+            self._boards.append(self.generator.generate())
+            generated += 1
+            if sleep:
+                sleep(0)
+
+        self.boards_generated += generated
+        return generated
+
+    def save(self):
+        """
+        Writes the boards in the pool to the pool file, replacing it atomically. Meant to be called when the
+        worker stops, as any worker that starts afterwards may load the saved boards.
+        """
+        if not self.path:
+            return
+
+        buffer = _encode(self.layout.rows, self.layout.columns, self._dictionary_stamp(), list(self._boards))
+        try:
+            write_atomically(self.path, buffer)
+        except OSError:
+            LOG.warning(f"Could not save board pool {self.path}")
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "size": len(self._boards),
+            "hits": self.hits,
+            "misses": self.misses,
+            "boards_generated": self.boards_generated,
+            "boards_loaded": self.boards_loaded,
+        }
+
+    def __len__(self) -> int:
+        return len(self._boards)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+
+        # Take the file for this worker so that no other worker hands out the same boards
+        claimed_path = f"{self.path}.{os.getpid()}"
+        try:
+            os.rename(self.path, claimed_path)
+        except OSError:
+            return
+
+        try:
+            with open(claimed_path, mode="rb") as pool_file:
+                boards = _decode(pool_file.read(), self.layout.rows, self.layout.columns, self._dictionary_stamp())
+        except (OSError, ValueError, struct.error) as error:
+            LOG.warning(f"Ignoring unreadable board pool {self.path}: {error}")
+            boards = []
+        finally:
+            os.unlink(claimed_path)
+
+        # The board quality may have changed since the pool was saved
+        boards = [board for board in boards if self.generator.quality.accepts(board[1])]
+        self._boards.extend(boards)
+        self.boards_loaded = len(boards)
+        LOG.info(f"Loaded {len(boards)} {self.layout} boards from {self.path}")
+
+    def _dictionary_stamp(self) -> Tuple[int, int, int, int]:
+        return self.generator.solver.trie.stamp
+
+
+def encode_board(tiles: List[str], solution: BoardSolution) -> bytes:
+    """
+    Encodes a board as its tiles followed by the tile path of every word in its solution.
+
+    Each tile is stored as its length in UTF-8 bytes followed by those bytes, so that the tiles of any word list
+    round trip, even those with letters outside ASCII.
+    """
+    chunks = []
+    for tile in tiles:
+        encoded_tile = tile.encode()
+        chunks.append(bytes((len(encoded_tile),)))
+        chunks.append(encoded_tile)
+    chunks.append(_WORD_COUNT.pack(solution.word_count))
+    for path in solution.word_paths:
+        chunks.append(bytes((len(path),)))
+        chunks.append(bytes(path))
+    return b"".join(chunks)
+
+
+def decode_board(buffer: bytes, offset: int, total_tiles: int) -> Tuple[Board, int]:
+    """
+    Decodes a board encoded by encode_board.
+
+    Returns:
+        the tiles and solution of the board, and the offset of the end of the board in the buffer
+    """
+    tiles = []
+    for _ in range(total_tiles):
+        tile_start = offset + 1
+        tile_end = tile_start + buffer[offset]
+        tiles.append(buffer[tile_start:tile_end].decode())
+        offset = tile_end
+    (word_count,) = _WORD_COUNT.unpack_from(buffer, offset)
+    offset += _WORD_COUNT.size
+
+    # Each word is spelled by the tiles along its path
+    paths = {}
+    for _ in range(word_count):
+        path_start = offset + 1
+        path_end = path_start + buffer[offset]
+        path = list(buffer[path_start:path_end])
+        offset = path_end
+        paths["".join(tiles[tile] for tile in path)] = path
+    return (tiles, BoardSolution(paths)), offset
+
+
+def _encode(rows: int, columns: int, dictionary_stamp: Tuple[int, int, int, int], boards: List[Board]) -> bytes:
+    chunks = [_HEADER.pack(_MAGIC, _BYTE_ORDER_MARKER, rows, columns, *dictionary_stamp, len(boards))]
+    chunks.extend(encode_board(tiles, solution) for tiles, solution in boards)
+    return b"".join(chunks)
+
+
+def _decode(buffer: bytes, rows: int, columns: int, dictionary_stamp: Tuple[int, int, int, int]) -> List[Board]:
+    magic, byte_order_marker, saved_rows, saved_columns, *saved_stamp, board_count = _HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC or byte_order_marker != _BYTE_ORDER_MARKER:
+        raise ValueError("not a board pool for this platform")
+    if (saved_rows, saved_columns) != (rows, columns) or tuple(saved_stamp) != dictionary_stamp:
+        # The boards were made for another board size or dictionary
+        return []
+
+    boards = []
+    offset = _HEADER.size
+    for _ in range(board_count):
+        board, offset = decode_board(buffer, offset, rows * columns)
+        boards.append(board)
+    return boards
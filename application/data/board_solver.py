@@ -0,0 +1,112 @@
+from typing import Dict, List, Sequence
+
+from application.data.scoring import Scoring
+from application.data.word_trie import ROOT_NODE, WordTrie
+from application.util.metrics import REGISTRY
+
+# Upper bounds of the buckets of the board search histogram
+NODE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+BOARD_SEARCH_NODES = REGISTRY.histogram(
+    "scrambled_words_board_search_nodes_expanded",
+    "Tiles visited by each search of a board for all of its words",
+    buckets=NODE_BUCKETS,
+)
+
+
+class BoardSolution:
+    """
+    Every dictionary word that can be spelled on a board, with one tile path for each.
+
+    Each word is numbered by its position in the solution. Rounds refer to the board's words by these
+    IDs, so that the solution holds the only copy of each word.
+    """
+
+    __slots__ = ("words", "word_ids", "word_paths", "word_count", "max_score")
+
+    def __init__(self, paths: Dict[str, List[int]]):
+        # The word and tile path of each word ID, and the ID of each word
+        self.words: List[str] = list(paths)
+        self.word_paths: List[List[int]] = list(paths.values())
+        self.word_ids: Dict[str, int] = {word: word_id for word_id, word in enumerate(self.words)}
+        self.word_count = len(self.words)
+        self.max_score = sum(Scoring.get_classic_word_value(word) for word in self.words)
+
+    @property
+    def paths(self) -> Dict[str, List[int]]:
+        """
+        Dictionary from each word to its tile path.
+        """
+        return dict(zip(self.words, self.word_paths))
+
+    def get_path(self, word: str) -> List[int]:
+        word_id = self.word_ids.get(word)
+        return self.word_paths[word_id] if word_id is not None else None
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_ids
+
+
+class BoardSolver:
+    """
+    Finds all words on a board with a depth-first search that is pruned by the dictionary trie.
+
+    A branch of the search is abandoned as soon as the letters collected so far are not the prefix
+    of any word, so the work is proportional to the number of live prefixes on the board rather than
+    to the number of paths through the grid.
+    """
+
+    def __init__(self, trie: WordTrie, neighbors: Sequence[Sequence[int]]):
+        """
+        Args:
+            trie: the dictionary to search for
+            neighbors: the tile indexes adjacent to each tile index
+        """
+        self.trie = trie
+        self.neighbors = neighbors
+
+    def solve(self, tiles: List[str]) -> BoardSolution:
+        """
+        Finds all the words on the given board.
+
+        Args:
+            tiles: the letter on each tile
+
+        Returns:
+            the solution for the board
+        """
+        labels = [tile.lower().encode() for tile in tiles]
+        paths: Dict[str, List[int]] = {}
+        path: List[int] = []
+        nodes_expanded = 0
+
+        trie = self.trie
+        neighbors = self.neighbors
+
+        def visit(tile: int, node: int, visited: int, prefix: bytes):
+            nonlocal nodes_expanded
+            nodes_expanded += 1
+            node = trie.walk(node, labels[tile])
+            if node < 0:
+                return
+
+            prefix += labels[tile]
+            visited |= 1 << tile
+            path.append(tile)
+
+            if trie.is_terminal(node):
+                word = prefix.decode()
+                if word not in paths:
+                    paths[word] = path.copy()
+
+            for neighbor in neighbors[tile]:
+                if not (visited >> neighbor) & 1:
+                    visit(neighbor, node, visited, prefix)
+
+            path.pop()
+
+        for start in range(len(tiles)):
+            visit(start, ROOT_NODE, 0, b"")
+
+        BOARD_SEARCH_NODES.observe(nodes_expanded)
+        return BoardSolution(paths)
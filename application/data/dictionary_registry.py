@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple
+
+from application.data.letter_distribution import VOWELS
+from application.data.word_manager import FILE_LOCATION, WordManager
+
+DICTIONARIES_FILE = f"{FILE_LOCATION}/../static/dictionaries.json"
+DEFAULT_MAX_LOADED_DICTIONARIES = 4
+
+LOG = logging.getLogger("DictionaryRegistry")
+
+
+class DictionaryInfo(NamedTuple):
+    name: str
+    # Shown to the players choosing a dictionary for a new game
+    title: str
+    word_file: str
+    vowels: str = VOWELS
+
+
+class DictionaryRegistry:
+    """
+    The dictionaries that games can be played with, each loaded when a game first chooses it.
+
+    Loaded dictionaries are kept in least recently used order, and the least recently used one is unloaded
+    once more than the maximum are loaded. The games already playing an unloaded dictionary keep using it,
+    so its memory is freed once they have all ended, and it is loaded again for the next game that chooses it.
+    """
+
+    def __init__(
+        self,
+        dictionaries: List[DictionaryInfo],
+        default_name: str = None,
+        max_loaded: int = DEFAULT_MAX_LOADED_DICTIONARIES,
+    ):
+        """
+        Args:
+            dictionaries: the dictionaries that can be chosen, in the order they are offered
+            default_name: the dictionary of games that do not choose one, defaults to the first dictionary
+            max_loaded: the most dictionaries kept loaded
+        """
+        if not dictionaries:
+            raise ValueError("At least one dictionary is needed")
+        self.dictionaries: Dict[str, DictionaryInfo] = {info.name: info for info in dictionaries}
+        self.default_name = default_name if default_name is not None else dictionaries[0].name
+        if self.default_name not in self.dictionaries:
+            raise ValueError(f"Unknown default dictionary {self.default_name}")
+        self.max_loaded = max(max_loaded, 1)
+
+        self.loaded: "OrderedDict[str, WordManager]" = OrderedDict()
+        # Called with the name of each dictionary that is unloaded
+        self.unload_listeners: List[Callable[[str], None]] = []
+        # Loading a dictionary can take a while, so two games choosing the same one must not both load it
+        self.lock = threading.Lock()
+
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_file(
+        cls, path: str = DICTIONARIES_FILE, max_loaded: int = DEFAULT_MAX_LOADED_DICTIONARIES
+    ) -> "DictionaryRegistry":
+        """
+        Reads the dictionaries from a JSON manifest such as:
+
+            {
+                "default": "english",
+                "dictionaries": [
+                    {"name": "english", "title": "English", "word_file": "words.txt", "vowels": "aeiou"}
+                ]
+            }
+
+        Word files are relative to the manifest. The title defaults to the name and the vowels to English's.
+        """
+        with open(path, mode="r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        directory = os.path.dirname(os.path.realpath(path))
+        dictionaries = [
+            DictionaryInfo(
+                entry["name"],
+                entry.get("title", entry["name"]),
+                os.path.join(directory, entry["word_file"]),
+                entry.get("vowels", VOWELS),
+            )
+            for entry in manifest["dictionaries"]
+        ]
+        return cls(dictionaries, manifest.get("default"), max_loaded)
+
+    @classmethod
+    def for_word_manager(cls, word_manager: WordManager) -> "DictionaryRegistry":
+        """
+        Returns a registry whose only dictionary is the given word manager, which is already loaded.
+        """
+        info = DictionaryInfo(word_manager.name, word_manager.name.title(), word_manager.word_file, word_manager.vowels)
+        registry = cls([info], max_loaded=1)
+        registry.loaded[word_manager.name] = word_manager
+        return registry
+
+    def get(self, name: str = None) -> WordManager:
+        """
+        Returns the dictionary with the given name, loading it first if it is not loaded.
+
+        Args:
+            name: the name of the dictionary, defaults to the default dictionary
+
+        Returns:
+            the word manager of the dictionary
+
+        Raises:
+            KeyError: if there is no dictionary with the given name
+        """
+        info = self.dictionaries[name if name else self.default_name]
+        unloaded = []
+        with self.lock:
+            word_manager = self.loaded.get(info.name)
+            if word_manager is None:
+                word_manager = self.loaded[info.name] = self._load(info)
+                while len(self.loaded) > self.max_loaded:
+                    unloaded.append(self.loaded.popitem(last=False)[0])
+            self.loaded.move_to_end(info.name)
+
+        for unloaded_name in unloaded:
+            self.evictions += 1
+            LOG.info(f"Unloaded dictionary {unloaded_name}")
+            for listener in self.unload_listeners:
+                listener(unloaded_name)
+        return word_manager
+
+    def get_dictionaries(self) -> List[DictionaryInfo]:
+        """
+        Returns every dictionary that can be chosen, in the order they are offered.
+        """
+        return list(self.dictionaries.values())
+
+    def add_unload_listener(self, listener: Callable[[str], None]):
+        """
+        Registers a function to call with the name of each dictionary that is unloaded.
+        """
+        self.unload_listeners.append(listener)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "loaded_dictionaries": len(self.loaded),
+            "dictionary_loads": self.loads,
+            "dictionary_evictions": self.evictions,
+        }
+
+    def _load(self, info: DictionaryInfo) -> WordManager:
+        word_manager = WordManager(word_file=info.word_file, name=info.name, vowels=info.vowels)
+        # Derived now so that the whole cost of a dictionary is paid when it is loaded
+        letters = "".join(word_manager.letter_distribution.letters)
+        self.loads += 1
+        LOG.info(f"Loaded dictionary {info.name} with letters {letters}")
+        return word_manager
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.dictionaries
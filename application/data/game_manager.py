@@ -1,46 +1,200 @@
+import logging
 import random
 import string
-from typing import Optional
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
+from application.data.board_generator import BoardGenerator, BoardQuality
+from application.data.board_layout import BoardLayout
+from application.data.board_pool import DEFAULT_POOL_SIZE, DEFAULT_REFILL_INTERVAL_SECONDS, BoardPool
+from application.data.dictionary_registry import DictionaryRegistry
+from application.data.game_snapshot import (
+    DEFAULT_SNAPSHOT_INTERVAL_SECONDS,
+    GameSnapshot,
+    decode_snapshot,
+    encode_snapshot,
+)
 from application.data.game_state import GameState
 from application.data.scoring_type import ScoringType
+from application.data.state_backend import MemoryStateBackend, StateBackend
 from application.data.word_manager import WordManager
+from application.util.file_util import write_atomically
+from application.util.metrics import Counter, Gauge, Histogram, Metric
+from application.util.scheduler import Scheduler
+
+DEFAULT_MAX_GAMES = 10000
+DEFAULT_IDLE_TTL_SECONDS = 2 * 60 * 60
+DEFAULT_REAPER_INTERVAL_SECONDS = 60
+DEFAULT_LIVE_FEED_INTERVAL_SECONDS = 0.25
+
+# Number of games sampled when estimating the memory used per game
+SIZE_SAMPLE_GAMES = 20
+
+# Upper bounds of the buckets of the players per room histogram
+PLAYER_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+LOG = logging.getLogger("GameManager")
 
 
 class GameManager:
     """
     Manages all the games.
+
+    Games are kept in least recently used order. A game is expired once nobody has touched it for the
+    idle TTL, and the least recently used game is expired whenever the number of games exceeds the maximum.
+
+    With a shared state backend the games held here are a per-worker cache: a game created by another
+    worker is loaded from the backend on first use and reloaded whenever the backend has a newer round.
     """
 
-    def __init__(self, word_manager: WordManager):
-        self.games = {}
-        self.word_manager = word_manager
+    def __init__(
+        self,
+        dictionaries: Union[DictionaryRegistry, WordManager],
+        max_games: int = DEFAULT_MAX_GAMES,
+        idle_ttl_seconds: int = DEFAULT_IDLE_TTL_SECONDS,
+        scheduler: Scheduler = None,
+        backend: StateBackend = None,
+        board_quality: BoardQuality = None,
+        board_pool_size: int = DEFAULT_POOL_SIZE,
+        board_pool_refill_threshold: int = None,
+        board_pool_directory: str = None,
+    ):
+        """
+        Args:
+            dictionaries: the dictionaries games can choose from, or the only dictionary
+            max_games: the most games kept in memory
+            idle_ttl_seconds: how long an unused game is kept
+            scheduler: ends the rounds of every game, one is created if not given
+            backend: stores the state shared between workers, defaults to this process's memory
+            board_quality: bounds that every new board must meet, boards are random if not given
+            board_pool_size: the number of ready boards kept for each dictionary and board size
+            board_pool_refill_threshold: the number of ready boards below which a pool is refilled
+            board_pool_directory: where the board pools are saved between restarts
+        """
+        self.games: "OrderedDict[str, GameState]" = OrderedDict()
+        if isinstance(dictionaries, WordManager):
+            dictionaries = DictionaryRegistry.for_word_manager(dictionaries)
+        self.dictionaries = dictionaries
+        self.max_games = max_games
+        self.idle_ttl_seconds = idle_ttl_seconds
+
+        # Ends the rounds of every game. Its loop is run as a background task by the application.
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.backend = backend if backend is not None else MemoryStateBackend()
+
+        self.board_quality = board_quality
+        self.board_pool_size = board_pool_size
+        self.board_pool_refill_threshold = board_pool_refill_threshold
+        self.board_pool_directory = board_pool_directory
+        # Board pool for each dictionary and board size, created for the first game of that dictionary and size
+        self.board_pools: Dict[Tuple[str, int, int], BoardPool] = {}
+        # Start filling the pool for the default dictionary and board size before the first game is created
+        self.get_board_pool()
+        self.dictionaries.add_unload_listener(self._dictionary_unloaded)
+
+        # Called with the game state whenever a game's round ends
+        self.round_end_listeners: List[Callable[[GameState], None]] = []
+        # Called with the game state of each live feed game that changed since the last tick
+        self.live_feed_listeners: List[Callable[[GameState], None]] = []
+        # Names of the live feed games with guesses since the last tick
+        self.live_feed_updates: Set[str] = set()
 
-    def create_game(self, scoring_type: ScoringType = ScoringType.CLASSIC) -> GameState:
+        self.idle_evictions = 0
+        self.capacity_evictions = 0
+
+    def create_game(
+        self,
+        scoring_type: ScoringType = ScoringType.CLASSIC,
+        layout: BoardLayout = None,
+        live_feed: bool = False,
+        dictionary: str = None,
+    ) -> GameState:
         """
         Creates a new game.
 
         Returns:
             the game state
+
+        Raises:
+            KeyError: if there is no dictionary with the given name
         """
         game_name = self._create_game_name()
-        while game_name in self.games:
+        while game_name in self.games or self.backend.get_round_id(game_name) is not None:
             game_name = self._create_game_name()
 
-        return self.create_game_for_name(game_name, scoring_type)
+        return self.create_game_for_name(game_name, scoring_type, layout, live_feed, dictionary)
 
-    def create_game_for_name(self, game_name: str, scoring_type: ScoringType) -> GameState:
+    def create_game_for_name(
+        self,
+        game_name: str,
+        scoring_type: ScoringType = ScoringType.CLASSIC,
+        layout: BoardLayout = None,
+        live_feed: bool = False,
+        dictionary: str = None,
+    ) -> GameState:
         """
         Creates a new game with the given game name.
 
+        Args:
+            game_name: the game name
+            scoring_type: the scoring type of every round
+            layout: the board layout, defaults to the default board size
+            live_feed: whether the room is shown every player's progress during the round
+            dictionary: the name of the dictionary, defaults to the default dictionary
+
         Returns:
             the game state
-        """
-        game_state = GameState(game_name, self.word_manager, scoring_type=scoring_type)
-        self.games[game_name] = game_state
 
+        Raises:
+            KeyError: if there is no dictionary with the given name
+        """
+        word_manager = self.dictionaries.get(dictionary)
+        game_state = GameState(
+            game_name,
+            word_manager,
+            scoring_type=scoring_type,
+            layout=layout,
+            scheduler=self.scheduler,
+            on_round_end=self._round_ended,
+            backend=self.backend,
+            board_pool=self.get_board_pool(layout, word_manager.name),
+            live_feed=live_feed,
+            on_live_update=self._live_feed_updated,
+        )
+        self._add_game(game_state)
         return game_state
 
+    def get_board_pool(self, layout: BoardLayout = None, dictionary: str = None) -> Optional[BoardPool]:
+        """
+        Returns the pool of ready boards shared by every game with the given layout and dictionary, if board
+        quality is enforced.
+        """
+        if self.board_quality is None:
+            return None
+
+        layout = layout if layout else BoardLayout.for_size()
+        dictionary = dictionary if dictionary else self.dictionaries.default_name
+        key = (dictionary, layout.rows, layout.columns)
+        if key not in self.board_pools:
+            self.board_pools[key] = BoardPool(
+                BoardGenerator(self.dictionaries.get(dictionary), layout, self.board_quality),
+                size=self.board_pool_size,
+                refill_threshold=self.board_pool_refill_threshold,
+                directory=self.board_pool_directory,
+            )
+        return self.board_pools[key]
+
+    def save_board_pools(self):
+        """
+        Saves the boards left in every board pool so that the next worker to start can hand them out.
+        Meant to be called when the worker stops.
+        """
+        for pool in list(self.board_pools.values()):
+            pool.save()
+
     def get_game_state(self, game_name: str) -> Optional[GameState]:
         """
         Returns the game state for the given game name if one exists.
@@ -51,7 +205,323 @@ class GameManager:
             the game state if one exists
         """
         game_name = game_name.upper()
-        return self.games.get(game_name, None)
+        game_state = self.games.get(game_name, None)
+        if self.backend.shared:
+            game_state = self._sync_game(game_name, game_state)
+
+        if game_state:
+            game_state.last_activity = self.scheduler.clock()
+            self.games.move_to_end(game_name)
+        return game_state
+
+    def remove_session(self, game_name: str, session_id: str):
+        """
+        Removes a disconnected SocketIO session from the game it joined.
+        """
+        game_state = self.games.get(game_name)
+        if game_state:
+            game_state.remove_session(session_id)
+        elif self.backend.shared:
+            self.backend.remove_session(game_name, session_id)
+
+    def add_round_end_listener(self, listener: Callable[[GameState], None]):
+        """
+        Registers a function to call with the game state whenever a game's round ends.
+        """
+        self.round_end_listeners.append(listener)
+
+    def add_live_feed_listener(self, listener: Callable[[GameState], None]):
+        """
+        Registers a function to call with the game state of each live feed game that changed since the last tick.
+        """
+        self.live_feed_listeners.append(listener)
+
+    def flush_live_feeds(self) -> int:
+        """
+        Calls the live feed listeners once for each live feed game with guesses since the last flush,
+        however many guesses it received.
+
+        Returns:
+            the number of games whose live feed was sent
+        """
+        updated_games, self.live_feed_updates = self.live_feed_updates, set()
+        flushed = 0
+        for game_name in updated_games:
+            game_state = self.games.get(game_name)
+            if game_state is None:
+                continue
+            for listener in self.live_feed_listeners:
+                listener(game_state)
+            flushed += 1
+        return flushed
+
+    def run_live_feed(
+        self, sleep: Callable[[float], None], interval_seconds: float = DEFAULT_LIVE_FEED_INTERVAL_SECONDS
+    ):
+        """
+        Sends the live feed of the games that changed at a fixed interval forever, so that a room receives
+        at most one live feed update per tick however many guesses its players make. Meant to be run as
+        a single background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            interval_seconds: the time between ticks
+        """
+        while True:
+            sleep(interval_seconds)
+            try:
+                self.flush_live_feeds()
+            except Exception:
+                LOG.exception("Failed to send the live feeds")
+
+    def save_snapshot(self, path: str, execute: Callable[..., object] = None) -> int:
+        """
+        Saves every game held in memory to a snapshot file, replacing it atomically.
+
+        Games are not saved when the state backend is shared, as it already holds their state.
+
+        Args:
+            path: the snapshot file
+            execute: called with the write function and its arguments to encode and write the snapshot, such
+                as eventlet.tpool.execute to keep the encoding and the disk off the green threads, defaults to
+                running it in the calling thread
+
+        Returns:
+            the number of games saved
+        """
+        if self.backend.shared:
+            return 0
+
+        start = time.perf_counter()
+        # The games are copied here, under their own locks, so that only the copies are read by the write
+        snapshots = [game_state.get_snapshot() for game_state in list(self.games.values())]
+        try:
+            if execute:
+                execute(_write_snapshot, path, snapshots)
+            else:
+                _write_snapshot(path, snapshots)
+        except OSError as error:
+            LOG.warning(f"Could not save game snapshot {path}: {error}")
+            return 0
+        LOG.info(f"Saved {len(snapshots)} games to {path} in {time.perf_counter() - start:.3f} s")
+        return len(snapshots)
+
+    def load_snapshot(self, path: str) -> int:
+        """
+        Restores the games saved to a snapshot file, re-arming the round timers from their saved expire times.
+
+        Games whose dictionary is no longer offered are not restored.
+
+        Returns:
+            the number of games restored
+        """
+        if self.backend.shared:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            with open(path, mode="rb") as snapshot_file:
+                snapshots = decode_snapshot(snapshot_file.read())
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, struct.error, zlib.error) as error:
+            LOG.warning(f"Ignoring unreadable game snapshot {path}: {error}")
+            return 0
+
+        # Games were saved in least recently used order, which adding them in turn preserves
+        restored = 0
+        for snapshot in snapshots:
+            record = snapshot.state["record"]
+            dictionary = self._get_record_dictionary(record)
+            if dictionary not in self.dictionaries:
+                LOG.warning(f"Not restoring game {snapshot.state['game_name']} with unknown dictionary {dictionary}")
+                continue
+
+            game_state = GameState.from_snapshot(
+                snapshot.state["game_name"],
+                self.dictionaries.get(dictionary),
+                snapshot,
+                scheduler=self.scheduler,
+                on_round_end=self._round_ended,
+                backend=self.backend,
+                board_pool=self.get_board_pool(
+                    BoardLayout.for_size(int(record["rows"]), int(record["columns"])), dictionary
+                ),
+                on_live_update=self._live_feed_updated,
+            )
+            self._add_game(game_state)
+            restored += 1
+        LOG.info(f"Restored {restored} games from {path} in {time.perf_counter() - start:.3f} s")
+        return restored
+
+    def run_snapshotter(
+        self,
+        sleep: Callable[[float], None],
+        path: str,
+        interval_seconds: float = DEFAULT_SNAPSHOT_INTERVAL_SECONDS,
+        execute: Callable[..., object] = None,
+    ):
+        """
+        Saves every game to a snapshot file at a fixed interval forever. Meant to be run as a single
+        background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            path: the snapshot file
+            interval_seconds: the time between snapshots
+            execute: runs each encoding and write, as passed to save_snapshot
+        """
+        while True:
+            sleep(interval_seconds)
+            try:
+                self.save_snapshot(path, execute)
+            except Exception:
+                LOG.exception("Failed to save the game snapshot")
+
+    def expire_idle_games(self, now: int = None) -> int:
+        """
+        Expires every game that has not been used within the idle TTL.
+
+        Args:
+            now: the current time in milliseconds
+
+        Returns:
+            the number of games expired
+        """
+        if now is None:
+            now = self.scheduler.clock()
+        cutoff = now - self.idle_ttl_seconds * 1000
+
+        # Games are in least recently used order so stop at the first game that is still active
+        expired = 0
+        while self.games:
+            game_name, game_state = next(iter(self.games.items()))
+            if game_state.last_activity > cutoff:
+                break
+            self._expire_game(game_name)
+            expired += 1
+
+        self.idle_evictions += expired
+        return expired
+
+    def run_reaper(self, sleep: Callable[[float], None], interval_seconds: float = DEFAULT_REAPER_INTERVAL_SECONDS):
+        """
+        Expires idle games forever. Meant to be run as a single background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            interval_seconds: the time between passes
+        """
+        while True:
+            sleep(interval_seconds)
+            try:
+                expired = self.expire_idle_games()
+                if expired:
+                    LOG.info(f"Expired {expired} idle games: {self.get_metrics()}")
+            except Exception:
+                LOG.exception("Failed to expire idle games")
+
+    def run_board_pool_refiller(
+        self, sleep: Callable[[float], None], interval_seconds: float = DEFAULT_REFILL_INTERVAL_SECONDS
+    ):
+        """
+        Refills the board pools that are running low forever. Meant to be run as a single background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            interval_seconds: the time between checks
+        """
+        while True:
+            sleep(interval_seconds)
+            # Pools may be added while boards are generated
+            for pool in list(self.board_pools.values()):
+                try:
+                    if pool.needs_refill():
+                        generated = pool.refill(sleep)
+                        LOG.info(f"Generated {generated} {pool.dictionary} {pool.layout} boards: {pool.get_metrics()}")
+                except Exception:
+                    LOG.exception(f"Failed to refill the {pool.dictionary} {pool.layout} board pool")
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Returns counters describing the games held in memory.
+        """
+        # Estimate the size of a game from the most recently used games as they are the most likely to be busy
+        sample = []
+        for game_name in reversed(self.games):
+            sample.append(self.games[game_name].estimate_size_bytes())
+            if len(sample) >= SIZE_SAMPLE_GAMES:
+                break
+
+        metrics = {
+            "live_games": len(self.games),
+            "idle_evictions": self.idle_evictions,
+            "capacity_evictions": self.capacity_evictions,
+            "estimated_bytes_per_game": sum(sample) // len(sample) if sample else 0,
+        }
+        metrics.update(self.dictionaries.get_metrics())
+        for pool in self.board_pools.values():
+            for name, value in pool.get_metrics().items():
+                metrics[f"board_pool_{pool.dictionary}_{pool.layout}_{name}"] = value
+        return metrics
+
+    def collect_metrics(self) -> List[Metric]:
+        """
+        Returns metrics describing the games held in memory, built when the metrics are rendered.
+
+        Connected players are counted from the sessions connected through this worker.
+        """
+        live_games = Gauge("scrambled_words_live_games", "Games held in memory")
+        active_rooms = Gauge("scrambled_words_active_rooms", "Games with at least one connected player")
+        players_per_room = Histogram(
+            "scrambled_words_players_per_room", "Connected players in each active room", buckets=PLAYER_BUCKETS
+        )
+        evictions = Counter("scrambled_words_game_evictions_total", "Games expired, by reason", ["reason"])
+        bytes_per_game = Gauge("scrambled_words_estimated_bytes_per_game", "Estimated memory used by a recent game")
+        loaded_dictionaries = Gauge("scrambled_words_loaded_dictionaries", "Dictionaries loaded in memory")
+        dictionary_loads = Counter("scrambled_words_dictionary_loads_total", "Dictionaries loaded on first use")
+
+        metrics = self.get_metrics()
+        live_games.set(metrics["live_games"])
+        evictions.inc(metrics["idle_evictions"], label_values=("idle",))
+        evictions.inc(metrics["capacity_evictions"], label_values=("capacity",))
+        bytes_per_game.set(metrics["estimated_bytes_per_game"])
+        loaded_dictionaries.set(metrics["loaded_dictionaries"])
+        dictionary_loads.inc(metrics["dictionary_loads"])
+        for game_state in self.games.values():
+            if game_state.sessions:
+                players_per_room.observe(len(game_state.sessions))
+        active_rooms.set(players_per_room.get_count())
+
+        pool_boards = Gauge(
+            "scrambled_words_board_pool_boards", "Boards ready in the board pool", ["dictionary", "size"]
+        )
+        pool_counters = {
+            name: Counter(f"scrambled_words_board_pool_{name}_total", documentation, ["dictionary", "size"])
+            for name, documentation in [
+                ("hits", "New rounds given a board from the pool"),
+                ("misses", "New rounds that had to generate a board"),
+                ("boards_generated", "Boards generated for the pool"),
+                ("boards_loaded", "Boards loaded from the saved pool"),
+            ]
+        }
+        for pool in self.board_pools.values():
+            label_values = (pool.dictionary, str(pool.layout))
+            pool_metrics = pool.get_metrics()
+            pool_boards.set(pool_metrics["size"], label_values=label_values)
+            for name, counter in pool_counters.items():
+                counter.inc(pool_metrics[name], label_values=label_values)
+
+        return [
+            live_games,
+            active_rooms,
+            players_per_room,
+            evictions,
+            bytes_per_game,
+            loaded_dictionaries,
+            dictionary_loads,
+            pool_boards,
+        ] + list(pool_counters.values())
 
     @staticmethod
     def _create_game_name() -> str:
@@ -60,6 +530,75 @@ class GameManager:
             game_name += random.choice(string.ascii_uppercase)
         return game_name
 
-    def _expire_game(self):
-        # TODO we should expire games so that they don't live in memory forever.
-        pass
+    def _sync_game(self, game_name: str, game_state: Optional[GameState]) -> Optional[GameState]:
+        # Another worker may have created the game or started a new round since this worker last saw it
+        round_id = self.backend.get_round_id(game_name)
+        if round_id is None:
+            if game_state:
+                self._expire_game(game_name)
+            return None
+
+        if game_state and game_state.round_id == round_id:
+            return game_state
+
+        record = self.backend.load_game(game_name)
+        if game_state:
+            game_state.restore_round(record)
+            return game_state
+
+        layout = BoardLayout.for_size(int(record["rows"]), int(record["columns"]))
+        dictionary = self._get_record_dictionary(record)
+        game_state = GameState.from_record(
+            game_name,
+            self.dictionaries.get(dictionary),
+            record,
+            scheduler=self.scheduler,
+            on_round_end=self._round_ended,
+            backend=self.backend,
+            board_pool=self.get_board_pool(layout, dictionary),
+            on_live_update=self._live_feed_updated,
+        )
+        self._add_game(game_state)
+        return game_state
+
+    def _add_game(self, game_state: GameState):
+        # A game replaced under the same name keeps its backend record, which now belongs to the new game
+        previous_game_state = self.games.pop(game_state.game_name, None)
+        if previous_game_state:
+            previous_game_state.close()
+        self.games[game_state.game_name] = game_state
+
+        # Make room by expiring the least recently used games
+        while len(self.games) > self.max_games:
+            self._expire_game(next(iter(self.games)))
+            self.capacity_evictions += 1
+
+    def _get_record_dictionary(self, record: Dict[str, str]) -> str:
+        # Rounds saved before games could choose a dictionary were played with the default dictionary
+        return record.get("dictionary") or self.dictionaries.default_name
+
+    def _dictionary_unloaded(self, dictionary: str):
+        # The games of an unloaded dictionary keep their pool, which is no longer refilled, so that the
+        # dictionary is freed once they end
+        for key in [key for key in self.board_pools if key[0] == dictionary]:
+            del self.board_pools[key]
+
+    def _live_feed_updated(self, game_state: GameState):
+        self.live_feed_updates.add(game_state.game_name)
+
+    def _round_ended(self, game_state: GameState):
+        for listener in self.round_end_listeners:
+            listener(game_state)
+
+    def _expire_game(self, game_name: str):
+        game_state = self.games.pop(game_name)
+        game_state.close()
+
+        # Other workers may still be serving a shared game, which expires from the backend on its own
+        if not self.backend.shared:
+            self.backend.delete_game(game_name)
+        LOG.debug(f"Expired game {game_name}")
+
+
+def _write_snapshot(path: str, snapshots: List[GameSnapshot]):
+    write_atomically(path, encode_snapshot(snapshots))
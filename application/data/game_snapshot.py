@@ -0,0 +1,64 @@
+import json
+import struct
+import zlib
+from typing import Dict, List, NamedTuple, Optional
+
+from application.data.board_pool import decode_board, encode_board
+from application.data.board_solver import BoardSolution
+
+DEFAULT_SNAPSHOT_FILE_NAME = "games.snapshot"
+DEFAULT_SNAPSHOT_INTERVAL_SECONDS = 30
+
+# Header layout: magic, byte order marker, the game count and the length of the compressed game states. The
+# game states are followed by the board of each game in the same order. Each game state holds the stamp of
+# its dictionary so that solutions found with another dictionary are discarded.
+_MAGIC = b"SWSNAP03"
+_BYTE_ORDER_MARKER = 0x01020304
+_HEADER = struct.Struct("=8sIII")
+
+
+class GameSnapshot(NamedTuple):
+    # The round record, guesses, scores and dictionary stamp of the game, which are plain JSON values
+    state: Dict[str, object]
+    tiles: List[str]
+    # Found with the dictionary of the stamp, so the board is solved again if that dictionary has changed since
+    solution: Optional[BoardSolution]
+
+
+def encode_snapshot(snapshots: List[GameSnapshot]) -> bytes:
+    """
+    Encodes the snapshots of every game into a compact buffer.
+
+    The game states are stored as compressed JSON and the boards in the board pool's binary format,
+    so that restoring a game does not have to solve its board again.
+    """
+    states = zlib.compress(json.dumps([snapshot.state for snapshot in snapshots], separators=(",", ":")).encode())
+    chunks = [_HEADER.pack(_MAGIC, _BYTE_ORDER_MARKER, len(snapshots), len(states)), states]
+    chunks.extend(encode_board(snapshot.tiles, snapshot.solution) for snapshot in snapshots)
+    return b"".join(chunks)
+
+
+def decode_snapshot(buffer: bytes) -> List[GameSnapshot]:
+    """
+    Decodes the snapshots encoded by encode_snapshot.
+
+    Raises:
+        ValueError: if the buffer is not a snapshot
+    """
+    magic, byte_order_marker, game_count, states_length = _HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC or byte_order_marker != _BYTE_ORDER_MARKER:
+        raise ValueError("not a game snapshot for this platform")
+
+    states_start = _HEADER.size
+    states_end = states_start + states_length
+    states = json.loads(zlib.decompress(buffer[states_start:states_end]))
+    if len(states) != game_count:
+        raise ValueError("game snapshot is truncated")
+
+    snapshots = []
+    offset = states_end
+    for state in states:
+        total_tiles = int(state["record"]["rows"]) * int(state["record"]["columns"])
+        (tiles, solution), offset = decode_board(buffer, offset, total_tiles)
+        snapshots.append(GameSnapshot(state, tiles, solution))
+    return snapshots
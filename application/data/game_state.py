@@ -1,25 +1,94 @@
+import functools
+import json
 import logging
-import random
-from collections import Counter
-from threading import Timer
-from typing import List, Set, Dict, Optional
-
-from application.data.scoring import Scoring
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, List, Set, Dict, Optional, Tuple, Union
+
+from application.data.board_layout import BoardLayout
+from application.data.board_pool import BoardPool
+from application.data.board_solver import BoardSolution, BoardSolver
+from application.data.game_snapshot import GameSnapshot
+from application.data.round_history import PlayerRound, RoundSummary
+from application.data.round_scorer import RoundScorer
 from application.data.scoring_type import ScoringType
+from application.data.state_backend import StateBackend
 from application.data.word_manager import WordManager
+from application.util.metrics import REGISTRY
+from application.util.scheduler import ScheduledTask, Scheduler
 from application.util.time_util import get_time_millis
 
-TOTAL_TILES = 25
 TOTAL_TIME_SECONDS = 3 * 60
 
+# Number of players on the leaderboard of the live feed
+LIVE_FEED_LEADERBOARD_SIZE = 10
+
+# Results of a guess, used to label the guess counter
+GUESS_VALID = "valid"
+GUESS_INVALID = "invalid"
+GUESS_DUPLICATE = "duplicate"
+GUESS_AFTER_ROUND_END = "after_round_end"
+
+GUESSES = REGISTRY.counter("scrambled_words_guesses_total", "Guesses received, by result", ["result"])
+GUESS_SECONDS = REGISTRY.histogram("scrambled_words_guess_seconds", "Time taken to validate and score a guess")
+GUESS_BATCH_SECONDS = REGISTRY.histogram(
+    "scrambled_words_guess_batch_seconds", "Time taken to validate and score a batch of guesses"
+)
+
 LOG = logging.getLogger("GameState")
 
 
+def _synchronized(method: Callable) -> Callable:
+    """
+    Runs the decorated method while holding the game's lock.
+    """
+
+    @functools.wraps(method)
+    def synchronized_method(self: "GameState", *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return synchronized_method
+
+
 class GameState:
     """
     Class representing the state of a game.
+
+    Every method that reads or changes the round holds the game's lock, so guesses, round transitions
+    and score requests for the same game never interleave. Solving a new board happens before the lock
+    is taken, and the round end listener is called after it is released, so neither holds up guesses.
+    The lock is a re-entrant threading lock, which becomes a green lock when eventlet patches threading.
     """
 
+    __slots__ = (
+        "lock",
+        "backend",
+        "game_timer",
+        "scheduler",
+        "on_round_end",
+        "board_pool",
+        "live_feed",
+        "on_live_update",
+        "layout",
+        "game_name",
+        "word_manager",
+        "scoring_type",
+        "game_tiles",
+        "expire_time",
+        "round_id",
+        "round_scorer",
+        "game_running",
+        "end_game_task",
+        "solution",
+        "scores",
+        "round_score_states",
+        "sessions",
+        "last_activity",
+    )
+
     def __init__(
         self,
         game_name: str,
@@ -27,163 +96,623 @@ class GameState:
         tiles: List[str] = None,
         scoring_type: ScoringType = ScoringType.CLASSIC,
         game_timer: bool = True,
+        layout: BoardLayout = None,
+        scheduler: Scheduler = None,
+        on_round_end: Callable[["GameState"], None] = None,
+        backend: StateBackend = None,
+        record: Dict[str, str] = None,
+        board_pool: BoardPool = None,
+        live_feed: bool = False,
+        on_live_update: Callable[["GameState"], None] = None,
+        solution: BoardSolution = None,
     ):
         """
-        Generates a new game state.
+        Generates a new game state, or restores the current round from a record saved by another worker.
+
+        The round is ended by the given scheduler. Without a scheduler the round has an expire time
+        but is only ended when end_game is called. Once a round's scores are final, on_round_end is
+        called with the game state.
+
+        Each round is saved to the backend. When the backend is shared, guesses, sessions and scores
+        are written through to it and the round is scored from every worker's guesses.
+
+        New boards are taken from the board pool if one is given, otherwise their tiles are drawn at random
+        from the letter distribution of the dictionary.
+        A restored round is solved again unless the solution of its board is given.
+
+        In live feed mode the room is shown every player's progress during the round. on_live_update is
+        called with the game state after each valid guess so that the progress can be broadcast.
         """
+        self.lock = threading.RLock()
+        self.backend = backend
         self.game_timer = game_timer
+        self.scheduler = scheduler
+        self.on_round_end = on_round_end
+        self.board_pool = board_pool
+        self.live_feed = live_feed
+        self.on_live_update = on_live_update
+        self.layout = layout if layout else BoardLayout.for_size()
         self.game_name = game_name
         self.word_manager = word_manager
         self.scoring_type = scoring_type
 
         self.game_tiles: List[str] = []
         self.expire_time: int = None
-        self.valid_guesses: Dict[str, Set[str]] = {}
-        self.word_counter: Counter = Counter()
+        self.round_id: str = None
+        self.round_scorer = RoundScorer(scoring_type)
         self.game_running = True
-        self.end_game_timer: Timer = None
+        self.end_game_task: ScheduledTask = None
+        self.solution: BoardSolution = None
 
         self.scores: Dict[str, int] = {}
 
-        self.new_board(tiles)
+        # Score state of each player for the last finished round
+        self.round_score_states: Dict[str, Dict[str, object]] = {}
+
+        # Dictionary from SocketIO session ID to the ID of the player connected through it. With a shared
+        # backend this only holds the sessions connected through this worker.
+        self.sessions: Dict[str, str] = {}
+
+        # Time of the last request for this game, used by the game manager to expire idle games
+        self.last_activity: int = self._now()
+
+        if record:
+            self.restore_round(record, solution)
+        else:
+            self.new_board(tiles)
+
+    @classmethod
+    def from_record(cls, game_name: str, word_manager: WordManager, record: Dict[str, str], **kwargs) -> "GameState":
+        """
+        Creates the game state for a game whose current round was saved by another worker.
+        """
+        return cls(
+            game_name,
+            word_manager,
+            scoring_type=ScoringType(int(record["scoring_type"])),
+            layout=BoardLayout.for_size(int(record["rows"]), int(record["columns"])),
+            record=record,
+            live_feed=record.get("live_feed") == "1",
+            **kwargs,
+        )
+
+    @classmethod
+    def from_snapshot(cls, game_name: str, word_manager: WordManager, snapshot: GameSnapshot, **kwargs) -> "GameState":
+        """
+        Creates the game state for a game saved to a snapshot before the server restarted.
+
+        The saved solution of the board is only used if the dictionary has not changed since.
+        """
+        same_dictionary = tuple(snapshot.state["dictionary_stamp"]) == word_manager.trie.stamp
+        solution = snapshot.solution if same_dictionary else None
+        game_state = cls.from_record(game_name, word_manager, snapshot.state["record"], solution=solution, **kwargs)
+        game_state.restore_snapshot(snapshot.state)
+        return game_state
 
     def new_board(self, tiles: List[str] = None):
         if tiles:
-            self.game_tiles = tiles
+            if len(tiles) != self.layout.total_tiles:
+                raise ValueError(f"A {self.layout} board needs {self.layout.total_tiles} tiles")
+            solution = self._solve(tiles)
+        elif self.board_pool is not None:
+            tiles, solution = self.board_pool.generate()
         else:
-            self.game_tiles = GameState._generate_tiles()
+            tiles = self.word_manager.letter_distribution.draw(self.layout.total_tiles)
+            solution = self._solve(tiles)
 
-        self.word_counter = Counter()
-        self.game_running = True
+        with self.lock:
+            self._start_round(tiles, solution)
 
-        # Ensure any existing timer is cancelled
-        if self.end_game_timer:
-            self.end_game_timer.cancel()
+    def restore_round(self, record: Dict[str, str], solution: BoardSolution = None):
+        """
+        Switches to the round described by a record saved by another worker.
 
-        if self.game_timer:
-            # Set up the new timer
-            self.expire_time = get_time_millis() + (TOTAL_TIME_SECONDS * 1000)
-            self.end_game_timer = Timer(TOTAL_TIME_SECONDS, self.end_game)
-            self.end_game_timer.start()
+        The board is solved locally so that guesses can be validated without asking the backend.
+        """
+        tiles = json.loads(record["tiles"])
+        if solution is None:
+            solution = self._solve(tiles)
+        with self.lock:
+            self._restore_round(record, tiles, solution)
+
+    def get_record(self) -> Dict[str, str]:
+        """
+        Returns the description of the current round that is saved to the state backend.
+        """
+        return {
+            "round_id": self.round_id,
+            "tiles": json.dumps(self.game_tiles),
+            "rows": str(self.layout.rows),
+            "columns": str(self.layout.columns),
+            "scoring_type": str(self.scoring_type.value),
+            "expire_time": str(self.expire_time) if self.expire_time is not None else "",
+            "live_feed": "1" if self.live_feed else "0",
+            "dictionary": self.word_manager.name,
+        }
+
+    @_synchronized
+    def get_snapshot(self) -> GameSnapshot:
+        """
+        Returns everything needed to restore this game after the server restarts.
+        """
+        # Copied so that the snapshot can be encoded after the lock is released
+        state = {
+            "game_name": self.game_name,
+            "record": self.get_record(),
+            # Solutions found with another version of the dictionary are solved again on restore
+            "dictionary_stamp": list(self.word_manager.trie.stamp),
+            "game_running": self.game_running,
+            "guesses": {
+                player_id: self.round_scorer.get_player_words(player_id) for player_id in self.round_scorer.players
+            },
+            "scores": dict(self.scores),
+            "round_score_states": dict(self.round_score_states),
+        }
+        return GameSnapshot(state, self.game_tiles, self.solution)
 
-        # Dictionary from player ID to Set of valid guesses
-        self.valid_guesses = {}
+    @_synchronized
+    def restore_snapshot(self, state: Dict[str, object]):
+        """
+        Restores the guesses and scores of the round saved to a snapshot, once the round itself has been restored.
+
+        A round whose time ran out while the server was down is ended by the scheduler as soon as it runs.
+        """
+        self.round_scorer.add_player_words(state["guesses"])
+        self.scores = dict(state["scores"])
+        self.round_score_states = dict(state["round_score_states"])
 
-        self._log_info("Created new board")
+        if not state["game_running"]:
+            self.game_running = False
+            self._cancel_end_game_task()
+        elif not self.game_running:
+            self.game_running = True
+            if self.scheduler is not None:
+                self.end_game_task = self.scheduler.schedule(self._now(), self.end_game)
+
+        if self.backend is not None:
+            self.backend.save_game(self.game_name, self.get_record())
 
     def end_game(self):
+        """
+        Ends the round and scores every player in a single pass.
+
+        Calling this again for a round that already ended does nothing, so the scores are only added once.
+        """
+        with self.lock:
+            scored = self._end_round()
+
+        if scored and self.on_round_end:
+            self.on_round_end(self)
+
+    @_synchronized
+    def add_session(self, session_id: str, player_id: str):
+        # Sessions connected through this worker are also kept locally for the metrics
+        self.sessions[session_id] = player_id
+        if self._is_shared():
+            self.backend.add_session(self.game_name, session_id, player_id)
+
+    @_synchronized
+    def remove_session(self, session_id: str):
+        self.sessions.pop(session_id, None)
+        if self._is_shared():
+            self.backend.remove_session(self.game_name, session_id)
+
+    @_synchronized
+    def get_sessions(self) -> Dict[str, str]:
+        """
+        Returns the dictionary from SocketIO session ID to player ID of every session in the game.
+        """
+        if self._is_shared():
+            return self.backend.get_sessions(self.game_name)
+        return dict(self.sessions)
+
+    def get_scores(self) -> Dict[str, Union[int, float]]:
+        """
+        Returns the dictionary from player ID to total score over all finished rounds.
+        """
+        if self._is_shared():
+            return self.backend.get_scores(self.game_name)
+        return self.scores
+
+    @_synchronized
+    def close(self):
+        """
+        Stops the game and releases its round state. Called when the game is expired.
+        """
+        self._cancel_end_game_task()
+
         self.game_running = False
-        self._log_info("Game ended")
+        self.solution = BoardSolution({})
+        self.round_scorer = RoundScorer(self.scoring_type, self.solution)
+        self.scores = {}
+        self.round_score_states = {}
+        self.sessions = {}
+
+    @_synchronized
+    def estimate_size_bytes(self) -> int:
+        """
+        Returns a rough estimate of the memory held by this game.
 
-    def get_game_state(self, player_id: str = None) -> Dict[str, object]:
+        Only the containers owned by the game are counted. Strings are counted once per container
+        even though many of them are shared, so the estimate errs on the high side.
+        """
+        size = sys.getsizeof(self)
+        size += sys.getsizeof(self.game_tiles)
+        size += sys.getsizeof(self.scores) + sum(sys.getsizeof(player_id) for player_id in self.scores)
+        size += self.round_scorer.estimate_size_bytes()
+        solution = self.solution
+        size += sys.getsizeof(solution.words) + sys.getsizeof(solution.word_ids) + sys.getsizeof(solution.word_paths)
+        for word, path in zip(solution.words, solution.word_paths):
+            size += sys.getsizeof(word) + sys.getsizeof(path)
+        return size
+
+    @_synchronized
+    def get_game_state(self, player_id: str = None, since_version: str = None) -> Dict[str, object]:
         """
         Returns the state of the game when a player joins or reloads the game.
 
+        The state is versioned by the round and the number of the player's valid guesses. A player who
+        reconnects during the round they last saw is only sent the difference: their guesses since that
+        version and their total score. Otherwise the full state is sent, with the tiles as one string.
+
         Args:
             player_id: the ID of the player joining or reloading the game
+            since_version: the version of the game state the player last saw, if any
 
         Returns:
-            the game state
+            the game state, or the difference from the given version marked by the delta key
         """
-        game_state = {"expire_time": self.expire_time, "tiles": self.game_tiles}
-        if player_id:
-            # Set is not serializable so turn it into a set
-            game_state["player_guesses"] = list(self.valid_guesses.get(player_id, {}))
-            game_state["player_total_score"] = self.scores.get(player_id, 0)
+        # No player_id indicates a reset of the game so send empty guesses list
+        guesses = self.round_scorer.get_player_words(player_id) if player_id else []
+        game_state: Dict[str, object] = {"version": self._get_version(len(guesses))}
+
+        seen_guesses = self._get_seen_guesses(since_version, len(guesses))
+        if seen_guesses is not None:
+            game_state["delta"] = True
+            game_state["player_guesses"] = guesses[seen_guesses:]
         else:
-            # No player_id indicates a reset of the game so send empty guesses list
-            game_state["player_guesses"] = []
+            game_state["expire_time"] = self.expire_time
+            game_state["tiles"] = "".join(self.game_tiles)
+            game_state["player_guesses"] = guesses
+
+        if player_id:
+            game_state["player_id"] = player_id
+            game_state["player_total_score"] = self.get_scores().get(player_id, 0)
         return game_state
 
+    @_synchronized
+    def get_version(self, player_id: str) -> str:
+        """
+        Returns the version of the game state as seen by the given player.
+        """
+        return self._get_version(self.round_scorer.get_word_count(player_id))
+
+    @_synchronized
     def guess_word(self, player_id: str, guessed_word: str) -> Optional[List[int]]:
         """
         Updates the game state to reflect the guessed word.
-        If the guess is not correct, the current team's turn is ended.
-        Returns the GameUpdate to send to clients.
 
         Args:
             player_id: The player
             guessed_word: The guessed word
 
         Returns:
-            whether the guess was successful
+            the tile path of the word if the guess was successful, otherwise None
         """
-        # Ensure the guessed word is all lower-case to match with the tiles
-        guessed_word = guessed_word.lower()
+        start = time.perf_counter()
+        word_path, result = self._guess_word(player_id, guessed_word)
+        GUESS_SECONDS.observe(time.perf_counter() - start)
+        GUESSES.inc(label_values=(result,))
+        return word_path
+
+    @_synchronized
+    def guess_words(self, player_id: str, guessed_words: List[str]) -> List[Optional[List[int]]]:
+        """
+        Updates the game state to reflect a batch of guessed words.
+
+        This behaves like calling guess_word for each word in order, but the round checks, the state
+        backend write and the logging happen once for the whole batch.
+
+        Args:
+            player_id: The player
+            guessed_words: The guessed words
+
+        Returns:
+            the tile path of each guessed word, or None for each guess that was not successful
+        """
+        start = time.perf_counter()
+        results: List[Optional[List[int]]] = [None] * len(guessed_words)
 
         # Ensure players are not able to guess after the game has expired
         if not self.game_running:
-            self._log_info(f"{player_id} guess word '{guessed_word}' was guessed after game ended")
-            return None
+            self._log_debug(f"{player_id} guessed {len(guessed_words)} words after game ended")
+            GUESSES.inc(len(guessed_words), label_values=(GUESS_AFTER_ROUND_END,))
+            return results
+
+        # Find the new valid words, keeping the first occurrence of words repeated in the batch
+        new_words: Dict[str, int] = {}
+        duplicates = 0
+        for index, guessed_word in enumerate(guessed_words):
+            guessed_word = guessed_word.lower()
+            if guessed_word in new_words or self.round_scorer.has_guessed(player_id, guessed_word):
+                duplicates += 1
+                continue
+
+            word_path = self.solution.get_path(guessed_word)
+            if word_path is not None:
+                new_words[guessed_word] = index
+                results[index] = word_path
+
+        if new_words and self._is_shared():
+            # The player may have guessed some of the words through another worker
+            accepted = self.backend.add_guesses(self.game_name, self.round_id, player_id, list(new_words))
+            for guessed_word, was_added in zip(list(new_words), accepted):
+                if not was_added:
+                    results[new_words.pop(guessed_word)] = None
+                    duplicates += 1
+
+        # Update the round scores of every player affected by the guesses
+        for guessed_word in new_words:
+            self.round_scorer.add_guess(player_id, guessed_word)
+        if new_words:
+            self._live_update()
+
+        self._log_debug(f"{player_id} guessed {len(guessed_words)} words of which {len(new_words)} were valid")
+        GUESS_BATCH_SECONDS.observe(time.perf_counter() - start)
+        GUESSES.inc(len(new_words), label_values=(GUESS_VALID,))
+        GUESSES.inc(duplicates, label_values=(GUESS_DUPLICATE,))
+        GUESSES.inc(len(guessed_words) - len(new_words) - duplicates, label_values=(GUESS_INVALID,))
+        return results
+
+    @_synchronized
+    def get_score_state(self, player_id: str) -> Dict[str, object]:
+        """
+        Returns the round's score for the given player.
 
-        # Ensure players cannot guess the same word multiple times
-        if guessed_word in self.valid_guesses.get(player_id, set()):
-            self._log_info(f"{player_id} guess word '{guessed_word}' has already been guessed successfully by player")
-            return None
+        Once the round has ended this is the score computed when it ended. Before that it is a preview
+        of the score so far which does not change the player's total.
 
-        # Check if the word is recognized and on the board
-        if self.word_manager.is_word(guessed_word):
-            word_is_on_board = self._word_is_on_board(guessed_word)
-            if word_is_on_board:
-                self._log_info(f"{player_id} guess word '{guessed_word}' is a valid word")
+        Args:
+            player_id: The ID of the player
 
-                # Increase the word counter to make it easier to calculate point at the end of the game
-                self.word_counter[guessed_word] += 1
+        Returns:
+            A dictionary representing the scoring state for the given player for this round
+        """
+        if not self.game_running:
+            if self._is_shared() and not self.round_score_states:
+                # The round may have been scored by another worker
+                self.round_score_states = self.backend.load_round_scores(self.game_name, self.round_id)
+            if player_id in self.round_score_states:
+                return self.round_score_states[player_id]
 
-                if player_id in self.valid_guesses:
-                    self.valid_guesses.get(player_id).add(guessed_word)
-                else:
-                    valid_guesses = set()
-                    valid_guesses.add(guessed_word)
-                    self.valid_guesses[player_id] = valid_guesses
-            else:
-                self._log_info(f"{player_id} guess word '{guessed_word}' is not on the board")
+        return self._build_score_state(player_id, self.get_scores())
 
-            return word_is_on_board
-        else:
-            self._log_info(f"{player_id} guess word '{guessed_word}' is not a recognized word")
+    @_synchronized
+    def get_round_summary(self) -> Optional[RoundSummary]:
+        """
+        Returns the board, words and scores of the round that just ended, or None if the round is still running.
+        """
+        if self.game_running:
             return None
 
-    def get_score_state(self, player_id: str) -> Dict[str, object]:
+        players = []
+        for player_id in self.round_scorer.players:
+            words = self.round_scorer.get_player_words(player_id)
+            score_state = self.round_score_states.get(player_id)
+            total_score = score_state["total_score"] if score_state else self.get_scores().get(player_id, 0)
+            players.append(PlayerRound(player_id, sorted(words), self.get_round_score(player_id), total_score))
+        return RoundSummary(
+            game_name=self.game_name,
+            round_id=self.round_id,
+            tiles="".join(self.game_tiles),
+            rows=self.layout.rows,
+            columns=self.layout.columns,
+            scoring_type=self.scoring_type.value,
+            ended_at=self._now(),
+            board_word_count=self.solution.word_count,
+            board_max_score=self.solution.max_score,
+            words_found=self.round_scorer.words_found,
+            players=players,
+        )
+
+    def get_round_score(self, player_id: str) -> Union[int, float]:
+        """
+        Returns the player's score for the current round so far.
+        """
+        return self.round_scorer.get_round_score(player_id)
+
+    @_synchronized
+    def get_leaderboard(self) -> List[Dict[str, object]]:
         """
-        Called when the player's game timer ends to get the round's score.
+        Returns every player's number of words found, round and total score, highest total first.
+
+        Totals include the current round's score while the round is running.
+        """
+        return self._build_leaderboard(self.round_scorer)
+
+    @_synchronized
+    def get_live_feed(self, leaderboard_size: int = LIVE_FEED_LEADERBOARD_SIZE) -> Dict[str, object]:
+        """
+        Returns the progress of the round shown to the whole room in live feed mode.
 
         Args:
-            player_id: The ID of the player
+            leaderboard_size: the number of players on the leaderboard
 
         Returns:
-            A dictionary representing the scoring state for the given player for this round
+            the number of distinct words found by the room, the number of words on the board, the number
+            of players with a valid guess and the leaderboard of the players with the highest totals
+        """
+        round_scorer = self.round_scorer
+        if self._is_shared() and self.game_running:
+            # Guesses made through other workers are only recorded in the backend
+            round_scorer = RoundScorer.from_guesses(
+                self.scoring_type, self.backend.get_guesses(self.game_name, self.round_id), self.solution
+            )
+
+        return {
+            "words_found": round_scorer.words_found,
+            "board_word_count": self.solution.word_count,
+            "players": round_scorer.total_players,
+            "leaderboard": self._build_leaderboard(round_scorer)[:leaderboard_size],
+        }
+
+    @property
+    def valid_guesses(self) -> Dict[str, Set[str]]:
+        """
+        Dictionary from player ID to Set of valid guesses for the current round, built on each call.
         """
+        return self.round_scorer.player_words
+
+    def _guess_word(self, player_id: str, guessed_word: str) -> Tuple[Optional[List[int]], str]:
+        # Ensure the guessed word is all lower-case to match with the tiles
+        guessed_word = guessed_word.lower()
+
+        # Ensure players are not able to guess after the game has expired
+        if not self.game_running:
+            self._log_debug(f"{player_id} guess word '{guessed_word}' was guessed after game ended")
+            return None, GUESS_AFTER_ROUND_END
+
+        # Ensure players cannot guess the same word multiple times
+        if self.round_scorer.has_guessed(player_id, guessed_word):
+            self._log_debug(f"{player_id} guess word '{guessed_word}' has already been guessed successfully by player")
+            return None, GUESS_DUPLICATE
+
+        # Check if the word is recognized and on the board
+        word_path = self.solution.get_path(guessed_word)
+        if word_path is None:
+            if LOG.isEnabledFor(logging.DEBUG):
+                if self.word_manager.is_word(guessed_word):
+                    self._log_debug(f"{player_id} guess word '{guessed_word}' is not on the board")
+                else:
+                    self._log_debug(f"{player_id} guess word '{guessed_word}' is not a recognized word")
+            return None, GUESS_INVALID
+
+        if self._is_shared():
+            # The player may have guessed the word through another worker
+            if not self.backend.add_guess(self.game_name, self.round_id, player_id, guessed_word):
+                self._log_debug(f"{player_id} guess word '{guessed_word}' has already been guessed by player")
+                return None, GUESS_DUPLICATE
+
+        self._log_debug(f"{player_id} guess word '{guessed_word}' is a valid word")
+
+        # Update the round scores of every player affected by the guess
+        self.round_scorer.add_guess(player_id, guessed_word)
+        self._live_update()
+        return word_path, GUESS_VALID
+
+    def _build_leaderboard(self, round_scorer: RoundScorer) -> List[Dict[str, object]]:
+        leaderboard = []
+        scores = self.get_scores()
+        for player_id in scores.keys() | set(round_scorer.players):
+            round_score = round_scorer.get_round_score(player_id)
+            total_score = scores.get(player_id, 0)
+            if self.game_running:
+                total_score += round_score
+            leaderboard.append(
+                {
+                    "player_id": player_id,
+                    "word_count": round_scorer.get_word_count(player_id),
+                    "round_score": round_score,
+                    "total_score": total_score,
+                }
+            )
+
+        leaderboard.sort(key=lambda entry: entry["total_score"], reverse=True)
+        return leaderboard
+
+    def _live_update(self):
+        if self.live_feed and self.on_live_update:
+            self.on_live_update(self)
+
+    def _start_round(self, tiles: List[str], solution: BoardSolution):
+        if self._is_shared() and self.game_running and self.round_id:
+            # Claim the end of the abandoned round so that no worker still timing it ends or scores it
+            self.backend.claim_round_end(self.game_name, self.round_id)
+        self._set_board(tiles, solution)
+        self.game_running = True
+        self.round_id = uuid.uuid4().hex
+
+        # Ensure any existing timer is cancelled
+        self._cancel_end_game_task()
+
+        if self.game_timer:
+            # Register the end of the new round with the scheduler
+            self.expire_time = self._now() + (TOTAL_TIME_SECONDS * 1000)
+            if self.scheduler is not None:
+                self.end_game_task = self.scheduler.schedule(self.expire_time, self.end_game)
+
+        self.round_scorer = RoundScorer(self.scoring_type, self.solution)
+        self.round_score_states = {}
+
+        if self.backend is not None:
+            self.backend.save_game(self.game_name, self.get_record())
+
+        self._log_info(f"Created new board with {self.solution.word_count} words")
+
+    def _restore_round(self, record: Dict[str, str], tiles: List[str], solution: BoardSolution):
+        self._set_board(tiles, solution)
+        self.round_id = record["round_id"]
+        self.expire_time = int(record["expire_time"]) if record["expire_time"] else None
+        self.game_running = self.expire_time is None or self.expire_time > self._now()
+
+        self._cancel_end_game_task()
+        if self.game_running and self.expire_time is not None and self.scheduler is not None:
+            self.end_game_task = self.scheduler.schedule(self.expire_time, self.end_game)
+
+        self.round_scorer = RoundScorer(self.scoring_type, self.solution)
+        self.round_score_states = {}
+
+    def _end_round(self) -> bool:
+        if not self.game_running:
+            return False
+        self.game_running = False
+
+        if self._is_shared():
+            # A round replaced by a new board through another worker was abandoned, so it is not scored
+            if self.backend.get_round_id(self.game_name) != self.round_id:
+                return False
+            # Every worker serving the game ends the round, but only one of them scores it
+            if not self.backend.claim_round_end(self.game_name, self.round_id):
+                return False
+
+            # Score the round from the guesses made through every worker
+            self.round_scorer = RoundScorer.from_guesses(
+                self.scoring_type, self.backend.get_guesses(self.game_name, self.round_id), self.solution
+            )
+
+        scores = self.get_scores()
+        self.round_score_states = {
+            player_id: self._build_score_state(player_id, scores) for player_id in self.round_scorer.players
+        }
+        if self._is_shared():
+            self.backend.add_scores(self.game_name, self.round_scorer.round_scores)
+            self.backend.save_round_scores(self.game_name, self.round_id, self.round_score_states)
+        else:
+            for player_id, score_state in self.round_score_states.items():
+                self.scores[player_id] = score_state["total_score"]
+
+        self._log_info("Game ended")
+        return True
+
+    def _build_score_state(self, player_id: str, scores: Dict[str, Union[int, float]]) -> Dict[str, object]:
         scored_words = []
         scored_words_values = []
         scored_words_guessers = []
         unscored_words = []
-        round_score = 0
-
-        # Total players is the number of players that have at least one valid guess
-        total_players = len(self.valid_guesses.keys())
 
-        valid_guesses = self.valid_guesses.get(player_id, set())
-        for valid_word in valid_guesses:
-            num_player_who_guessed_word = self.word_counter.get(valid_word)
-            word_value = Scoring.get_word_value(
-                self.scoring_type, valid_word, num_player_who_guessed_word, total_players
-            )
+        # Word values are kept current by the round scorer as guesses arrive
+        round_scorer = self.round_scorer
+        words, word_values, word_guessers = round_scorer.words, round_scorer.word_values, round_scorer.word_guessers
+        for word_id in round_scorer.get_word_ids(player_id):
+            word_value = word_values[word_id]
 
             # Record the value of any words with a non-zero value
             if word_value > 0:
-                scored_words.append(valid_word)
+                scored_words.append(words[word_id])
                 scored_words_values.append(word_value)
-                round_score += word_value
-                scored_words_guessers.append(num_player_who_guessed_word)
+                scored_words_guessers.append(len(word_guessers[word_id]))
             else:
-                unscored_words.append(valid_word)
-
-        # Update player's total score
-        if player_id in self.scores:
-            self.scores[player_id] = self.scores[player_id] + round_score
-        else:
-            self.scores[player_id] = round_score
+                unscored_words.append(words[word_id])
 
         # Send the JSON data back to the player
         return {
@@ -191,134 +720,49 @@ class GameState:
             "scored_word_values": scored_words_values,
             "scored_word_guessers": scored_words_guessers,
             "unscored_words": unscored_words,
-            "total_score": self.scores[player_id],
+            "total_score": scores.get(player_id, 0) + self.get_round_score(player_id),
+            "board_word_count": self.solution.word_count,
+            "board_max_score": self.solution.max_score,
         }
 
-    def _word_is_on_board(self, guessed_word: str) -> Optional[List[int]]:
-        possible_paths: List[List[int]] = None
+    def _get_version(self, guess_count: int) -> str:
+        return f"{self.round_id}:{guess_count}"
+
+    def _get_seen_guesses(self, since_version: Optional[str], guess_count: int) -> Optional[int]:
+        """
+        Returns the number of the player's guesses already seen at the given version, or None if the
+        version is from another round or is not valid.
+        """
+        if not isinstance(since_version, str):
+            return None
+        round_id, _, seen_guesses = since_version.partition(":")
+        if round_id != self.round_id or not seen_guesses.isdigit():
+            return None
+        seen_guesses = int(seen_guesses)
+        return seen_guesses if seen_guesses <= guess_count else None
 
-        # Iterate through each character of the guessed word
-        for character in guessed_word:
-            # Terminate early if we have no possible paths
-            if (possible_paths is not None) and (len(possible_paths) == 0):
-                break
+    def _is_shared(self) -> bool:
+        return self.backend is not None and self.backend.shared
 
-            # Find all locations where the current character is on the board.
-            character_locations = []
-            for i in range(0, len(self.game_tiles)):
-                if self.game_tiles[i] == character:
-                    character_locations.append(i)
+    def _solve(self, tiles: List[str]) -> BoardSolution:
+        return BoardSolver(self.word_manager.trie, self.layout.neighbors).solve(tiles)
 
-            if possible_paths is None:
-                # The first character will not have any previous character positions to check.
-                possible_paths = [[val] for val in character_locations]
-            else:
-                # Create a new list for possible paths so that previous paths that will not
-                # work with the new character positions are discarded.
-                new_possible_paths: List[List[int]] = []
-
-                # Check each character position to see if it can be appended to a possible path.
-                for character_location in character_locations:
-                    for possible_path in possible_paths:
-                        # We cannot use the same tile multiple times in one word.
-                        if character_location in possible_path:
-                            continue
-
-                        # If the character location is a neighbor of the last tile on a possible
-                        # path then we add this as a new possible bath for the next character.
-                        if GameState._tiles_are_neighbors(character_location, possible_path[-1]):
-                            new_possible_path = possible_path.copy()
-                            new_possible_path.append(character_location)
-                            new_possible_paths.append(new_possible_path)
-
-                # Swap in the new possible paths to discard paths that are no longer possible.
-                possible_paths = new_possible_paths
-        print(f"Possible paths for '{guessed_word}': {possible_paths}")
-        return None if len(possible_paths) == 0 else possible_paths[0]
+    def _set_board(self, tiles: List[str], solution: BoardSolution):
+        self.game_tiles = tiles
 
-    def _log_info(self, log_message: str):
-        LOG.info("[%s] %s", self.game_name, log_message)
+        # Every word on the board was found up front so that correct guesses are a dictionary lookup
+        self.solution = solution
 
-    @staticmethod
-    def _tiles_are_neighbors(tile_index_1: int, tile_index_2: int) -> bool:
-        # Calculate the relationship between the two tiles for easier calculation
-        smaller_tile = min(tile_index_1, tile_index_2)
-        larger_tile = max(tile_index_1, tile_index_2)
+    def _now(self) -> int:
+        return self.scheduler.clock() if self.scheduler is not None else get_time_millis()
 
-        # Ensure we don't go out of bounds
-        if (smaller_tile < 0) or (larger_tile >= TOTAL_TILES):
-            raise ValueError("Tile indexes invalid")
+    def _cancel_end_game_task(self):
+        if self.end_game_task:
+            self.scheduler.cancel(self.end_game_task)
+            self.end_game_task = None
 
-        difference = larger_tile - smaller_tile
+    def _log_info(self, log_message: str):
+        LOG.info("[%s] %s", self.game_name, log_message)
 
-        if larger_tile % 5 == 0:
-            # Tiles on the left-most column
-            return difference in [4, 5]
-        elif (larger_tile + 1) % 5 == 0:
-            # Tiles on the right-most column
-            return difference in [1, 5, 6]
-        else:
-            # All other tiles
-            return difference in [1, 4, 5, 6]
-
-    @staticmethod
-    def _generate_tiles() -> List[str]:
-        tiles = []
-        for i in range(0, TOTAL_TILES):
-            tiles.append(
-                random.choice(
-                    [
-                        "a",
-                        "a",
-                        "a",
-                        "a",
-                        "b",
-                        "c",
-                        "d",
-                        "d",
-                        "e",
-                        "e",
-                        "e",
-                        "e",
-                        "e",
-                        "f",
-                        "g",
-                        "h",
-                        "h",
-                        "h",
-                        "i",
-                        "i",
-                        "i",
-                        "i",
-                        "j",
-                        "k",
-                        "l",
-                        "l",
-                        "m",
-                        "n",
-                        "o",
-                        "o",
-                        "o",
-                        "o",
-                        "q",
-                        "r",
-                        "r",
-                        "s",
-                        "s",
-                        "s",
-                        "s",
-                        "t",
-                        "t",
-                        "t",
-                        "u",
-                        "u",
-                        "u",
-                        "v",
-                        "w",
-                        "x",
-                        "y",
-                        "z",
-                    ]
-                )
-            )
-        return tiles
+    def _log_debug(self, log_message: str):
+        LOG.debug("[%s] %s", self.game_name, log_message)
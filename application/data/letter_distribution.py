@@ -0,0 +1,88 @@
+import random
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+
+# Tiles of the original English boards, where letters that appear more often are more likely. Used for word
+# lists without any letters, such as the empty dictionary of the tests.
+DEFAULT_LETTERS = "aaaabcddeeeeefghhhiiiijkllmnooooqrrsssstttuuuvwxyz"
+
+VOWELS = "aeiou"
+# Letters of the default tiles that rarely combine with their neighbors
+DEFAULT_RARE_LETTERS = "jkqvwxz"
+
+# Letters that make up less of a word list than this share rarely combine with their neighbors
+RARE_LETTER_SHARE = 0.012
+# A rare letter followed by the same letter at least this often can only be played next to it, like Q and U
+COMPANION_SHARE = 0.9
+
+
+class LetterDistribution:
+    """
+    How likely each letter is to be drawn for a tile, and the letters that the board filters treat specially.
+
+    A dictionary's distribution is derived from its word list so that the boards of each word list are
+    drawn from the letters its words are made of.
+    """
+
+    def __init__(
+        self,
+        letter_counts: Dict[str, int],
+        vowels: str = VOWELS,
+        rare_letters: Iterable[str] = (),
+        companions: Dict[str, str] = None,
+    ):
+        """
+        Args:
+            letter_counts: the relative weight of each letter
+            vowels: the vowels of the language
+            rare_letters: the letters that rarely combine with their neighbors
+            companions: the letter that each letter can only be played next to, if any
+        """
+        self.letters: List[str] = sorted(letter_counts)
+        self.weights: List[int] = [letter_counts[letter] for letter in self.letters]
+        self.vowels = vowels
+        self.rare_letters = "".join(sorted(rare_letters))
+        self.companions: Dict[str, str] = companions if companions is not None else {}
+
+    @classmethod
+    def from_text(cls, text: str, vowels: str = VOWELS) -> "LetterDistribution":
+        """
+        Derives the distribution from the letters of a word list, one word per line.
+
+        Letters are weighted by how often they appear in the list. Letters rarer than RARE_LETTER_SHARE are
+        rare letters, and a rare letter almost always followed by the same letter has it as its companion.
+        """
+        text = text.lower()
+        letter_counts = {letter: count for letter, count in Counter(text).items() if letter.isalpha()}
+        if not letter_counts:
+            return DEFAULT_DISTRIBUTION
+
+        total_letters = sum(letter_counts.values())
+        rare_letters = [letter for letter, count in letter_counts.items() if count < RARE_LETTER_SHARE * total_letters]
+
+        companions = {}
+        for letter in rare_letters:
+            # Letters at the end of a word are followed by a new line, which is not matched
+            followers = Counter(re.findall(re.escape(letter) + "(.)", text))
+            if not followers:
+                continue
+            companion, count = followers.most_common(1)[0]
+            if companion.isalpha() and count >= COMPANION_SHARE * letter_counts[letter]:
+                companions[letter] = companion
+
+        return cls(letter_counts, vowels, rare_letters, companions)
+
+    @classmethod
+    def from_file(cls, word_file: str, vowels: str = VOWELS) -> "LetterDistribution":
+        with open(word_file, mode="r", encoding="utf-8") as words:
+            return cls.from_text(words.read(), vowels)
+
+    def draw(self, total_tiles: int) -> List[str]:
+        """
+        Returns the given number of tiles drawn at random, without any of the board filters.
+        """
+        return random.choices(self.letters, weights=self.weights, k=total_tiles)
+
+
+DEFAULT_DISTRIBUTION = LetterDistribution(Counter(DEFAULT_LETTERS), VOWELS, DEFAULT_RARE_LETTERS, companions={"q": "u"})
@@ -0,0 +1,98 @@
+import hashlib
+import re
+import secrets
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Player tokens are random, URL-safe strings kept by the browser across page loads and reconnects
+PLAYER_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+PLAYER_TOKEN_BYTES = 16
+
+# Number of hex digits of the token hash used as the player ID
+PLAYER_ID_LENGTH = 16
+
+
+class PlayerSession(NamedTuple):
+    player_id: str
+    room: Optional[str]
+
+
+class PlayerRegistry:
+    """
+    Index from SocketIO session ID to the player behind the session and the room the session joined.
+
+    Players are identified by a token that their browser keeps across reconnects rather than by their address,
+    so players behind the same NAT or proxy are told apart and a reconnecting player gets their guesses and
+    score back. The player ID is a hash of the token so that the token, which lets its holder play as the
+    player, is never sent to other players. As the player ID only depends on the token, every worker behind
+    a load balancer derives the same player ID without sharing the registry.
+
+    The player is resolved once when the session joins a room and every later event is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, PlayerSession] = {}
+        self._lock = threading.Lock()
+
+    def identify(self, session_id: str, player_token: Optional[str]) -> Tuple[str, Optional[str]]:
+        """
+        Registers the SocketIO session as played by the player with the given token.
+
+        Args:
+            session_id: the SocketIO session ID
+            player_token: the token sent by the client, may be missing or malformed
+
+        Returns:
+            the player ID, and a newly issued token if the given token was not valid, None otherwise
+        """
+        issued_token = None
+        if not is_valid_player_token(player_token):
+            player_token = issued_token = secrets.token_urlsafe(PLAYER_TOKEN_BYTES)
+
+        player_id = get_player_id(player_token)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            self._sessions[session_id] = PlayerSession(player_id, session.room if session else None)
+        return player_id, issued_token
+
+    def join(self, session_id: str, room: str) -> Optional[str]:
+        """
+        Records the room joined by the SocketIO session.
+
+        Returns:
+            the room the session was in before, if any
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            self._sessions[session_id] = PlayerSession(session.player_id, room)
+        return session.room
+
+    def get(self, session_id: str) -> Optional[PlayerSession]:
+        return self._sessions.get(session_id)
+
+    def get_player_id(self, session_id: str) -> Optional[str]:
+        session = self._sessions.get(session_id)
+        return session.player_id if session else None
+
+    def disconnect(self, session_id: str) -> Optional[PlayerSession]:
+        """
+        Removes the SocketIO session from the index.
+
+        Returns:
+            the player and room of the session, if it was registered
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def is_valid_player_token(player_token) -> bool:
+    return isinstance(player_token, str) and PLAYER_TOKEN_PATTERN.match(player_token) is not None
+
+
+def get_player_id(player_token: str) -> str:
+    return hashlib.sha256(player_token.encode()).hexdigest()[:PLAYER_ID_LENGTH]
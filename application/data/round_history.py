@@ -0,0 +1,318 @@
+import logging
+import os
+import sqlite3
+import time
+from collections import deque
+from contextlib import closing
+from itertools import islice
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from application.util.metrics import REGISTRY
+
+DEFAULT_HISTORY_FILE_NAME = "round_history.sqlite3"
+DEFAULT_WRITE_INTERVAL_SECONDS = 1
+# Number of rounds written in one transaction
+DEFAULT_WRITE_BATCH_SIZE = 500
+DEFAULT_PLAYER_HISTORY_LIMIT = 20
+
+ROUNDS_WRITTEN = REGISTRY.counter(
+    "scrambled_words_history_rounds_written_total", "Finished rounds saved to the round history"
+)
+HISTORY_WRITE_SECONDS = REGISTRY.histogram(
+    "scrambled_words_history_write_seconds", "Time taken to write a batch of rounds to the round history"
+)
+
+# Rounds are looked up by their game and board, and players by their ID. The players of a round are
+# clustered by player ID so that a player's history is a range scan however many rounds are stored,
+# and each player's words are stored in a single row to keep the table at one row per player per round.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    round_key INTEGER PRIMARY KEY,
+    round_id TEXT NOT NULL UNIQUE,
+    game_name TEXT NOT NULL,
+    tiles TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    columns INTEGER NOT NULL,
+    scoring_type INTEGER NOT NULL,
+    ended_at INTEGER NOT NULL,
+    board_word_count INTEGER NOT NULL,
+    board_max_score INTEGER NOT NULL,
+    words_found INTEGER NOT NULL,
+    player_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rounds_by_tiles ON rounds (tiles);
+CREATE INDEX IF NOT EXISTS rounds_by_game ON rounds (game_name, ended_at);
+CREATE TABLE IF NOT EXISTS round_players (
+    player_id TEXT NOT NULL,
+    round_key INTEGER NOT NULL REFERENCES rounds (round_key),
+    round_score REAL NOT NULL,
+    total_score REAL NOT NULL,
+    word_count INTEGER NOT NULL,
+    words TEXT NOT NULL,
+    PRIMARY KEY (player_id, round_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS round_players_by_round ON round_players (round_key);
+"""
+
+_INSERT_ROUND = """
+INSERT OR IGNORE INTO rounds (
+    round_id, game_name, tiles, rows, columns, scoring_type, ended_at,
+    board_word_count, board_max_score, words_found, player_count
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_PLAYER_ROUND = """
+INSERT OR IGNORE INTO round_players (player_id, round_key, round_score, total_score, word_count, words)
+VALUES (?, (SELECT round_key FROM rounds WHERE round_id = ?), ?, ?, ?, ?)
+"""
+
+_SELECT_PLAYER_HISTORY = """
+SELECT rounds.round_key, round_id, game_name, tiles, ended_at, round_score, total_score, word_count, words
+FROM round_players JOIN rounds USING (round_key)
+WHERE player_id = ? AND round_key < ?
+ORDER BY round_key DESC
+LIMIT ?
+"""
+
+_SELECT_BOARD_STATS = """
+SELECT COUNT(*), AVG(words_found), MAX(words_found), AVG(player_count), MAX(board_word_count), MAX(board_max_score)
+FROM rounds
+WHERE tiles = ?
+"""
+
+_SELECT_BOARD_BEST_SCORE = """
+SELECT MAX(round_score)
+FROM round_players
+WHERE round_key IN (SELECT round_key FROM rounds WHERE tiles = ?)
+"""
+
+LOG = logging.getLogger("RoundHistory")
+
+
+class PlayerRound(NamedTuple):
+    player_id: str
+    words: List[str]
+    round_score: Union[int, float]
+    total_score: Union[int, float]
+
+
+class RoundSummary(NamedTuple):
+    game_name: str
+    round_id: str
+    tiles: str
+    rows: int
+    columns: int
+    scoring_type: int
+    ended_at: int
+    board_word_count: int
+    board_max_score: int
+    words_found: int
+    players: List[PlayerRound]
+
+
+class RoundHistory:
+    """
+    Append-only store of every finished round, with its board and each player's words and scores.
+
+    Rounds are queued when they end and written to SQLite in batches by a background task, one
+    transaction per batch, so that the handler ending a round never waits on the disk. The writes and the
+    lookups are run by the given executor, which can run them in OS threads. The writes go through their
+    own connection and each lookup opens its own, so that lookups never wait on a batch being written.
+    A batch stays queued until it is written, and rounds still queued when the process stops are written
+    by close.
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_WRITE_BATCH_SIZE, execute: Callable[..., object] = None):
+        """
+        Args:
+            path: the SQLite database file, created if it does not exist
+            batch_size: the most rounds written in one transaction
+            execute: called with a blocking database function and its arguments to run each write and lookup,
+                such as eventlet.tpool.execute to keep them off the green threads, defaults to running them in
+                the calling thread
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.execute = execute if execute else _call
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Written to by a single writer at a time, which may be in another OS thread
+        self._write_connection = sqlite3.connect(path, check_same_thread=False)
+        self._write_connection.execute("PRAGMA journal_mode=WAL")
+        self._write_connection.execute("PRAGMA synchronous=NORMAL")
+        self._write_connection.executescript(_SCHEMA)
+
+        # Rounds that ended but are not written yet
+        self._pending: Deque[RoundSummary] = deque()
+
+        self.rounds_written = 0
+
+    def record_round(self, round_summary: Optional[RoundSummary]):
+        """
+        Queues a finished round to be written by the next batch.
+        """
+        if round_summary is not None:
+            self._pending.append(round_summary)
+
+    def flush(self) -> int:
+        """
+        Writes every queued round. Each batch is only taken off the queue once it is written, so a failed
+        batch is written again by the next flush.
+
+        Returns:
+            the number of rounds written
+        """
+        return self._flush(self.execute)
+
+    def _flush(self, execute: Callable[..., object]) -> int:
+        written = 0
+        while self._pending:
+            # Rounds are only appended while a batch is written, so the batch stays at the front of the queue
+            batch = list(islice(self._pending, self.batch_size))
+            write_seconds = execute(self._write, batch)
+            for _ in batch:
+                self._pending.popleft()
+            written += len(batch)
+
+            # Recorded here rather than by the write, which may run in an OS thread that must not take green locks
+            self.rounds_written += len(batch)
+            ROUNDS_WRITTEN.inc(len(batch))
+            HISTORY_WRITE_SECONDS.observe(write_seconds)
+        return written
+
+    def run_writer(self, sleep: Callable[[float], None], interval_seconds: float = DEFAULT_WRITE_INTERVAL_SECONDS):
+        """
+        Writes the queued rounds at a fixed interval forever. Meant to be run as a single background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            interval_seconds: the time between batches
+        """
+        while True:
+            sleep(interval_seconds)
+            try:
+                self.flush()
+            except Exception:
+                LOG.exception("Failed to write the round history")
+
+    def get_player_history(
+        self, player_id: str, limit: int = DEFAULT_PLAYER_HISTORY_LIMIT, before_round_key: int = None
+    ) -> List[Dict[str, object]]:
+        """
+        Returns the player's rounds, most recent first.
+
+        Args:
+            player_id: the player
+            limit: the most rounds returned
+            before_round_key: only return rounds older than this round key, used to fetch the next page
+
+        Returns:
+            the board, words and scores of each round
+        """
+        if before_round_key is None:
+            before_round_key = 2**63 - 1
+        rows = self.execute(self._select_player_history, player_id, before_round_key, limit)
+
+        return [
+            {
+                "round_key": round_key,
+                "round_id": round_id,
+                "game_name": game_name,
+                "tiles": tiles,
+                "ended_at": ended_at,
+                "round_score": round_score,
+                "total_score": total_score,
+                "word_count": word_count,
+                "words": words.split(" ") if words else [],
+            }
+            for round_key, round_id, game_name, tiles, ended_at, round_score, total_score, word_count, words in rows
+        ]
+
+    def get_board_stats(self, tiles: str) -> Dict[str, object]:
+        """
+        Returns how the board with the given tiles played over every round it was used in.
+        """
+        board_stats, (best_round_score,) = self.execute(self._select_board_stats, tiles)
+        rounds, average_words_found, most_words_found, average_players, word_count, max_score = board_stats
+
+        return {
+            "tiles": tiles,
+            "rounds": rounds,
+            "board_word_count": word_count,
+            "board_max_score": max_score,
+            "average_words_found": average_words_found,
+            "most_words_found": most_words_found,
+            "average_players": average_players,
+            "best_round_score": best_round_score,
+        }
+
+    def close(self):
+        """
+        Writes the queued rounds and closes the database.
+        """
+        # The process is stopping, so the rounds are written in the calling thread rather than by the executor
+        self._flush(_call)
+        self._write_connection.close()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rounds waiting to be written.
+        """
+        return len(self._pending)
+
+    # Each lookup opens its own connection, which WAL mode lets read while a batch is written, so that lookups
+    # run by the executor in different threads never share one
+
+    def _select_player_history(self, player_id: str, before_round_key: int, limit: int) -> List[tuple]:
+        with closing(sqlite3.connect(self.path)) as connection:
+            return connection.execute(_SELECT_PLAYER_HISTORY, (player_id, before_round_key, limit)).fetchall()
+
+    def _select_board_stats(self, tiles: str) -> Tuple[tuple, tuple]:
+        with closing(sqlite3.connect(self.path)) as connection:
+            return (
+                connection.execute(_SELECT_BOARD_STATS, (tiles,)).fetchone(),
+                connection.execute(_SELECT_BOARD_BEST_SCORE, (tiles,)).fetchone(),
+            )
+
+    def _write(self, batch: List[RoundSummary]) -> float:
+        start = time.perf_counter()
+        round_rows = [
+            (
+                summary.round_id,
+                summary.game_name,
+                summary.tiles,
+                summary.rows,
+                summary.columns,
+                summary.scoring_type,
+                summary.ended_at,
+                summary.board_word_count,
+                summary.board_max_score,
+                summary.words_found,
+                len(summary.players),
+            )
+            for summary in batch
+        ]
+        player_rows = [
+            (
+                player.player_id,
+                summary.round_id,
+                player.round_score,
+                player.total_score,
+                len(player.words),
+                " ".join(player.words),
+            )
+            for summary in batch
+            for player in summary.players
+        ]
+
+        # Rounds written again after a failed batch are ignored by their unique keys
+        with self._write_connection:
+            self._write_connection.executemany(_INSERT_ROUND, round_rows)
+            self._write_connection.executemany(_INSERT_PLAYER_ROUND, player_rows)
+
+        return time.perf_counter() - start
+
+
+def _call(function: Callable[..., object], *args) -> object:
+    return function(*args)
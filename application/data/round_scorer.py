@@ -0,0 +1,310 @@
+import sys
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy
+
+from application.data.board_solver import BoardSolution
+from application.data.scoring import Scoring
+from application.data.scoring_type import ScoringType
+
+Score = Union[int, float]
+
+# Type codes of the arrays holding word IDs and player indexes in guess order
+_WORD_ID_TYPE = "I"
+_PLAYER_INDEX_TYPE = "I"
+
+
+class RoundScorer:
+    """
+    Keeps every player's score for the current round up to date as valid guesses arrive.
+
+    A word is worth the same to everyone who guessed it, so each word's current value is cached and a
+    change in value is applied to the word's guessers only. The value of a word changes when another
+    player guesses it, and under distributed scoring also when a new player makes their first guess,
+    since words guessed by every player are worth nothing.
+
+    Words are interned to the word IDs of the board's solution and players to their index in the round.
+    Each player's guesses are a bitset of word IDs, kept along with the word IDs in guess order, and the
+    guessers of each word are an array of player indexes. The round therefore holds no copy of any word,
+    and checking and counting guesses is integer arithmetic.
+    """
+
+    __slots__ = (
+        "scoring_type",
+        "words",
+        "word_ids",
+        "players",
+        "player_indexes",
+        "player_guesses",
+        "guess_order",
+        "player_scores",
+        "word_guessers",
+        "word_values",
+        "_owns_words",
+        "_words_by_count",
+    )
+
+    def __init__(self, scoring_type: ScoringType, solution: BoardSolution = None):
+        """
+        Args:
+            scoring_type: the scoring type of the round
+            solution: the solution of the round's board, whose word IDs are used for the guesses
+        """
+        self.scoring_type = scoring_type
+
+        # The word of each word ID and the ID of each word, shared with the solution until a word that is
+        # not in the solution is guessed, which is given the next ID in a copy owned by the round
+        self.words: List[str] = solution.words if solution is not None else []
+        self.word_ids: Dict[str, int] = solution.word_ids if solution is not None else {}
+        self._owns_words = solution is None
+
+        # The player ID of each player index and the index of each player ID
+        self.players: List[str] = []
+        self.player_indexes: Dict[str, int] = {}
+        # By player index, the bitset of guessed word IDs, the word IDs in guess order and the round score
+        self.player_guesses: List[int] = []
+        self.guess_order: List[array] = []
+        self.player_scores: List[Score] = []
+
+        # By word ID, the indexes of the players who guessed it in guess order and its current value
+        self.word_guessers: Dict[int, array] = {}
+        self.word_values: Dict[int, Score] = {}
+
+        # Word IDs grouped by their number of guessers, used to find the words guessed by every player
+        self._words_by_count: Dict[int, Set[int]] = defaultdict(set)
+
+    @classmethod
+    def from_guesses(
+        cls, scoring_type: ScoringType, guesses: Iterable[Tuple[str, str]], solution: BoardSolution = None
+    ) -> "RoundScorer":
+        """
+        Scores a whole round at once from its valid guesses.
+
+        Args:
+            scoring_type: the scoring type of the round
+            guesses: the player ID and word of each valid guess
+            solution: the solution of the round's board
+
+        Returns:
+            the round scorer of the round
+        """
+        player_words: Dict[str, List[str]] = defaultdict(list)
+        for player_id, word in guesses:
+            player_words[player_id].append(word)
+
+        round_scorer = cls(scoring_type, solution)
+        round_scorer.add_player_words(player_words)
+        return round_scorer
+
+    @property
+    def total_players(self) -> int:
+        """
+        The number of players that have at least one valid guess.
+        """
+        return len(self.players)
+
+    @property
+    def words_found(self) -> int:
+        """
+        The number of distinct words guessed by any player.
+        """
+        return len(self.word_guessers)
+
+    @property
+    def player_words(self) -> Dict[str, Set[str]]:
+        """
+        Dictionary from player ID to Set of valid guesses, built on each call.
+        """
+        return {player_id: set(self.get_player_words(player_id)) for player_id in self.players}
+
+    @property
+    def round_scores(self) -> Dict[str, Score]:
+        """
+        Dictionary from player ID to round score, built on each call.
+        """
+        return dict(zip(self.players, self.player_scores))
+
+    def add_guess(self, player_id: str, word: str) -> bool:
+        """
+        Records a valid guess and updates the scores of every player affected by it.
+
+        Args:
+            player_id: the player
+            word: the valid word
+
+        Returns:
+            False if the player had already guessed the word
+        """
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = self._intern_word(word)
+        player_index = self.player_indexes.get(player_id)
+        if player_index is None:
+            player_index = self._add_player(player_id)
+
+            if self.scoring_type != ScoringType.CLASSIC:
+                # Words that every other player guessed were worthless but are not guessed by this player
+                for everyone_word_id in list(self._words_by_count[self.total_players - 1]):
+                    self._revalue(everyone_word_id)
+        elif (self.player_guesses[player_index] >> word_id) & 1:
+            return False
+
+        self.player_guesses[player_index] |= 1 << word_id
+        self.guess_order[player_index].append(word_id)
+        guessers = self.word_guessers.get(word_id)
+        if guessers is None:
+            guessers = self.word_guessers[word_id] = array(_PLAYER_INDEX_TYPE)
+        guessers.append(player_index)
+
+        guesser_count = len(guessers)
+        self._words_by_count[guesser_count - 1].discard(word_id)
+        self._words_by_count[guesser_count].add(word_id)
+
+        self._revalue(word_id, new_guesser=player_index)
+        return True
+
+    def add_player_words(self, player_words: Dict[str, List[str]]):
+        """
+        Records the valid guesses of a whole round at once, such as a round restored from a snapshot.
+
+        The round is scored again in one batch with Scoring.score_room, which gives the same scores as
+        adding the guesses one at a time.
+
+        Args:
+            player_words: the dictionary from player ID to the player's valid guesses
+        """
+        word_ids, word_guessers = self.word_ids, self.word_guessers
+        for player_id, words in player_words.items():
+            player_index = self.player_indexes.get(player_id)
+            if player_index is None:
+                player_index = self._add_player(player_id)
+            guesses = self.player_guesses[player_index]
+            guess_order = self.guess_order[player_index]
+            for word in words:
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = self._intern_word(word)
+                    word_ids = self.word_ids
+                if not (guesses >> word_id) & 1:
+                    guesses |= 1 << word_id
+                    guess_order.append(word_id)
+                    guessers = word_guessers.get(word_id)
+                    if guessers is None:
+                        guessers = word_guessers[word_id] = array(_PLAYER_INDEX_TYPE)
+                    guessers.append(player_index)
+            self.player_guesses[player_index] = guesses
+
+        guess_words = numpy.concatenate(
+            [numpy.frombuffer(order, dtype=numpy.uint32) for order in self.guess_order]
+            or [numpy.zeros(0, numpy.uint32)]
+        ).astype(numpy.intp)
+        guess_players = numpy.repeat(numpy.arange(self.total_players), [len(order) for order in self.guess_order])
+        word_lengths = numpy.fromiter((len(word) for word in self.words), dtype=numpy.intp, count=len(self.words))
+
+        word_values, player_scores = Scoring.score_room(
+            self.scoring_type, word_lengths, guess_players, guess_words, self.total_players
+        )
+        guessed_word_ids = list(self.word_guessers)
+        self.word_values = dict(zip(guessed_word_ids, word_values[guessed_word_ids].tolist()))
+        self.player_scores = player_scores.tolist()
+
+        self._words_by_count.clear()
+        for word_id, guessers in self.word_guessers.items():
+            self._words_by_count[len(guessers)].add(word_id)
+
+    def has_guessed(self, player_id: str, word: str) -> bool:
+        player_index = self.player_indexes.get(player_id)
+        word_id = self.word_ids.get(word)
+        if player_index is None or word_id is None:
+            return False
+        return bool((self.player_guesses[player_index] >> word_id) & 1)
+
+    def get_player_words(self, player_id: str) -> List[str]:
+        """
+        Returns the player's valid guesses in the order they were made.
+        """
+        words = self.words
+        return [words[word_id] for word_id in self.get_word_ids(player_id)]
+
+    def get_word_count(self, player_id: str) -> int:
+        player_index = self.player_indexes.get(player_id)
+        return len(self.guess_order[player_index]) if player_index is not None else 0
+
+    def get_word_ids(self, player_id: str) -> array:
+        """
+        Returns the word IDs of the player's valid guesses in the order they were made.
+        """
+        player_index = self.player_indexes.get(player_id)
+        return self.guess_order[player_index] if player_index is not None else array(_WORD_ID_TYPE)
+
+    def get_guesser_count(self, word: str) -> int:
+        word_id = self.word_ids.get(word)
+        return len(self.word_guessers.get(word_id, ())) if word_id is not None else 0
+
+    def get_word_value(self, word: str) -> Score:
+        word_id = self.word_ids.get(word)
+        return self.word_values.get(word_id, 0) if word_id is not None else 0
+
+    def get_round_score(self, player_id: str) -> Score:
+        player_index = self.player_indexes.get(player_id)
+        score = self.player_scores[player_index] if player_index is not None else 0
+        if self.scoring_type == ScoringType.DISTRIBUTED_FRACTIONAL:
+            # Remove the error accumulated by adding and subtracting rounded values
+            return round(score, 2)
+        return score
+
+    def estimate_size_bytes(self) -> int:
+        """
+        Returns a rough estimate of the memory held by the round, not counting the words shared with the solution.
+        """
+        size = sys.getsizeof(self)
+        for container in (self.players, self.player_indexes, self.player_guesses, self.guess_order):
+            size += sys.getsizeof(container)
+        for container in (self.player_scores, self.word_guessers, self.word_values):
+            size += sys.getsizeof(container)
+        size += sum(sys.getsizeof(player_id) for player_id in self.players)
+        size += sum(sys.getsizeof(guesses) for guesses in self.player_guesses)
+        size += sum(sys.getsizeof(order) for order in self.guess_order)
+        size += sum(sys.getsizeof(guessers) for guessers in self.word_guessers.values())
+        if self._owns_words:
+            size += sys.getsizeof(self.words) + sys.getsizeof(self.word_ids)
+            size += sum(sys.getsizeof(word) for word in self.words)
+        return size
+
+    def _intern_word(self, word: str) -> int:
+        if not self._owns_words:
+            # Words recognized without being in the dictionary trie are not in the solution
+            self.words = list(self.words)
+            self.word_ids = dict(self.word_ids)
+            self._owns_words = True
+        word_id = len(self.words)
+        self.words.append(word)
+        self.word_ids[word] = word_id
+        return word_id
+
+    def _add_player(self, player_id: str) -> int:
+        player_index = len(self.players)
+        self.players.append(player_id)
+        self.player_indexes[player_id] = player_index
+        self.player_guesses.append(0)
+        self.guess_order.append(array(_WORD_ID_TYPE))
+        self.player_scores.append(0)
+        return player_index
+
+    def _revalue(self, word_id: int, new_guesser: Optional[int] = None):
+        guessers = self.word_guessers[word_id]
+        new_value = Scoring.get_word_value(self.scoring_type, self.words[word_id], len(guessers), self.total_players)
+        old_value = self.word_values.get(word_id, 0)
+        self.word_values[word_id] = new_value
+
+        # The new guesser has not been credited with the word yet so they receive its full value
+        player_scores = self.player_scores
+        if new_value != old_value:
+            delta = new_value - old_value
+            for player_index in guessers:
+                if player_index != new_guesser:
+                    player_scores[player_index] += delta
+        if new_guesser is not None:
+            player_scores[new_guesser] += new_value
@@ -1,24 +1,21 @@
-from typing import Union
+from typing import Dict, Tuple, Union
+
+import numpy
 
 from application.data.scoring_type import ScoringType
 
+# Classic value of a word by its length. Words longer than the table are worth as much as the longest entry.
+CLASSIC_WORD_VALUES = (1, 1, 1, 1, 1, 2, 3, 5, 8, 11)
+MAX_SCORED_WORD_LENGTH = len(CLASSIC_WORD_VALUES) - 1
+
+# Tables of word values by word length and number of guessers for each scoring type, grown as rooms get larger
+_value_tables: Dict[ScoringType, numpy.ndarray] = {}
+
 
 class Scoring:
     @staticmethod
     def get_classic_word_value(word: str) -> int:
-        if len(word) <= 4:
-            return 1
-        elif len(word) == 5:
-            return 2
-        elif len(word) == 6:
-            return 3
-        elif len(word) == 7:
-            return 5
-        elif len(word) == 8:
-            return 8
-        elif len(word) > 8:
-            return 11
-        return 0
+        return CLASSIC_WORD_VALUES[min(len(word), MAX_SCORED_WORD_LENGTH)]
 
     @staticmethod
     def get_word_value(
@@ -43,3 +40,67 @@ class Scoring:
             else:
                 # Integer division always rounds down
                 return int(distributed_value)
+
+    @staticmethod
+    def get_value_table(scoring_type: ScoringType, max_guessers: int) -> numpy.ndarray:
+        """
+        Returns the value of a word by its length, capped at MAX_SCORED_WORD_LENGTH, and its number of guessers.
+
+        The values are those of get_word_value for a word that not every player guessed, so the table is the
+        same whatever the number of players. Tables are computed once and grown to the next power of two.
+
+        Args:
+            scoring_type: the scoring type
+            max_guessers: the largest number of guessers the table must cover
+
+        Returns:
+            the table indexed by [word length, number of guessers]
+        """
+        table = _value_tables.get(scoring_type)
+        if table is not None and table.shape[1] > max_guessers:
+            return table
+
+        size = 1
+        while size <= max_guessers:
+            size *= 2
+        # Computed with get_word_value so that the rounding of fractional values is exactly the same
+        table = numpy.array(
+            [
+                [0] + [Scoring.get_word_value(scoring_type, "a" * length, guessers, 0) for guessers in range(1, size)]
+                for length in range(MAX_SCORED_WORD_LENGTH + 1)
+            ],
+            dtype=numpy.float64 if scoring_type == ScoringType.DISTRIBUTED_FRACTIONAL else numpy.int64,
+        )
+        _value_tables[scoring_type] = table
+        return table
+
+    @staticmethod
+    def score_room(
+        scoring_type: ScoringType,
+        word_lengths: numpy.ndarray,
+        guess_players: numpy.ndarray,
+        guess_words: numpy.ndarray,
+        total_players: int,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Scores every word and every player of a room in one pass over its guesses.
+
+        Args:
+            scoring_type: the scoring type
+            word_lengths: the length of each word, indexed by word ID
+            guess_players: the player ID of each guess, from 0 to total_players - 1
+            guess_words: the word ID of each guess, where no player guessed the same word twice
+            total_players: the number of players with at least one guess
+
+        Returns:
+            the value of each word by word ID and the round score of each player by player ID
+        """
+        guesser_counts = numpy.bincount(guess_words, minlength=len(word_lengths))
+        table = Scoring.get_value_table(scoring_type, int(guesser_counts.max(initial=0)))
+        word_values = table[numpy.minimum(word_lengths, MAX_SCORED_WORD_LENGTH), guesser_counts]
+        if scoring_type != ScoringType.CLASSIC:
+            # Words that everyone guessed should not count for points
+            word_values[guesser_counts == total_players] = 0
+
+        player_scores = numpy.bincount(guess_players, weights=word_values[guess_words], minlength=total_players)
+        return word_values, player_scores.astype(word_values.dtype)
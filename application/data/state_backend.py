@@ -0,0 +1,323 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+
+from application.data.round_scorer import Score
+
+# Separates the player ID from the word when a guess is stored as a single set and list member
+GUESS_SEPARATOR = "\0"
+
+
+class StateBackend(ABC):
+    """
+    Storage for the parts of a game that must be seen by every worker serving it.
+
+    Game records are flat dictionaries of strings describing the current round (tiles, layout,
+    scoring type, expire time and round ID). Boards and their solutions are not stored: every worker
+    rebuilds them from the record once per round so that guesses are validated locally.
+
+    A backend that is not shared only ever serves one worker, in which case the game state keeps
+    guesses, sessions and scores in its own memory and only uses the backend for game records.
+
+    Guesses are returned in the order they were made, so that every worker rebuilds each player's words
+    in the same order as a single worker would.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def save_game(self, game_name: str, record: Dict[str, str]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_game(self, game_name: str) -> Optional[Dict[str, str]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_round_id(self, game_name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_game(self, game_name: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_guess(self, game_name: str, round_id: str, player_id: str, word: str) -> bool:
+        """
+        Records a valid guess.
+
+        Returns:
+            False if the player had already guessed the word this round
+        """
+        raise NotImplementedError
+
+    def add_guesses(self, game_name: str, round_id: str, player_id: str, words: List[str]) -> List[bool]:
+        """
+        Records a batch of valid guesses by one player.
+
+        Returns:
+            for each word, False if the player had already guessed it this round
+        """
+        return [self.add_guess(game_name, round_id, player_id, word) for word in words]
+
+    @abstractmethod
+    def get_guesses(self, game_name: str, round_id: str) -> List[Tuple[str, str]]:
+        """
+        Returns the (player ID, word) pairs of every valid guess of the round, in the order they were made.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim_round_end(self, game_name: str, round_id: str) -> bool:
+        """
+        Atomically claims the job of scoring a round.
+
+        Returns:
+            True for exactly one caller per round
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_round_scores(self, game_name: str, round_id: str, score_states: Dict[str, Dict[str, object]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_round_scores(self, game_name: str, round_id: str) -> Dict[str, Dict[str, object]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_scores(self, game_name: str, round_scores: Dict[str, Score]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_scores(self, game_name: str) -> Dict[str, Score]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_session(self, game_name: str, session_id: str, player_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_session(self, game_name: str, session_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_sessions(self, game_name: str) -> Dict[str, str]:
+        raise NotImplementedError
+
+
+class MemoryStateBackend(StateBackend):
+    """
+    Keeps the shared state in the memory of this process.
+
+    This is the default for a single worker. Passing shared=True makes game states write their
+    guesses, sessions and scores through to it, which lets tests stand in several workers with one backend.
+    """
+
+    def __init__(self, shared: bool = False):
+        self.shared = shared
+        self.games: Dict[str, Dict[str, str]] = {}
+        # The guesses of each round, in the order they were made
+        self.guesses: Dict[Tuple[str, str], Dict[Tuple[str, str], None]] = {}
+        self.claimed_rounds: Set[Tuple[str, str]] = set()
+        self.round_scores: Dict[Tuple[str, str], Dict[str, Dict[str, object]]] = {}
+        self.scores: Dict[str, Dict[str, Score]] = {}
+        self.sessions: Dict[str, Dict[str, str]] = {}
+
+    def save_game(self, game_name: str, record: Dict[str, str]):
+        previous = self.games.get(game_name)
+        if previous and previous["round_id"] != record["round_id"]:
+            self._delete_round(game_name, previous["round_id"])
+        self.games[game_name] = dict(record)
+
+    def load_game(self, game_name: str) -> Optional[Dict[str, str]]:
+        record = self.games.get(game_name)
+        return dict(record) if record else None
+
+    def get_round_id(self, game_name: str) -> Optional[str]:
+        record = self.games.get(game_name)
+        return record["round_id"] if record else None
+
+    def delete_game(self, game_name: str):
+        record = self.games.pop(game_name, None)
+        if record:
+            self._delete_round(game_name, record["round_id"])
+        self.scores.pop(game_name, None)
+        self.sessions.pop(game_name, None)
+
+    def add_guess(self, game_name: str, round_id: str, player_id: str, word: str) -> bool:
+        guesses = self.guesses.setdefault((game_name, round_id), {})
+        if (player_id, word) in guesses:
+            return False
+        guesses[(player_id, word)] = None
+        return True
+
+    def get_guesses(self, game_name: str, round_id: str) -> List[Tuple[str, str]]:
+        return list(self.guesses.get((game_name, round_id), ()))
+
+    def claim_round_end(self, game_name: str, round_id: str) -> bool:
+        if (game_name, round_id) in self.claimed_rounds:
+            return False
+        self.claimed_rounds.add((game_name, round_id))
+        return True
+
+    def save_round_scores(self, game_name: str, round_id: str, score_states: Dict[str, Dict[str, object]]):
+        self.round_scores[(game_name, round_id)] = score_states
+
+    def load_round_scores(self, game_name: str, round_id: str) -> Dict[str, Dict[str, object]]:
+        return self.round_scores.get((game_name, round_id), {})
+
+    def add_scores(self, game_name: str, round_scores: Dict[str, Score]):
+        scores = self.scores.setdefault(game_name, {})
+        for player_id, round_score in round_scores.items():
+            scores[player_id] = scores.get(player_id, 0) + round_score
+
+    def get_scores(self, game_name: str) -> Dict[str, Score]:
+        return dict(self.scores.get(game_name, {}))
+
+    def add_session(self, game_name: str, session_id: str, player_id: str):
+        self.sessions.setdefault(game_name, {})[session_id] = player_id
+
+    def remove_session(self, game_name: str, session_id: str):
+        self.sessions.get(game_name, {}).pop(session_id, None)
+
+    def get_sessions(self, game_name: str) -> Dict[str, str]:
+        return dict(self.sessions.get(game_name, {}))
+
+    def _delete_round(self, game_name: str, round_id: str):
+        self.guesses.pop((game_name, round_id), None)
+        self.claimed_rounds.discard((game_name, round_id))
+        self.round_scores.pop((game_name, round_id), None)
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Keeps the shared state in Redis so that any worker can serve any game.
+
+    Every key of a game expires after the idle TTL, which is refreshed whenever the game record is
+    saved, so abandoned games are cleaned up by Redis itself. Round data expires with the round.
+
+    The guesses of a round are kept in a set, which tells whether a player already guessed a word, and
+    in a list, which keeps their order. Both are written in the same pipeline so that a guess is still one
+    round trip. The list also holds guesses that were already in the set, which are skipped when it is read.
+    """
+
+    shared = True
+
+    def __init__(self, client, idle_ttl_seconds: int):
+        """
+        Args:
+            client: a redis-py compatible client created with decode_responses=True
+            idle_ttl_seconds: how long the keys of an unused game are kept
+        """
+        self.client = client
+        self.idle_ttl_seconds = idle_ttl_seconds
+
+    @classmethod
+    def from_url(cls, url: str, idle_ttl_seconds: int) -> "RedisStateBackend":
+        # Imported here so that the redis package is only needed when a Redis URL is configured
+        import redis
+
+        return cls(redis.Redis.from_url(url, decode_responses=True), idle_ttl_seconds)
+
+    def save_game(self, game_name: str, record: Dict[str, str]):
+        pipeline = self.client.pipeline()
+        pipeline.hset(self._game_key(game_name), mapping=record)
+        for key in (self._game_key(game_name), self._scores_key(game_name), self._sessions_key(game_name)):
+            pipeline.expire(key, self.idle_ttl_seconds)
+        pipeline.execute()
+
+    def load_game(self, game_name: str) -> Optional[Dict[str, str]]:
+        record = self.client.hgetall(self._game_key(game_name))
+        return record if record else None
+
+    def get_round_id(self, game_name: str) -> Optional[str]:
+        return self.client.hget(self._game_key(game_name), "round_id")
+
+    def delete_game(self, game_name: str):
+        self.client.delete(self._game_key(game_name), self._scores_key(game_name), self._sessions_key(game_name))
+
+    def add_guess(self, game_name: str, round_id: str, player_id: str, word: str) -> bool:
+        return self.add_guesses(game_name, round_id, player_id, [word])[0]
+
+    def add_guesses(self, game_name: str, round_id: str, player_id: str, words: List[str]) -> List[bool]:
+        if not words:
+            return []
+        key = self._round_key(game_name, round_id, "guesses")
+        order_key = self._round_key(game_name, round_id, "guess_order")
+        members = [f"{player_id}{GUESS_SEPARATOR}{word}" for word in words]
+        pipeline = self.client.pipeline()
+        for member in members:
+            pipeline.sadd(key, member)
+        pipeline.rpush(order_key, *members)
+        pipeline.expire(key, self.idle_ttl_seconds)
+        pipeline.expire(order_key, self.idle_ttl_seconds)
+        return [added == 1 for added in pipeline.execute()[: len(members)]]
+
+    def get_guesses(self, game_name: str, round_id: str) -> List[Tuple[str, str]]:
+        members = self.client.lrange(self._round_key(game_name, round_id, "guess_order"), 0, -1)
+        # Only the first of a player's guesses of a word was added to the set
+        return [tuple(member.split(GUESS_SEPARATOR, 1)) for member in dict.fromkeys(members)]
+
+    def claim_round_end(self, game_name: str, round_id: str) -> bool:
+        key = self._round_key(game_name, round_id, "ended")
+        return bool(self.client.set(key, "1", nx=True, ex=self.idle_ttl_seconds))
+
+    def save_round_scores(self, game_name: str, round_id: str, score_states: Dict[str, Dict[str, object]]):
+        if not score_states:
+            return
+        key = self._round_key(game_name, round_id, "scores")
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, mapping={player_id: json.dumps(state) for player_id, state in score_states.items()})
+        pipeline.expire(key, self.idle_ttl_seconds)
+        pipeline.execute()
+
+    def load_round_scores(self, game_name: str, round_id: str) -> Dict[str, Dict[str, object]]:
+        states = self.client.hgetall(self._round_key(game_name, round_id, "scores"))
+        return {player_id: json.loads(state) for player_id, state in states.items()}
+
+    def add_scores(self, game_name: str, round_scores: Dict[str, Score]):
+        if not round_scores:
+            return
+        key = self._scores_key(game_name)
+        pipeline = self.client.pipeline()
+        for player_id, round_score in round_scores.items():
+            pipeline.hincrbyfloat(key, player_id, round_score)
+        pipeline.expire(key, self.idle_ttl_seconds)
+        pipeline.execute()
+
+    def get_scores(self, game_name: str) -> Dict[str, Score]:
+        scores = {}
+        for player_id, score in self.client.hgetall(self._scores_key(game_name)).items():
+            score = round(float(score), 2)
+            scores[player_id] = int(score) if score.is_integer() else score
+        return scores
+
+    def add_session(self, game_name: str, session_id: str, player_id: str):
+        key = self._sessions_key(game_name)
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, session_id, player_id)
+        pipeline.expire(key, self.idle_ttl_seconds)
+        pipeline.execute()
+
+    def remove_session(self, game_name: str, session_id: str):
+        self.client.hdel(self._sessions_key(game_name), session_id)
+
+    def get_sessions(self, game_name: str) -> Dict[str, str]:
+        return self.client.hgetall(self._sessions_key(game_name))
+
+    @staticmethod
+    def _game_key(game_name: str) -> str:
+        return f"game:{game_name}"
+
+    @staticmethod
+    def _scores_key(game_name: str) -> str:
+        return f"game:{game_name}:scores"
+
+    @staticmethod
+    def _sessions_key(game_name: str) -> str:
+        return f"game:{game_name}:sessions"
+
+    @staticmethod
+    def _round_key(game_name: str, round_id: str, name: str) -> str:
+        return f"game:{game_name}:round:{round_id}:{name}"
@@ -1,21 +1,80 @@
+import logging
 import os
-from typing import Set
+from typing import List, Optional, Set
+
+from application.data.letter_distribution import VOWELS, LetterDistribution
+from application.data.word_trie import WordTrie
 
 FILE_LOCATION = os.path.dirname(os.path.realpath(__file__))
+WORDS_FILE = f"{FILE_LOCATION}/../static/words.txt"
+DEFAULT_DICTIONARY = "english"
+
+LOG = logging.getLogger("WordManager")
 
 
 class WordManager:
-    def __init__(self, words: Set[str] = None):
+    def __init__(
+        self, words: Set[str] = None, word_file: str = WORDS_FILE, name: str = DEFAULT_DICTIONARY, vowels: str = VOWELS
+    ):
+        """
+        Args:
+            words: the words of the dictionary, read from the word file if not given
+            word_file: the word list, one word per line
+            name: the name of the dictionary that games choose it by
+            vowels: the vowels of the dictionary's language
+        """
+        self.name = name
+        self.vowels = vowels
+        self.word_file = word_file if words is None else None
+        self._letter_distribution: Optional[LetterDistribution] = None
         if words is None:
-            self.words = set()
-            with open(f"{FILE_LOCATION}/../static/words.txt", mode="r") as word_file:
-                for line in word_file:
-                    line = line.strip().lower()
-                    self.words.add(line)
-
-            print(f"Loaded {len(self.words)} words.")
+            self.trie = WordManager._load_compiled_trie(word_file)
+            LOG.info(f"Loaded {len(self.trie)} words.")
         else:
-            self.words = words
+            self.trie = WordTrie.from_words(words)
+            self._letter_distribution = LetterDistribution.from_text("\n".join(words), vowels)
+
+    @property
+    def letter_distribution(self) -> LetterDistribution:
+        """
+        How likely each letter is on the boards of this dictionary, derived from the word list on first use.
+        """
+        if self._letter_distribution is None:
+            self._letter_distribution = LetterDistribution.from_file(self.word_file, self.vowels)
+        return self._letter_distribution
 
     def is_word(self, word: str) -> bool:
-        return word.lower() in self.words
+        return self.trie.is_word(word.lower())
+
+    def has_prefix(self, prefix: str) -> bool:
+        return self.trie.has_prefix(prefix.lower())
+
+    def words_with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        return self.trie.words_with_prefix(prefix.lower(), limit)
+
+    @staticmethod
+    def _load_compiled_trie(word_file: str) -> WordTrie:
+        """
+        Memory-maps the compiled trie for the given word list, compiling it first if it is missing or stale.
+
+        Every worker maps the same file so the dictionary pages are shared between processes.
+        """
+        compiled_file = os.path.splitext(word_file)[0] + ".trie"
+
+        if os.path.exists(compiled_file):
+            try:
+                trie = WordTrie.load(compiled_file)
+                if trie.is_current(word_file):
+                    return trie
+            except ValueError:
+                LOG.warning(f"Ignoring unreadable compiled dictionary {compiled_file}")
+
+        LOG.info(f"Compiling dictionary {word_file}")
+        try:
+            WordTrie.compile_file(word_file, compiled_file)
+        except OSError:
+            # Fall back to a private in-memory copy if the static directory is read-only
+            LOG.warning(f"Could not write compiled dictionary {compiled_file}")
+            with open(word_file, mode="r") as words:
+                return WordTrie.from_words(words)
+        return WordTrie.load(compiled_file)
@@ -0,0 +1,256 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Iterable, List, Optional, Tuple, Union
+
+from application.util.file_util import write_atomically
+
+# Header layout: magic, byte order marker, node count, edge count, word count, source size, source mtime
+_MAGIC = b"SWTRIE01"
+_BYTE_ORDER_MARKER = 0x01020304
+_HEADER = struct.Struct("=8sIIIIQQ")
+
+ROOT_NODE = 0
+
+# Single byte labels, indexed by byte value, to avoid allocating one per edge followed
+_LABELS = [bytes((value,)) for value in range(256)]
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+class WordTrie:
+    """
+    Read-only trie stored as flat arrays inside a single buffer.
+
+    The buffer can be a memory-mapped file so that every process which opens the same compiled
+    dictionary shares one copy of the pages instead of building its own set of strings.
+
+    Nodes are numbered in breadth-first order with the root at 0. The outgoing edges of node ``n``
+    occupy the slots ``[first_edge[n], first_edge[n + 1])`` of the edge arrays and are sorted by label.
+    """
+
+    def __init__(self, buffer: Buffer):
+        (
+            magic,
+            byte_order_marker,
+            self.node_count,
+            self.edge_count,
+            self.word_count,
+            self.source_size,
+            self.source_mtime_ns,
+        ) = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or byte_order_marker != _BYTE_ORDER_MARKER:
+            raise ValueError("Buffer is not a compiled word trie for this platform")
+
+        self._buffer = buffer
+        view = memoryview(buffer)
+
+        offset = _HEADER.size
+        first_edge_end = offset + 4 * (self.node_count + 1)
+        self._first_edge = view[offset:first_edge_end].cast("I")
+
+        offset = first_edge_end
+        terminal_end = offset + self.node_count
+        self._terminal = view[offset:terminal_end]
+
+        offset = _align(terminal_end)
+        targets_end = offset + 4 * self.edge_count
+        self._edge_targets = view[offset:targets_end].cast("I")
+
+        # Labels are searched with find() directly on the underlying buffer
+        self._labels_offset = targets_end
+
+    @classmethod
+    def from_words(cls, words: Iterable[str], source_size: int = 0, source_mtime_ns: int = 0) -> "WordTrie":
+        """
+        Builds an in-memory trie from the given words.
+
+        Args:
+            words: the words to store
+            source_size: size of the file the words were read from, used to detect stale compiled files
+            source_mtime_ns: modification time of the file the words were read from
+
+        Returns:
+            the trie
+        """
+        return cls(_compile(words, source_size, source_mtime_ns))
+
+    @classmethod
+    def load(cls, path: str) -> "WordTrie":
+        """
+        Memory-maps a compiled trie file.
+
+        Args:
+            path: the path of the compiled file
+
+        Returns:
+            the trie
+        """
+        with open(path, mode="rb") as trie_file:
+            buffer = mmap.mmap(trie_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    @staticmethod
+    def compile_file(source_path: str, compiled_path: str):
+        """
+        Compiles a word list with one word per line into a trie file.
+
+        The file is written to a temporary location first and then moved into place so that
+        concurrent readers never observe a partially written file.
+
+        Args:
+            source_path: the word list
+            compiled_path: where to write the compiled trie
+        """
+        stat = os.stat(source_path)
+        with open(source_path, mode="r") as word_file:
+            buffer = _compile(word_file, stat.st_size, stat.st_mtime_ns)
+
+        write_atomically(compiled_path, buffer)
+
+    def is_current(self, source_path: str) -> bool:
+        """
+        Returns whether this trie was compiled from the current version of the given word list.
+        """
+        stat = os.stat(source_path)
+        return self.source_size == stat.st_size and self.source_mtime_ns == stat.st_mtime_ns
+
+    def child(self, node: int, label: bytes) -> int:
+        """
+        Follows the edge with the given single byte label.
+
+        Args:
+            node: the node to start from
+            label: the edge label
+
+        Returns:
+            the child node, or -1 if there is no such edge
+        """
+        start = self._labels_offset + self._first_edge[node]
+        end = self._labels_offset + self._first_edge[node + 1]
+        index = self._buffer.find(label, start, end)
+        if index < 0:
+            return -1
+        return self._edge_targets[index - self._labels_offset]
+
+    def walk(self, node: int, key: bytes) -> int:
+        """
+        Follows the edges spelling out the given key.
+
+        Returns:
+            the node reached, or -1 if the key leaves the trie
+        """
+        for byte in key:
+            node = self.child(node, _LABELS[byte])
+            if node < 0:
+                return -1
+        return node
+
+    def is_terminal(self, node: int) -> bool:
+        """
+        Returns whether a word ends at the given node.
+        """
+        return self._terminal[node] != 0
+
+    def is_word(self, word: str) -> bool:
+        node = self.walk(ROOT_NODE, word.encode())
+        return node >= 0 and self.is_terminal(node)
+
+    def has_prefix(self, prefix: str) -> bool:
+        return self.walk(ROOT_NODE, prefix.encode()) >= 0
+
+    def words_with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Returns the words starting with the given prefix in sorted order.
+
+        Args:
+            prefix: the prefix
+            limit: the maximum number of words to return
+
+        Returns:
+            the words
+        """
+        words: List[str] = []
+        start = self.walk(ROOT_NODE, prefix.encode())
+        if start < 0:
+            return words
+
+        # Depth-first traversal in label order so the words come out sorted
+        stack = [(start, prefix.encode())]
+        while stack:
+            node, key = stack.pop()
+            if self.is_terminal(node):
+                words.append(key.decode())
+                if limit is not None and len(words) >= limit:
+                    break
+
+            first = self._first_edge[node]
+            last = self._first_edge[node + 1]
+            for edge in range(last - 1, first - 1, -1):
+                label = self._buffer[self._labels_offset + edge]
+                stack.append((self._edge_targets[edge], key + _LABELS[label]))
+        return words
+
+    @property
+    def stamp(self) -> Tuple[int, int, int, int]:
+        """
+        Identifies the dictionary, so that data derived from it can be discarded when the dictionary changes.
+        """
+        return self.word_count, self.node_count, self.source_size, self.source_mtime_ns
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def __contains__(self, word: str) -> bool:
+        return self.is_word(word)
+
+
+def _align(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def _compile(words: Iterable[str], source_size: int, source_mtime_ns: int) -> bytes:
+    # Build a nested dictionary trie first and then flatten it breadth-first
+    root: dict = {}
+    word_count = 0
+    for word in words:
+        word = word.strip().lower()
+        if not word:
+            continue
+
+        node = root
+        for byte in word.encode():
+            node = node.setdefault(byte, {})
+        if None not in node:
+            node[None] = True
+            word_count += 1
+
+    first_edge = array("I")
+    terminal = bytearray()
+    edge_targets = array("I")
+    edge_labels = bytearray()
+
+    queue = [root]
+    next_node = 1
+    for node in queue:
+        first_edge.append(len(edge_targets))
+        terminal.append(1 if None in node else 0)
+        for label in sorted(key for key in node if key is not None):
+            edge_labels.append(label)
+            edge_targets.append(next_node)
+            queue.append(node[label])
+            next_node += 1
+    first_edge.append(len(edge_targets))
+
+    output = bytearray(
+        _HEADER.pack(
+            _MAGIC, _BYTE_ORDER_MARKER, len(queue), len(edge_targets), word_count, source_size, source_mtime_ns
+        )
+    )
+    output += first_edge.tobytes()
+    output += terminal
+    output += bytes(_align(len(output)) - len(output))
+    output += edge_targets.tobytes()
+    output += edge_labels
+    return bytes(output)
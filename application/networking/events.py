@@ -1,16 +1,76 @@
+import functools
 import logging
+import time
+from typing import Callable, List, Optional
 
 import flask
 from flask import current_app
-from flask_socketio import emit, join_room
+from flask_socketio import emit, join_room, leave_room
 
-from application import GameManager, GAME_MANAGER_CONFIG_KEY
+from application import GameManager, GAME_MANAGER_CONFIG_KEY, PLAYER_REGISTRY_CONFIG_KEY, RATE_LIMITER_CONFIG_KEY
+from application.data.game_state import GameState
+from application.data.player_registry import PlayerRegistry
+from application.util.metrics import REGISTRY
+from application.util.rate_limiter import RateLimiter
 from .. import socketio
 
 LOG = logging.getLogger("GameState")
 
+# The most words accepted in one batched guesses event, no more than the burst of the guess rate limit so that a
+# full batch can be accepted
+MAX_BATCH_GUESSES = 20
 
-@socketio.on("join")
+SOCKET_EVENTS = REGISTRY.counter("scrambled_words_socket_events_total", "SocketIO events received, by event", ["event"])
+DROPPED_SOCKET_EVENTS = REGISTRY.counter(
+    "scrambled_words_socket_events_dropped_total",
+    "SocketIO events dropped for going over a rate limit, by event and limit",
+    ["event", "limit"],
+)
+SOCKET_EVENT_SECONDS = REGISTRY.histogram(
+    "scrambled_words_socket_event_seconds", "Time taken to handle a SocketIO event, by event", ["event"]
+)
+LIVE_FEED_BROADCASTS = REGISTRY.counter(
+    "scrambled_words_live_feed_broadcasts_total", "Live feed updates broadcast to a room"
+)
+
+
+def _on_event(
+    event: str, limited_as: str = None, cost: Callable[[tuple], int] = None
+) -> Callable[[Callable], Callable]:
+    """
+    Registers a SocketIO event handler that is counted and timed in the metrics.
+
+    Events over the rate limit of their session or room are dropped without a reply before the handler runs.
+
+    Args:
+        event: the name of the event
+        limited_as: the event whose rate limits the event counts against, defaults to the event itself
+        cost: returns the number of tokens the event takes given its arguments, defaults to one
+    """
+    limited_event = limited_as if limited_as else event
+
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def instrumented_handler(*args):
+            tokens = cost(args) if cost else 1
+            limit = _get_rate_limiter().check(limited_event, flask.request.sid, _get_room(args), tokens)
+            if limit is not None:
+                DROPPED_SOCKET_EVENTS.inc(label_values=(event, limit))
+                return None
+
+            start = time.perf_counter()
+            try:
+                return handler(*args)
+            finally:
+                SOCKET_EVENTS.inc(label_values=(event,))
+                SOCKET_EVENT_SECONDS.observe(time.perf_counter() - start, label_values=(event,))
+
+        return socketio.on(event)(instrumented_handler)
+
+    return decorator
+
+
+@_on_event("join")
 def joined_event(message):
     """
         Received when a player joins a game.
@@ -20,18 +80,30 @@ def joined_event(message):
     join_room(room)
 
     session_id = flask.request.sid
-    player_id = _get_player_id()
+    player_registry = _get_player_registry()
+    player_id, issued_token = player_registry.identify(session_id, message.get("player_token"))
+    if issued_token:
+        # The player's browser keeps the token so that they are the same player when they reconnect
+        emit("player_token", {"player_token": issued_token}, to=session_id)
+
+    previous_room = player_registry.join(session_id, room)
+    if previous_room and previous_room != room:
+        leave_room(previous_room)
+        _get_game_manager().remove_session(previous_room, session_id)
 
     game_state = _get_game_manager().get_game_state(room)
     if game_state:
         LOG.info(f"User {player_id} has joined room {room}")
+        game_state.add_session(session_id, player_id)
         # Only send the game_state update to the SocketIO session ID as the other players do not need to know
-        emit("game_state", game_state.get_game_state(player_id=player_id), to=session_id)
+        # A reconnecting player sends the version they last saw and is only sent what changed since
+        since_version = message.get("version")
+        emit("game_state", game_state.get_game_state(player_id, since_version=since_version), to=session_id)
     else:
         LOG.warning(f"User {player_id} has joined invalid room {room}")
 
 
-@socketio.on("guess")
+@_on_event("guess")
 def guess_word_event(message):
     """
     Received when a player guesses a word.
@@ -39,20 +111,74 @@ def guess_word_event(message):
 
     session_id = flask.request.sid
     player_id = _get_player_id()
-    LOG.info(f"Received guess from {player_id}: {message}")
+    LOG.debug("Received guess from %s: %s", player_id, message)
 
     room = message["room"]
     guessed_word = message["guess"]
 
     game_state = _get_game_manager().get_game_state(room)
+    if not game_state:
+        LOG.warning(f"Received guess from Player {player_id} for invalid game {room}")
+        return
+
     word_path = game_state.guess_word(player_id, guessed_word)
 
-    emit("guess_reply", {"valid": word_path is not None, "guess": guessed_word, "path": word_path}, to=session_id)
+    guess_reply = {
+        "valid": word_path is not None,
+        "guess": guessed_word,
+        "path": word_path,
+        "version": game_state.get_version(player_id),
+    }
+    emit("guess_reply", guess_reply, to=session_id)
 
 
-@socketio.on("new_game")
+def _get_guesses(message) -> Optional[List[str]]:
+    # Only a list of words is a batch, anything else would be sliced or iterated into other guesses
+    guesses = message.get("guesses") if isinstance(message, dict) else None
+    if not isinstance(guesses, list) or not all(isinstance(guess, str) for guess in guesses):
+        return None
+    return guesses[:MAX_BATCH_GUESSES]
+
+
+def _count_guesses(args: tuple) -> int:
+    # A batch of guesses takes as many guess tokens as the words that are handled, so batching does not raise the limit
+    guesses = _get_guesses(args[0]) if args else None
+    return max(1, len(guesses)) if guesses is not None else 1
+
+
+@_on_event("guesses", limited_as="guess", cost=_count_guesses)
+def guess_words_event(message):
+    """
+    Received when a player submits several guesses at once.
+    """
+
+    session_id = flask.request.sid
+    player_id = _get_player_id()
+    LOG.debug("Received guesses from %s: %s", player_id, message)
+
+    room = message["room"]
+    guessed_words = _get_guesses(message)
+    if guessed_words is None:
+        LOG.warning(f"Received guesses from Player {player_id} for game {room} that are not a list of words")
+        return
+
+    game_state = _get_game_manager().get_game_state(room)
+    if not game_state:
+        LOG.warning(f"Received guesses from Player {player_id} for invalid game {room}")
+        return
+
+    word_paths = game_state.guess_words(player_id, guessed_words)
+
+    results = [
+        {"valid": word_path is not None, "guess": guessed_word, "path": word_path}
+        for guessed_word, word_path in zip(guessed_words, word_paths)
+    ]
+    emit("guesses_reply", {"results": results, "version": game_state.get_version(player_id)}, to=session_id)
+
+
+@_on_event("new_game")
 def new_game_event(message):
-    LOG.debug(f"Received new_game: {message}")
+    LOG.debug("Received new_game: %s", message)
 
     room = message["room"]
 
@@ -65,8 +191,11 @@ def new_game_event(message):
     emit("game_state", game_state.get_game_state(), room=room)
 
 
-@socketio.on("timer_expired")
+@_on_event("timer_expired")
 def timer_expired_event(message):
+    """
+    Received when a player's countdown ends without the server's game_over broadcast, e.g. after a reconnect.
+    """
     LOG.debug(f"Received timer_expired: {message}")
 
     session_id = flask.request.sid
@@ -75,14 +204,63 @@ def timer_expired_event(message):
 
     game_state = _get_game_manager().get_game_state(room)
 
-    if game_state:
-        emit("game_over", game_state.get_score_state(player_id), to=session_id)
-    else:
+    if not game_state:
         LOG.warning(f"Received timer_expired message from Player {player_id} for invalid game {room}")
+    elif game_state.game_running:
+        # The player's clock is ahead of the server so the broadcast will follow when the round ends
+        LOG.debug(f"Received timer_expired message from Player {player_id} before game {room} ended")
+    else:
+        emit("game_over", game_state.get_score_state(player_id), to=session_id)
+
+
+@_on_event("disconnect")
+def disconnect_event(*args):
+    player_session = _get_player_registry().disconnect(flask.request.sid)
+    if player_session and player_session.room:
+        _get_game_manager().remove_session(player_session.room, flask.request.sid)
+
+
+def broadcast_game_over(game_state: GameState):
+    """
+    Sends every connected player their score once the round ends.
+
+    The score states are computed once per round by the game state, so this is a single pass over the sessions.
+    """
+    for session_id, player_id in game_state.get_sessions().items():
+        socketio.emit("game_over", game_state.get_score_state(player_id), to=session_id)
+
+
+def broadcast_live_feed(game_state: GameState):
+    """
+    Sends the round's progress to every player in a live feed game.
+
+    This is called at most once per tick for each room, and a room emit is serialized once for all its players.
+    """
+    socketio.emit("live_feed", game_state.get_live_feed(), to=game_state.game_name)
+    LIVE_FEED_BROADCASTS.inc()
 
 
 def _get_player_id() -> str:
-    return flask.request.remote_addr
+    player_id = _get_player_registry().get_player_id(flask.request.sid)
+    if player_id is None:
+        # The session sent an event before joining a room, so it plays as a new player
+        player_id, _ = _get_player_registry().identify(flask.request.sid, None)
+    return player_id
+
+
+def _get_room(args: tuple) -> Optional[str]:
+    # The room named by the event's message, checked before the handler validates the message
+    message = args[0] if args else None
+    room = message.get("room") if isinstance(message, dict) else None
+    return room.upper() if isinstance(room, str) else None
+
+
+def _get_rate_limiter() -> RateLimiter:
+    return current_app.config[RATE_LIMITER_CONFIG_KEY]
+
+
+def _get_player_registry() -> PlayerRegistry:
+    return current_app.config[PLAYER_REGISTRY_CONFIG_KEY]
 
 
 def _get_game_manager() -> GameManager:
@@ -1,19 +1,28 @@
 import logging
+import re
 
-from flask import current_app, redirect, render_template, request
+from flask import current_app, jsonify, redirect, render_template, request
 
-from application import GAME_MANAGER_CONFIG_KEY
+from application import GAME_MANAGER_CONFIG_KEY, ROUND_HISTORY_CONFIG_KEY
+from application.data.board_layout import BoardLayout
 from application.data.game_manager import GameManager
+from application.data.round_history import DEFAULT_PLAYER_HISTORY_LIMIT, RoundHistory
 from application.data.scoring_type import ScoringType
+from application.util.metrics import CONTENT_TYPE, REGISTRY
 from . import main
 
-
 LOG = logging.getLogger("Routes")
 
+# The most rounds returned in one page of a player's history
+MAX_PLAYER_HISTORY_LIMIT = 100
+
 
 @main.route("/")
 def index():
-    return render_template("index.html")
+    dictionaries = _get_game_manager().dictionaries
+    return render_template(
+        "index.html", dictionaries=dictionaries.get_dictionaries(), default_dictionary=dictionaries.default_name
+    )
 
 
 @main.route("/games/<game_name>")
@@ -28,6 +37,9 @@ def game_page(game_name: str):
 @main.route("/create_game", methods=["POST"])
 def create_game():
     scoring_type = None
+    layout = None
+    live_feed = False
+    dictionary = None
     if request.form:
         scoring_type_string: str = request.form.get("scoring-type", "classic")
         if "(fractional)" in scoring_type_string.lower():
@@ -37,11 +49,54 @@ def create_game():
         else:
             scoring_type = ScoringType.CLASSIC
 
-    LOG.info(f"Creating game with scoring type {scoring_type}")
+        board_size_string: str = request.form.get("board-size", "5x5")
+        board_size_match = re.match(r"\s*(\d+)\s*x\s*(\d+)", board_size_string.lower())
+        if not board_size_match:
+            return "Invalid board size!", 400
+        try:
+            layout = BoardLayout.for_size(int(board_size_match.group(1)), int(board_size_match.group(2)))
+        except ValueError:
+            return "Invalid board size!", 400
+
+        live_feed = request.form.get("live-feed") is not None
+
+        dictionary = request.form.get("dictionary")
+        if dictionary is not None and dictionary not in _get_game_manager().dictionaries:
+            return "Invalid dictionary!", 400
 
-    game_state = _get_game_manager().create_game(scoring_type)
+    LOG.info(
+        f"Creating game with scoring type {scoring_type}, board size {layout}, live feed {live_feed} "
+        f"and dictionary {dictionary}"
+    )
+
+    game_state = _get_game_manager().create_game(scoring_type, layout, live_feed, dictionary)
     return redirect(f"/games/{game_state.game_name}", code=302)
 
 
+@main.route("/history/players/<player_id>")
+def player_history(player_id: str):
+    """
+    Returns a page of the player's finished rounds, most recent first. Pass the round_key of the last round
+    of a page as the before parameter to get the next page.
+    """
+    limit = max(1, min(request.args.get("limit", DEFAULT_PLAYER_HISTORY_LIMIT, type=int), MAX_PLAYER_HISTORY_LIMIT))
+    before_round_key = request.args.get("before", type=int)
+    return jsonify(_get_round_history().get_player_history(player_id, limit, before_round_key))
+
+
+@main.route("/history/boards/<tiles>")
+def board_stats(tiles: str):
+    return jsonify(_get_round_history().get_board_stats(tiles.lower()))
+
+
+@main.route("/metrics")
+def metrics():
+    return REGISTRY.render(), 200, {"Content-Type": CONTENT_TYPE}
+
+
 def _get_game_manager() -> GameManager:
     return current_app.config[GAME_MANAGER_CONFIG_KEY]
+
+
+def _get_round_history() -> RoundHistory:
+    return current_app.config[ROUND_HISTORY_CONFIG_KEY]
@@ -1,4 +1,21 @@
 let expireTimeMillis = null;
+let gameOverReceived = false;
+
+// How long to wait for the server's game_over broadcast before asking for the score directly
+const GAME_OVER_FALLBACK_MILLIS = 3000;
+
+// Guesses submitted within this window are sent to the server together
+const GUESS_BATCH_MILLIS = 50;
+let pendingGuesses = [];
+
+// ID of this player, used to find them on the live feed leaderboard
+let playerId = null;
+
+// Version of the game state last received from the server, sent on reconnect so only the changes are sent back
+let stateVersion = null;
+
+// Identifies the player across page loads and reconnects, so players sharing an address are told apart
+const PLAYER_TOKEN_KEY = 'scrambledWordsPlayerToken';
 
 $(document).ready(function () {
     const socket = io.connect('https://' + document.domain + ':' + location.port);
@@ -7,7 +24,12 @@ $(document).ready(function () {
 
     socket.on('connect', function () {
         console.log('Webhook initiated');
-        socket.emit('join', {'room': roomName});
+        socket.emit('join', {'room': roomName, 'player_token': get_player_token(), 'version': stateVersion});
+    });
+
+    socket.on('player_token', function (data) {
+        // Issued by the server when this browser had no valid token
+        save_player_token(data.player_token);
     });
 
     socket.on('guess_reply', function (data) {
@@ -16,19 +38,53 @@ $(document).ready(function () {
         if (data.valid) {
             add_valid_guess(data.guess, data.path);
         }
+        advance_state_version(data.valid ? 1 : 0, data.version);
+    });
+
+    socket.on('guesses_reply', function (data) {
+        console.log(data);
+
+        let validGuesses = 0;
+        data.results.forEach(function (result) {
+            if (result.valid) {
+                add_valid_guess(result.guess, result.path);
+                validGuesses += 1;
+            }
+        });
+        advance_state_version(validGuesses, data.version);
     });
 
     socket.on("game_state", function (data) {
         console.log(data);
 
-        // Update tiles
-        data.tiles.forEach(function (item, index) {
+        stateVersion = data.version;
+        if (data.hasOwnProperty("player_id")) {
+            playerId = data.player_id;
+        }
+
+        // The server only sends the changes since the version sent on reconnect during the same round
+        if (data.delta) {
+            data.player_guesses.forEach(function (item, index) {
+                add_valid_guess(item);
+            });
+
+            const totalScoreDiv = document.getElementById("total-score-div");
+            totalScoreDiv.innerHTML = String(data.player_total_score);
+            return;
+        }
+
+        // The live feed of the previous round no longer applies
+        clear_live_feed();
+
+        // Update tiles, which are sent as a single string
+        Array.from(data.tiles).forEach(function (item, index) {
             const tileElement = document.getElementById(`tile-${index}`);
             tileElement.innerHTML = item;
         });
 
         // Update countdown
         expireTimeMillis = data.expire_time;
+        gameOverReceived = false;
 
         // Update player's list of valid guesses
         const validWordsDiv = document.getElementById("valid-words-div");
@@ -57,9 +113,33 @@ $(document).ready(function () {
         guessWordInputElement.focus();
     });
 
+    // Only sent in live feed games, at most a few times per second however many guesses are made
+    socket.on("live_feed", function (data) {
+        document.getElementById("live-feed-container").hidden = false;
+        document.getElementById("live-feed-words-found").innerHTML = `${data.words_found} / ${data.board_word_count}`;
+
+        const leaderboardList = document.getElementById("live-feed-leaderboard");
+        leaderboardList.innerHTML = "";
+        data.leaderboard.forEach(function (entry, index) {
+            const listItemNode = document.createElement("LI");
+            const name = entry.player_id === playerId ? "You" : `Player ${entry.player_id.substring(0, 4)}`;
+            listItemNode.appendChild(document.createTextNode(`${name}: ${entry.word_count} words, ${entry.total_score}`));
+            if (entry.player_id === playerId) {
+                listItemNode.classList.add("live-feed-player");
+            }
+            leaderboardList.appendChild(listItemNode);
+        });
+    });
+
     socket.on("game_over", function (data) {
         console.log(data);
 
+        // The server broadcasts game_over when the round ends but it may also answer a fallback request
+        if (gameOverReceived) {
+            return;
+        }
+        gameOverReceived = true;
+
         let roundScore = 0;
 
         data.scored_words.forEach(function (item, index) {
@@ -109,7 +189,13 @@ $(document).ready(function () {
         } else {
             minutesRemaining = 0;
             secondsRemaining = 0;
-            socket.emit('timer_expired', {'room': roomName});
+            // The server sends the score when the round ends, so only ask for it if that message was
+            // missed, e.g. because the player reconnected after the round ended.
+            window.setTimeout(function () {
+                if (!gameOverReceived) {
+                    socket.emit('timer_expired', {'room': roomName});
+                }
+            }, GAME_OVER_FALLBACK_MILLIS);
             // Set variables to indicate game is over
             expireTimeMillis = null;
             end_game();
@@ -128,17 +214,42 @@ function end_game() {
     guessButtonElement.setAttributeNode(disabledAttribute);
 }
 
+// Adopts the version of a guess reply if no other guesses by this player were made in between, e.g. in another tab
+function advance_state_version(validGuesses, version) {
+    if (stateVersion == null || version == null) {
+        return;
+    }
+
+    const [roundId, guessCount] = stateVersion.split(':');
+    const [replyRoundId, replyGuessCount] = version.split(':');
+    if (roundId === replyRoundId && Number(guessCount) + validGuesses === Number(replyGuessCount)) {
+        stateVersion = version;
+    }
+}
+
 function add_valid_guess(valid_guess, path) {
+    // Guesses sent again after a reconnect are already shown
+    if (document.getElementById(`valid-guess-${valid_guess.toLowerCase()}`)) {
+        return;
+    }
+
     const paragraphNode = document.createElement("P");
     paragraphNode.id = `valid-guess-${valid_guess.toLowerCase()}`;
     const textNode = document.createTextNode(valid_guess.toUpperCase());
     paragraphNode.appendChild(textNode);
     document.getElementById("valid-words-div").prepend(paragraphNode);
 
-    path.forEach(function (item, index) {
-        const tileElement = document.getElementById(`tile-${item}`);
-        tileElement.classList.add("path-tile");
-    });
+    if (path) {
+        path.forEach(function (item, index) {
+            const tileElement = document.getElementById(`tile-${item}`);
+            tileElement.classList.add("path-tile");
+        });
+    }
+}
+
+function clear_live_feed() {
+    document.getElementById("live-feed-words-found").innerHTML = "";
+    document.getElementById("live-feed-leaderboard").innerHTML = "";
 }
 
 function clearPath() {
@@ -162,7 +273,7 @@ function add_button_event_listeners(socket, roomName) {
         clearPath();
         const guessWordInputElement = document.getElementById("guessWordInput");
         const guess = guessWordInputElement.value;
-        socket.emit('guess', {'room': roomName, 'guess': guess});
+        queue_guess(socket, roomName, guess);
         guessWordInputElement.value = "";
         guessWordInputElement.focus();
     });
@@ -182,6 +293,23 @@ function add_button_event_listeners(socket, roomName) {
     guessWordInputElement.focus();
 }
 
+// Queues a guess so that guesses submitted in quick succession are sent in one message.
+function queue_guess(socket, roomName, guess) {
+    pendingGuesses.push(guess);
+    if (pendingGuesses.length > 1) {
+        return;
+    }
+
+    window.setTimeout(function () {
+        if (pendingGuesses.length === 1) {
+            socket.emit('guess', {'room': roomName, 'guess': pendingGuesses[0]});
+        } else {
+            socket.emit('guesses', {'room': roomName, 'guesses': pendingGuesses});
+        }
+        pendingGuesses = [];
+    }, GUESS_BATCH_MILLIS);
+}
+
 function confirmAndStartNewGame(socket, roomName) {
     const confirmation = confirm("Do you want to start a new game? The current board will be cleared.");
     if (confirmation === true) {
@@ -190,3 +318,19 @@ function confirmAndStartNewGame(socket, roomName) {
         socket.emit('new_game', {'room': roomName});
     }
 }
+
+function get_player_token() {
+    try {
+        return window.localStorage.getItem(PLAYER_TOKEN_KEY);
+    } catch (error) {
+        return null;
+    }
+}
+
+function save_player_token(playerToken) {
+    try {
+        window.localStorage.setItem(PLAYER_TOKEN_KEY, playerToken);
+    } catch (error) {
+        console.log('Could not save the player token');
+    }
+}
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+
+def write_atomically(path: str, buffer: bytes):
+    """
+    Writes the buffer to a temporary file next to the given path and renames it over the path, so that
+    readers see either the old or the new file and never a partly written one.
+
+    Raises:
+        OSError: if the file could not be written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, mode="wb") as temp_file:
+            temp_file.write(buffer)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,203 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Upper bounds in seconds of the buckets of latency histograms
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """
+    A named family of values, one per combination of label values, in the Prometheus text format.
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def __getattr__(self, name: str):
+        # The lock is created on first use rather than with the metric. Metrics are created when their module is
+        # imported, which a preloaded application does in gunicorn's master before eventlet patches threading
+        # in the workers, and a lock created then would block every green thread of the worker while it is held.
+        if name == "_lock":
+            self._lock = threading.Lock()
+            return self._lock
+        raise AttributeError(name)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _format_labels(self, label_values: LabelValues, extra: Dict[str, str] = None) -> str:
+        pairs = list(zip(self.label_names, label_values))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter(Metric):
+    """
+    A value that only goes up. Its name should end in _total.
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {} if label_names else {(): 0}
+
+    def inc(self, amount: float = 1, label_values: LabelValues = ()):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, label_values: LabelValues = ()) -> float:
+        return self._values.get(label_values, 0)
+
+    def _render_samples(self) -> Iterable[str]:
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{self._format_labels(label_values)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {} if label_names else {(): 0}
+
+    def set(self, value: float, label_values: LabelValues = ()):
+        self._values[label_values] = value
+
+    def get(self, label_values: LabelValues = ()) -> float:
+        return self._values.get(label_values, 0)
+
+    def _render_samples(self) -> Iterable[str]:
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{self._format_labels(label_values)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """
+    Counts observations in cumulative buckets, along with their count and sum.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Dictionary from label values to the count of each bucket, with a final bucket for larger values,
+        # and the sum of the observations
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, label_values: LabelValues = ()):
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+                self._sums[label_values] = 0
+            counts[bucket] += 1
+            self._sums[label_values] += value
+
+    def get_count(self, label_values: LabelValues = ()) -> int:
+        return sum(self._counts.get(label_values, ()))
+
+    def get_sum(self, label_values: LabelValues = ()) -> float:
+        return self._sums.get(label_values, 0)
+
+    def _render_samples(self) -> Iterable[str]:
+        for label_values, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = self._format_labels(label_values, {"le": _format_value(upper_bound)})
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = self._format_labels(label_values)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[label_values])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    The metrics of this process.
+
+    Metrics updated on the hot path are registered once and updated in place. Metrics describing the
+    current state of the server are built when the metrics are rendered by collectors, which are
+    registered under a name so that registering a collector again replaces it.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Metric]]] = {}
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[Metric]]):
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        metrics = list(self._metrics.values())
+        for collector in list(self._collectors.values()):
+            metrics.extend(collector())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Metrics of this process. Each worker serves its own metrics.
+REGISTRY = MetricsRegistry()
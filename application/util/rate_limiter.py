@@ -0,0 +1,183 @@
+import json
+import logging
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+DEFAULT_PRUNE_INTERVAL_SECONDS = 60
+
+# The scopes that an event can be limited in: each session on its own, and all the sessions of a room together
+SESSION_LIMIT = "session"
+ROOM_LIMIT = "room"
+
+LOG = logging.getLogger("RateLimiter")
+
+
+class RateLimit(NamedTuple):
+    # Tokens added to the bucket each second, the sustained number of events allowed per second
+    rate: float
+    # The most tokens the bucket holds, the largest burst of events allowed at once
+    burst: float
+
+
+# Limits of each event for a session and for a room. A person types a few words a second at most, and a room
+# is limited to enough guesses for hundreds of players so that a bot with many sessions cannot flood it.
+# Batched guesses take a token for each of their words from the guess buckets.
+DEFAULT_RATE_LIMITS: Dict[str, Dict[str, RateLimit]] = {
+    "guess": {SESSION_LIMIT: RateLimit(5, 20), ROOM_LIMIT: RateLimit(500, 1000)},
+    "new_game": {SESSION_LIMIT: RateLimit(0.2, 3), ROOM_LIMIT: RateLimit(0.5, 3)},
+    "join": {SESSION_LIMIT: RateLimit(1, 5), ROOM_LIMIT: RateLimit(20, 50)},
+}
+
+
+class TokenBuckets:
+    """
+    A token bucket for each key, such as a session ID, all with the same rate limit.
+
+    A bucket starts full and each event takes its cost in tokens from it. Buckets are refilled lazily from the time
+    they were last used, so checking one is a couple of dictionary lookups and some arithmetic.
+    """
+
+    __slots__ = ("limit", "tokens", "updated")
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        # By key, the tokens left and the time they were counted
+        self.tokens: Dict[str, float] = {}
+        self.updated: Dict[str, float] = {}
+
+    def take(self, key: str, now: float, cost: int = 1) -> bool:
+        """
+        Takes the given number of tokens from the bucket of the key.
+
+        Returns:
+            False if the bucket holds fewer tokens than the cost, in which case none are taken
+        """
+        limit = self.limit
+        tokens = self.tokens.get(key)
+        if tokens is None:
+            tokens = limit.burst
+        else:
+            tokens = min(limit.burst, tokens + (now - self.updated[key]) * limit.rate)
+        self.updated[key] = now
+
+        if tokens < cost:
+            self.tokens[key] = tokens
+            return False
+        self.tokens[key] = tokens - cost
+        return True
+
+    def prune(self, now: float) -> int:
+        """
+        Removes the buckets that have refilled, which are the same as the new bucket a key would get.
+
+        Returns:
+            the number of buckets removed
+        """
+        limit = self.limit
+        full = [
+            key for key, tokens in self.tokens.items() if tokens + (now - self.updated[key]) * limit.rate >= limit.burst
+        ]
+        for key in full:
+            del self.tokens[key]
+            del self.updated[key]
+        return len(full)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+class RateLimiter:
+    """
+    Limits how often each session, and all the sessions of a room together, can send each event.
+
+    The session limit is checked first so that a session over its limit does not use up the tokens of the
+    other players of its room. Events without limits are always allowed.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, RateLimit]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            limits: by event, the limit of each scope, defaults to DEFAULT_RATE_LIMITS
+            clock: returns the current time in seconds
+        """
+        limits = limits if limits is not None else DEFAULT_RATE_LIMITS
+        self.clock = clock
+        self.session_buckets: Dict[str, TokenBuckets] = {
+            event: TokenBuckets(scopes[SESSION_LIMIT]) for event, scopes in limits.items() if scopes.get(SESSION_LIMIT)
+        }
+        self.room_buckets: Dict[str, TokenBuckets] = {
+            event: TokenBuckets(scopes[ROOM_LIMIT]) for event, scopes in limits.items() if scopes.get(ROOM_LIMIT)
+        }
+
+    @classmethod
+    def from_json(cls, text: str, **kwargs) -> "RateLimiter":
+        """
+        Creates a rate limiter with the default limits overridden by the limits in a JSON object such as
+        {"guess": {"session": [10, 40], "room": null}}, where each limit is a rate per second and a burst,
+        and null removes the limit.
+        """
+        limits = {event: dict(scopes) for event, scopes in DEFAULT_RATE_LIMITS.items()}
+        for event, scopes in json.loads(text).items():
+            for scope, limit in scopes.items():
+                if scope not in (SESSION_LIMIT, ROOM_LIMIT):
+                    raise ValueError(f"Unknown rate limit scope {scope} for {event}")
+                limits.setdefault(event, {})[scope] = RateLimit(*limit) if limit is not None else None
+        return cls(limits, **kwargs)
+
+    def check(self, event: str, session_id: str, room: Optional[str] = None, cost: int = 1) -> Optional[str]:
+        """
+        Takes the cost of the event in tokens from the buckets of the session and of the room.
+
+        Args:
+            event: the name of the event
+            session_id: the session that sent the event
+            room: the room the event is for, if any
+            cost: the number of tokens the event takes, such as the number of words in a batch of guesses
+
+        Returns:
+            the scope of the limit that the event is over, or None if the event is allowed
+        """
+        now = None
+        session_buckets = self.session_buckets.get(event)
+        if session_buckets is not None:
+            now = self.clock()
+            if not session_buckets.take(session_id, now, cost):
+                return SESSION_LIMIT
+
+        room_buckets = self.room_buckets.get(event)
+        if room_buckets is not None and room is not None:
+            if now is None:
+                now = self.clock()
+            if not room_buckets.take(room, now, cost):
+                return ROOM_LIMIT
+        return None
+
+    def prune(self) -> int:
+        """
+        Removes the buckets that have refilled, so that only the sessions and rooms that sent events
+        recently are held in memory.
+
+        Returns:
+            the number of buckets removed
+        """
+        now = self.clock()
+        return sum(buckets.prune(now) for buckets in [*self.session_buckets.values(), *self.room_buckets.values()])
+
+    def run_pruner(self, sleep: Callable[[float], None], interval_seconds: float = DEFAULT_PRUNE_INTERVAL_SECONDS):
+        """
+        Removes the buckets that have refilled forever. Meant to be run as a single background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            interval_seconds: the time between passes
+        """
+        while True:
+            sleep(interval_seconds)
+            try:
+                self.prune()
+            except Exception:
+                LOG.exception("Failed to prune the rate limiter")
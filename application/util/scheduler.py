@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import logging
+import threading
+from typing import Callable, List, Tuple
+
+from application.util.metrics import REGISTRY
+from application.util.time_util import get_time_millis
+
+DEFAULT_TICK_SECONDS = 0.25
+
+# Rebuild the heap once cancelled tasks make up more than this fraction of it
+COMPACT_RATIO = 0.5
+
+TIMER_LAG_SECONDS = REGISTRY.histogram(
+    "scrambled_words_timer_lag_seconds", "Time between the deadline of a scheduled task and when it was fired"
+)
+
+LOG = logging.getLogger("Scheduler")
+
+
+class ScheduledTask:
+    """
+    Handle for a callback registered with the scheduler.
+    """
+
+    __slots__ = ("deadline", "callback", "pending")
+
+    def __init__(self, deadline: int, callback: Callable[[], None]):
+        self.deadline = deadline
+        self.callback = callback
+        # Whether the task is still waiting in the scheduler to be fired
+        self.pending = True
+
+
+class Scheduler:
+    """
+    Runs callbacks at given deadlines from a single loop instead of one timer thread per callback.
+
+    Tasks are kept in a heap ordered by deadline. Cancelling a task only marks it, and the heap is
+    compacted once cancelled tasks dominate it. Every task that is due is fired in the same pass.
+    """
+
+    def __init__(self, clock: Callable[[], int] = get_time_millis):
+        """
+        Args:
+            clock: returns the current time in milliseconds
+        """
+        self.clock = clock
+        self._heap: List[Tuple[int, int, ScheduledTask]] = []
+        self._sequence = itertools.count()
+        self._cancelled = 0
+        self._lock = threading.Lock()
+
+    def schedule(self, deadline: int, callback: Callable[[], None]) -> ScheduledTask:
+        """
+        Registers a callback to run once the clock reaches the deadline.
+
+        Args:
+            deadline: the time in milliseconds
+            callback: the function to call
+
+        Returns:
+            the handle used to cancel the task
+        """
+        task = ScheduledTask(deadline, callback)
+        with self._lock:
+            heapq.heappush(self._heap, (deadline, next(self._sequence), task))
+        return task
+
+    def cancel(self, task: ScheduledTask):
+        with self._lock:
+            if not task.pending:
+                return
+            task.pending = False
+            self._cancelled += 1
+
+            if self._cancelled > len(self._heap) * COMPACT_RATIO:
+                self._heap = [entry for entry in self._heap if entry[2].pending]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def run_due(self) -> int:
+        """
+        Fires every task whose deadline has passed.
+
+        Returns:
+            the number of tasks fired
+        """
+        now = self.clock()
+        due: List[ScheduledTask] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                task = heapq.heappop(self._heap)[2]
+                if task.pending:
+                    task.pending = False
+                    due.append(task)
+                else:
+                    self._cancelled -= 1
+
+        # Run the callbacks outside of the lock so that they can schedule new tasks
+        for task in due:
+            TIMER_LAG_SECONDS.observe(max(self.clock() - task.deadline, 0) / 1000)
+            try:
+                task.callback()
+            except Exception:
+                LOG.exception("Scheduled task failed")
+        return len(due)
+
+    def run(self, sleep: Callable[[float], None], tick_seconds: float = DEFAULT_TICK_SECONDS):
+        """
+        Fires due tasks forever. Meant to be run as a single background green thread.
+
+        Args:
+            sleep: the sleep function that yields to other green threads
+            tick_seconds: the time between passes
+        """
+        while True:
+            sleep(tick_seconds)
+            self.run_due()
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
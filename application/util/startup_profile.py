@@ -0,0 +1,111 @@
+import logging
+import os
+import resource
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+LOG = logging.getLogger("StartupProfile")
+
+# Memory usage of the process, read from procfs where it is available
+_STATM_FILE = "/proc/self/statm"
+_SMAPS_ROLLUP_FILE = "/proc/self/smaps_rollup"
+_STAT_FILE = "/proc/self/stat"
+_UPTIME_FILE = "/proc/uptime"
+
+
+class StartupPhase(NamedTuple):
+    name: str
+    seconds: float
+    # Resident memory of the process after the phase, and the part of it that is not shared with other processes
+    rss_bytes: int
+    private_bytes: Optional[int]
+
+
+def get_memory_usage() -> Tuple[int, Optional[int]]:
+    """
+    Returns the resident memory of this process and the part of it not shared with any other process.
+
+    The private memory is only known on Linux. It is what a forked worker adds on top of its master.
+    """
+    try:
+        with open(_STATM_FILE) as statm:
+            rss_bytes = int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # The peak resident memory, in kilobytes on Linux
+        rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    private_bytes = None
+    try:
+        with open(_SMAPS_ROLLUP_FILE) as smaps_rollup:
+            private_bytes = sum(
+                int(line.split()[1]) * 1024
+                for line in smaps_rollup
+                if line.startswith(("Private_Clean", "Private_Dirty"))
+            )
+    except OSError:
+        pass
+    return rss_bytes, private_bytes
+
+
+def get_process_age_seconds() -> Optional[float]:
+    """
+    Returns the time since this process was created, or forked, which is only known on Linux.
+    """
+    try:
+        with open(_STAT_FILE) as stat, open(_UPTIME_FILE) as uptime:
+            # The start time follows the command name, which may contain spaces, and is in clock ticks since boot
+            start_ticks = int(stat.read().rpartition(")")[2].split()[19])
+            uptime_seconds = float(uptime.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(uptime_seconds - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+
+class StartupProfile:
+    """
+    Records how long each phase of the application's start up takes and the memory used after it.
+
+    The first phase is the time from the creation of the process to the creation of the profile, which
+    covers the imports. A disabled profile does not record anything, so the phases can always be wrapped.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases: List[StartupPhase] = []
+
+        process_age_seconds = get_process_age_seconds() if enabled else None
+        if process_age_seconds is not None:
+            self.phases.append(StartupPhase("process start and imports", process_age_seconds, *get_memory_usage()))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        self.phases.append(StartupPhase(name, seconds, *get_memory_usage()))
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(phase.seconds for phase in self.phases)
+
+    def log(self, process: str):
+        """
+        Logs every phase recorded so far.
+
+        Args:
+            process: the process that started, such as the master or a worker
+        """
+        if not self.enabled:
+            return
+        for phase in self.phases:
+            private = f"{phase.private_bytes / 2 ** 20:.1f} MB" if phase.private_bytes is not None else "unknown"
+            LOG.info(
+                f"[{process}] {phase.name}: {phase.seconds * 1000:.1f} ms, "
+                f"RSS {phase.rss_bytes / 2 ** 20:.1f} MB, private {private}"
+            )
+        LOG.info(f"[{process}] Started in {self.total_seconds * 1000:.1f} ms")
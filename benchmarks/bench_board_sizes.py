@@ -0,0 +1,54 @@
+"""
+Measures guess validation and full solve latency across board sizes.
+
+Run from the root of the repo with:
+    python -m benchmarks.bench_board_sizes [boards per size]
+"""
+import random
+import statistics
+import sys
+import time
+
+from application.data.board_layout import BoardLayout
+from application.data.game_state import GameState
+from application.data.word_manager import WordManager
+
+BOARD_SIZES = [(4, 4), (5, 5), (6, 6), (8, 8), (10, 10)]
+
+
+def main(boards_per_size: int = 20):
+    word_manager = WordManager()
+    dictionary = word_manager.words_with_prefix("")
+
+    print(f"{'size':>6} {'solve ms':>10} {'words':>8} {'hit us':>8} {'miss us':>8}")
+    for rows, columns in BOARD_SIZES:
+        layout = BoardLayout.for_size(rows, columns)
+
+        solve_times_ms = []
+        word_counts = []
+        hit_times_us = []
+        miss_times_us = []
+        for _ in range(boards_per_size):
+            start = time.perf_counter()
+            game_state = GameState("bench", word_manager, game_timer=False, layout=layout)
+            solve_times_ms.append((time.perf_counter() - start) * 1000)
+            word_counts.append(game_state.solution.word_count)
+
+            # Solution lookups for words known to be on the board and for random dictionary words
+            for word in list(game_state.solution.paths)[:50]:
+                start = time.perf_counter()
+                game_state.solution.get_path(word)
+                hit_times_us.append((time.perf_counter() - start) * 1000000)
+            for word in random.sample(dictionary, 50):
+                start = time.perf_counter()
+                game_state.solution.get_path(word)
+                miss_times_us.append((time.perf_counter() - start) * 1000000)
+
+        print(
+            f"{str(layout):>6} {statistics.mean(solve_times_ms):10.2f} {statistics.mean(word_counts):8.1f} "
+            f"{statistics.mean(hit_times_us):8.2f} {statistics.mean(miss_times_us):8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,42 @@
+"""
+Measures how long it takes to solve a freshly generated board.
+
+Run from the root of the repo with:
+    python -m benchmarks.bench_solver [number of boards]
+"""
+
+import statistics
+import sys
+import time
+
+from application.data.board_layout import BoardLayout
+from application.data.board_solver import BoardSolver
+from application.data.word_manager import WordManager
+
+
+def main(total_boards: int = 200):
+    word_manager = WordManager()
+    layout = BoardLayout.for_size()
+    solver = BoardSolver(word_manager.trie, layout.neighbors)
+
+    solve_times_ms = []
+    word_counts = []
+    for _ in range(total_boards):
+        tiles = word_manager.letter_distribution.draw(layout.total_tiles)
+
+        start = time.perf_counter()
+        solution = solver.solve(tiles)
+        solve_times_ms.append((time.perf_counter() - start) * 1000)
+        word_counts.append(solution.word_count)
+
+    solve_times_ms.sort()
+    print(f"Solved {total_boards} boards")
+    print(f"  mean   {statistics.mean(solve_times_ms):8.2f} ms")
+    print(f"  median {statistics.median(solve_times_ms):8.2f} ms")
+    print(f"  p99    {solve_times_ms[int(len(solve_times_ms) * 0.99) - 1]:8.2f} ms")
+    print(f"  max    {solve_times_ms[-1]:8.2f} ms")
+    print(f"  words per board {statistics.mean(word_counts):.1f} (min {min(word_counts)}, max {max(word_counts)})")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,288 @@
+"""
+The operations measured by both the pytest-benchmark suite and the standalone runner.
+
+Each setup function prepares its fixtures outside of the measurement and returns the operation to time.
+"""
+
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import uuid
+from functools import partial
+from typing import Callable, Dict
+
+from application.data.board_generator import BoardGenerator
+from application.data.board_layout import BoardLayout
+from application.data.board_solver import BoardSolver
+from application.data.game_manager import GameManager
+from application.data.game_snapshot import GameSnapshot, encode_snapshot
+from application.data.game_state import GameState
+from application.data.round_scorer import RoundScorer
+from application.data.scoring_type import ScoringType
+from application.data.word_manager import WORDS_FILE, WordManager
+from application.util.rate_limiter import RateLimiter
+
+Operation = Callable[[], object]
+
+# Seed for the generated boards and guesses so that runs are comparable
+SEED = 1234
+
+# Number of players guessing in the score state benchmarks
+MANY_PLAYERS = 500
+# Number of solution words guessed by each of those players
+WORDS_PER_PLAYER = 40
+# Number of guesses replayed by the guess stream benchmark
+GUESSES_PER_ROUND = 1000
+
+# Number of rooms saved and restored by the snapshot benchmarks, and the players and words of each room
+SNAPSHOT_ROOMS = 10000
+SNAPSHOT_PLAYERS = 4
+SNAPSHOT_WORDS_PER_PLAYER = 20
+
+# Number of events checked by each run of the rate limiter benchmark, and the sessions and rooms they come from
+RATE_LIMITED_EVENTS = 10000
+RATE_LIMITED_SESSIONS = 1000
+RATE_LIMITED_ROOMS = 100
+
+# Letter-dense 5x5 boards on which the solver finds a live prefix along far more paths than on a drawn board.
+# The dense board was searched for with the real dictionary and visits over twice as many tiles as the slowest
+# of 500 drawn boards. On the all "e" board with a dictionary of "e" words every path of up to the longest word
+# is a live prefix, which is the most work a search of a 5x5 board can do for that word length.
+ADVERSARIAL_BOARDS = {
+    "dense_letters": list("repapesrrrtteearasttretes"),
+    "all_e": ["e"] * 25,
+}
+ADVERSARIAL_WORDS = {"e" * length for length in range(3, 7)}
+
+
+def word_manager_load_compiled() -> Operation:
+    """
+    Loading the dictionary when the compiled trie is current, which is what every worker does on start up.
+    """
+    # Make sure the compiled trie exists so that only the memory-mapping is measured
+    WordManager()
+    return WordManager
+
+
+def word_manager_compile() -> Operation:
+    """
+    Loading the dictionary when the compiled trie is missing, as after a deploy that changes the word list.
+    """
+    directory = tempfile.mkdtemp(prefix="scrambled-words-bench-")
+    word_file = os.path.join(directory, "words.txt")
+    shutil.copyfile(WORDS_FILE, word_file)
+    compiled_file = os.path.join(directory, "words.trie")
+
+    def load() -> WordManager:
+        if os.path.exists(compiled_file):
+            os.remove(compiled_file)
+        return WordManager(word_file=word_file)
+
+    return load
+
+
+def board_generation(word_manager: WordManager, rows: int, columns: int) -> Operation:
+    """
+    Generating a board that meets the default board quality, as done for every new round.
+    """
+    generator = BoardGenerator(word_manager, BoardLayout.for_size(rows, columns), seed=SEED)
+    return generator.generate
+
+
+def board_solve(word_manager: WordManager, case: str) -> Operation:
+    """
+    Solving an adversarial board for all of its words, the worst case of the search done for every new board.
+    """
+    tiles = ADVERSARIAL_BOARDS[case]
+    trie = word_manager.trie if case == "dense_letters" else WordManager(ADVERSARIAL_WORDS).trie
+    solver = BoardSolver(trie, BoardLayout.for_size().neighbors)
+    return partial(solver.solve, tiles)
+
+
+def many_player_game(word_manager: WordManager, scoring_type: ScoringType) -> GameState:
+    """
+    Creates a game in which many players have guessed overlapping sets of the board's words.
+    """
+    # Boards are generated from the global random module
+    random.seed(SEED)
+    rng = random.Random(SEED)
+    game_state = GameState("BENCH", word_manager, game_timer=False, scoring_type=scoring_type)
+    # Keep generating boards until one has enough words for the players to overlap
+    while game_state.solution.word_count < WORDS_PER_PLAYER * 2:
+        game_state.new_board()
+
+    words = sorted(game_state.solution.paths)
+    for player in range(MANY_PLAYERS):
+        for word in rng.sample(words, WORDS_PER_PLAYER):
+            game_state.round_scorer.add_guess(f"player-{player}", word)
+    return game_state
+
+
+def score_state_preview(word_manager: WordManager, scoring_type: ScoringType) -> Operation:
+    """
+    Building one player's score state while the round is running.
+    """
+    game_state = many_player_game(word_manager, scoring_type)
+    return lambda: game_state.get_score_state("player-0")
+
+
+def end_game(word_manager: WordManager, scoring_type: ScoringType) -> Operation:
+    """
+    Ending a round, which builds the score state of every player.
+    """
+    game_state = many_player_game(word_manager, scoring_type)
+
+    def end() -> None:
+        game_state.game_running = True
+        game_state.end_game()
+
+    return end
+
+
+def round_scoring(word_manager: WordManager, scoring_type: ScoringType, batched: bool) -> Operation:
+    """
+    Scoring a whole round of many players from its guesses, as done when a round is scored from the shared backend.
+
+    The batched path scores the room in one pass with Scoring.score_room and the per-word path adds each guess
+    to the round scorer in turn.
+    """
+    game_state = many_player_game(word_manager, scoring_type)
+    guesses = [(player_id, word) for player_id, words in game_state.valid_guesses.items() for word in words]
+    if batched:
+        return partial(RoundScorer.from_guesses, scoring_type, guesses, game_state.solution)
+
+    def score_each_word() -> RoundScorer:
+        round_scorer = RoundScorer(scoring_type, game_state.solution)
+        for player_id, word in guesses:
+            round_scorer.add_guess(player_id, word)
+        return round_scorer
+
+    return score_each_word
+
+
+def guess_stream(word_manager: WordManager, scoring_type: ScoringType) -> Operation:
+    """
+    Validating and scoring a round's worth of guesses from many players, half of which are not on the board.
+    """
+    # Boards are generated from the global random module
+    random.seed(SEED)
+    rng = random.Random(SEED)
+    game_state = GameState("BENCH", word_manager, game_timer=False, scoring_type=scoring_type)
+    on_board = sorted(game_state.solution.paths)
+    not_on_board = [word for word in word_manager.words_with_prefix("", limit=5000) if word not in on_board]
+    guesses = [
+        (f"player-{rng.randrange(MANY_PLAYERS)}", rng.choice(on_board if rng.random() < 0.5 else not_on_board))
+        for _ in range(GUESSES_PER_ROUND)
+    ]
+
+    def play_round():
+        game_state.round_scorer = RoundScorer(scoring_type, game_state.solution)
+        for player_id, word in guesses:
+            game_state.guess_word(player_id, word)
+
+    return play_round
+
+
+def write_snapshot(word_manager: WordManager, path: str):
+    """
+    Writes a snapshot of many running rooms, each a copy of a room in which a few players have guessed some words.
+    """
+    # Boards are generated from the global random module
+    random.seed(SEED)
+    rng = random.Random(SEED)
+    game_state = GameState("BENCH", word_manager)
+    while game_state.solution.word_count < SNAPSHOT_WORDS_PER_PLAYER * 2:
+        game_state.new_board()
+    words = sorted(game_state.solution.paths)
+    for player in range(SNAPSHOT_PLAYERS):
+        game_state.guess_words(f"player-{player}", rng.sample(words, SNAPSHOT_WORDS_PER_PLAYER))
+
+    snapshot = game_state.get_snapshot()
+    snapshots = []
+    for room in range(SNAPSHOT_ROOMS):
+        record = dict(snapshot.state["record"], round_id=uuid.uuid4().hex)
+        state = dict(snapshot.state, game_name=f"R{room:05d}", record=record)
+        snapshots.append(GameSnapshot(state, snapshot.tiles, snapshot.solution))
+    with open(path, mode="wb") as snapshot_file:
+        snapshot_file.write(encode_snapshot(snapshots))
+
+
+def snapshot_restore(word_manager: WordManager) -> Operation:
+    """
+    Restoring every room of a busy server from its snapshot, as done by a worker starting after a deploy.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="scrambled-words-bench-"), "games.snapshot")
+    write_snapshot(word_manager, path)
+
+    def restore() -> GameManager:
+        game_manager = GameManager(word_manager, max_games=SNAPSHOT_ROOMS)
+        game_manager.load_snapshot(path)
+        return game_manager
+
+    return restore
+
+
+def snapshot_save(word_manager: WordManager) -> Operation:
+    """
+    Saving every room of a busy server to a snapshot, as done periodically and when a worker stops.
+    """
+    directory = tempfile.mkdtemp(prefix="scrambled-words-bench-")
+    write_snapshot(word_manager, os.path.join(directory, "restore.snapshot"))
+    game_manager = GameManager(word_manager, max_games=SNAPSHOT_ROOMS)
+    game_manager.load_snapshot(os.path.join(directory, "restore.snapshot"))
+    return partial(game_manager.save_snapshot, os.path.join(directory, "games.snapshot"))
+
+
+def rate_limiter_check(over_limit: bool) -> Operation:
+    """
+    Checking guesses against the rate limits, either from players within their limits or from a bot whose
+    session is over its limit, which is what every guess pays before any game logic runs.
+    """
+    if over_limit:
+        # The clock stands still so that the bot's bucket stays empty
+        rate_limiter = RateLimiter(clock=lambda: 0.0)
+        events = [("bot", "ROOM")] * RATE_LIMITED_EVENTS
+    else:
+        # The clock moves a second on every check so that the players never run out of tokens
+        rate_limiter = RateLimiter(clock=partial(next, itertools.count()))
+        events = [
+            (f"session-{index % RATE_LIMITED_SESSIONS}", f"R{index % RATE_LIMITED_ROOMS:03d}")
+            for index in range(RATE_LIMITED_EVENTS)
+        ]
+    for session_id, room in events:
+        rate_limiter.check("guess", session_id, room)
+
+    def check_events():
+        check = rate_limiter.check
+        for session_id, room in events:
+            check("guess", session_id, room)
+
+    return check_events
+
+
+def all_cases(word_manager: WordManager) -> Dict[str, Callable[[], Operation]]:
+    """
+    Returns the setup function of every benchmark by name.
+    """
+    cases: Dict[str, Callable[[], Operation]] = {
+        "word_manager_load_compiled": word_manager_load_compiled,
+        "word_manager_compile": word_manager_compile,
+    }
+    for rows, columns in [(4, 4), (5, 5), (10, 10)]:
+        cases[f"board_generation[{rows}x{columns}]"] = partial(board_generation, word_manager, rows, columns)
+    for case in ADVERSARIAL_BOARDS:
+        cases[f"board_solve[{case}]"] = partial(board_solve, word_manager, case)
+    for scoring_type in ScoringType:
+        name = scoring_type.name.lower()
+        cases[f"score_state_preview[{name}]"] = partial(score_state_preview, word_manager, scoring_type)
+        cases[f"end_game[{name}]"] = partial(end_game, word_manager, scoring_type)
+        cases[f"guess_stream[{name}]"] = partial(guess_stream, word_manager, scoring_type)
+        for batched, path in [(False, "per_word"), (True, "batched")]:
+            cases[f"round_scoring[{name}-{path}]"] = partial(round_scoring, word_manager, scoring_type, batched)
+    for over_limit, name in [(False, "allowed"), (True, "rejected")]:
+        cases[f"rate_limiter_check[{name}]"] = partial(rate_limiter_check, over_limit)
+    cases[f"snapshot_save[{SNAPSHOT_ROOMS}_rooms]"] = partial(snapshot_save, word_manager)
+    cases[f"snapshot_restore[{SNAPSHOT_ROOMS}_rooms]"] = partial(snapshot_restore, word_manager)
+    return cases
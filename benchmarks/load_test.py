@@ -0,0 +1,247 @@
+"""
+Drives simulated rooms through the join, guess, new_game and timer_expired events of a running server
+and reports the p50/p99 latency of each event along with the overall throughput.
+
+Run from the root of the repo with:
+    python -m benchmarks.load_test [--rooms 10] [--players 4] [--rounds 3] [--guesses 30] [--url URL]
+
+Without --url a local server running the application on eventlet is started in a separate process, with
+the rate limits turned off so that every event reaches its handler.
+Each event is sent with an acknowledgement so its latency covers the whole handler on the server.
+Events that the server drops for going over a rate limit are still acknowledged, so they are read from
+the server's metrics after the run and counted as errors.
+Every simulated player joins with its own player token, so the players of a room play as separate players
+even though they all connect from the same address.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List
+
+import socketio
+
+from application import RATE_LIMITS_ENV
+from application.data.board_layout import BoardLayout
+from application.data.board_solver import BoardSolver
+from application.data.word_manager import WordManager
+from application.util.rate_limiter import DEFAULT_RATE_LIMITS, ROOM_LIMIT, SESSION_LIMIT
+from benchmarks.stats import format_header, format_summary, summarize
+
+SERVER_START_TIMEOUT_SECONDS = 30
+EVENT_TIMEOUT_SECONDS = 10
+
+DROPPED_EVENTS_METRIC = "scrambled_words_socket_events_dropped_total"
+
+# Turns off every rate limit of the local server
+NO_RATE_LIMITS = json.dumps({event: {SESSION_LIMIT: None, ROOM_LIMIT: None} for event in DEFAULT_RATE_LIMITS})
+
+# Fraction of the guesses that are words on the board, the rest are dictionary words that are not
+VALID_GUESS_FRACTION = 0.5
+
+
+class LoadTest:
+    def __init__(self, url: str, rooms: int, players: int, rounds: int, guesses: int):
+        self.url = url
+        self.rooms = rooms
+        self.players = players
+        self.rounds = rounds
+        self.guesses = guesses
+
+        self.word_manager = WordManager()
+        self.dictionary = self.word_manager.words_with_prefix("")
+        self.solver = BoardSolver(self.word_manager.trie, BoardLayout.for_size().neighbors)
+
+        # Dictionary from event name to the latency of each call in milliseconds
+        self.latencies_ms: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def run(self) -> float:
+        """
+        Plays every room to completion.
+
+        Returns:
+            the wall time in seconds
+        """
+        threads = [threading.Thread(target=self._play_room, args=(f"LOAD{room}",)) for room in range(self.rooms)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def _play_room(self, room: str):
+        clients = []
+        try:
+            for _ in range(self.players):
+                client = socketio.Client(ssl_verify=False)
+                client.connect(self.url, transports=["websocket"], wait_timeout=EVENT_TIMEOUT_SECONDS)
+                clients.append(client)
+
+            # The first player receives the game state of every round, either on joining or by broadcast
+            game_state_received = threading.Event()
+            game_state = {}
+
+            def on_game_state(message):
+                game_state.update(message)
+                game_state_received.set()
+
+            clients[0].on("game_state", on_game_state)
+
+            # A new_game event for a room that does not exist yet creates it
+            self._call(clients[0], "new_game", {"room": room})
+            for client in clients:
+                self._call(client, "join", {"room": room, "player_token": secrets.token_urlsafe(16)})
+
+            for round_number in range(self.rounds):
+                if round_number > 0:
+                    game_state_received.clear()
+                    self._call(clients[0], "new_game", {"room": room})
+                if not game_state_received.wait(EVENT_TIMEOUT_SECONDS):
+                    raise TimeoutError(f"No game state received for room {room}")
+
+                player_threads = [
+                    threading.Thread(target=self._play_round, args=(client, room, game_state["tiles"]))
+                    for client in clients
+                ]
+                for thread in player_threads:
+                    thread.start()
+                for thread in player_threads:
+                    thread.join()
+        except Exception:
+            logging.exception(f"Room {room} failed")
+            with self._lock:
+                self.errors += 1
+        finally:
+            for client in clients:
+                client.disconnect()
+
+    def _play_round(self, client: socketio.Client, room: str, tiles: str):
+        on_board = list(self.solver.solve([tile.lower() for tile in tiles]).paths)
+        for _ in range(self.guesses):
+            if on_board and random.random() < VALID_GUESS_FRACTION:
+                guess = random.choice(on_board)
+            else:
+                guess = random.choice(self.dictionary)
+            self._call(client, "guess", {"room": room, "guess": guess})
+        self._call(client, "timer_expired", {"room": room})
+
+    def _call(self, client: socketio.Client, event: str, message: Dict[str, str]):
+        start = time.perf_counter()
+        try:
+            client.call(event, message, timeout=EVENT_TIMEOUT_SECONDS)
+        except socketio.exceptions.TimeoutError:
+            with self._lock:
+                self.errors += 1
+            return
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies_ms[event].append(latency_ms)
+
+
+def serve(port: int):
+    """
+    Runs the application with the SocketIO server's own eventlet web server.
+    """
+    from application import create_flask_app, socketio as server_socketio
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    server_socketio.run(create_flask_app(), host="127.0.0.1", port=port, log_output=False)
+
+
+def start_local_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_test", "--serve", str(port)],
+        env=dict(os.environ, PYTHONUNBUFFERED="1", **{RATE_LIMITS_ENV: NO_RATE_LIMITS}),
+    )
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("The local server exited during start up")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("The local server did not start in time")
+
+
+def get_dropped_events(url: str) -> int:
+    """
+    Returns the number of events the server has dropped for going over a rate limit, from its metrics.
+    """
+    with urllib.request.urlopen(f"{url}/metrics", timeout=EVENT_TIMEOUT_SECONDS) as response:
+        metrics = response.read().decode()
+    return int(
+        sum(float(line.rsplit(" ", 1)[1]) for line in metrics.splitlines() if line.startswith(DROPPED_EVENTS_METRIC))
+    )
+
+
+def _get_free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        return free_socket.getsockname()[1]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=10, help="number of simulated rooms")
+    parser.add_argument("--players", type=int, default=4, help="number of connected players in each room")
+    parser.add_argument("--rounds", type=int, default=3, help="number of rounds played in each room")
+    parser.add_argument("--guesses", type=int, default=30, help="number of guesses by each player in each round")
+    parser.add_argument("--url", help="URL of a running server, a local server is started if not given")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve)
+        return 0
+
+    logging.basicConfig(level=logging.WARNING)
+
+    server = None
+    url = args.url
+    if not url:
+        port = _get_free_port()
+        server = start_local_server(port)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        dropped_before = get_dropped_events(url)
+        load_test = LoadTest(url, args.rooms, args.players, args.rounds, args.guesses)
+        elapsed_seconds = load_test.run()
+        dropped = get_dropped_events(url) - dropped_before
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.rooms} rooms x {args.players} players x {args.rounds} rounds in {elapsed_seconds:.2f} s")
+    print(format_header())
+    all_latencies_ms = []
+    for event, latencies_ms in sorted(load_test.latencies_ms.items()):
+        all_latencies_ms.extend(latencies_ms)
+        print(format_summary(event, summarize(latencies_ms, elapsed_seconds)))
+    print(format_summary("all events", summarize(all_latencies_ms, elapsed_seconds)))
+    # Dropped events were acknowledged without running their handler, so their latencies are not of the handler
+    print(f"errors: {load_test.errors + dropped} ({dropped} dropped by rate limits)")
+    return 1 if load_test.errors or dropped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Runs every benchmark case and reports p50/p99 latency and throughput.
+
+Run from the root of the repo with:
+    python -m benchmarks.run_benchmarks [--filter NAME] [--seconds 1.0] [--save FILE] [--compare FILE]
+
+Saving a baseline before a change and comparing against it afterwards exits with a non-zero status if
+the p50 latency of any case regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict
+
+from application.data.word_manager import WordManager
+from benchmarks.cases import Operation, all_cases
+from benchmarks.stats import format_header, format_summary, summarize
+
+DEFAULT_SECONDS = 1.0
+MIN_ITERATIONS = 5
+WARMUP_ITERATIONS = 2
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+
+
+def measure(operation: Operation, seconds: float) -> Dict[str, float]:
+    """
+    Times the operation repeatedly for about the given number of seconds.
+    """
+    for _ in range(WARMUP_ITERATIONS):
+        operation()
+
+    samples_ms = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    while len(samples_ms) < MIN_ITERATIONS or time.perf_counter() < deadline:
+        operation_start = time.perf_counter()
+        operation()
+        samples_ms.append((time.perf_counter() - operation_start) * 1000)
+    return summarize(samples_ms, time.perf_counter() - start)
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> Dict[str, float]:
+    """
+    Returns the ratio of the new to the baseline p50 latency of every case that got slower than the threshold.
+    """
+    regressions = {}
+    for name, summary in results.items():
+        if name in baseline and baseline[name]["p50_ms"] > 0:
+            ratio = summary["p50_ms"] / baseline[name]["p50_ms"]
+            if ratio > threshold:
+                regressions[name] = ratio
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run the cases whose name contains this string")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="time spent measuring each case")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # Per-guess logging would otherwise dominate the measurements
+    logging.disable(logging.INFO)
+
+    cases = all_cases(WordManager())
+    results = {}
+    print(format_header())
+    for name, setup in cases.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup(), args.seconds)
+        print(format_summary(name, results[name]), flush=True)
+
+    if args.save:
+        with open(args.save, mode="w") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, mode="r") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name, ratio in sorted(regressions.items()):
+            print(f"REGRESSION {name}: p50 is {ratio:.2f}x the baseline")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Latency summaries shared by the benchmark runner and the load generator.
+"""
+
+import math
+from typing import Dict, List
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of already sorted samples.
+
+    Args:
+        sorted_samples: the samples in ascending order
+        fraction: the percentile as a fraction, e.g. 0.99 for p99
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples_ms: List[float], elapsed_seconds: float = None) -> Dict[str, float]:
+    """
+    Summarizes latency samples.
+
+    Args:
+        samples_ms: the latency of each operation in milliseconds
+        elapsed_seconds: the wall time of the whole run, defaults to the sum of the samples
+
+    Returns:
+        the count, p50, p99 and max latency in milliseconds and the throughput in operations per second
+    """
+    samples_ms = sorted(samples_ms)
+    if elapsed_seconds is None:
+        elapsed_seconds = sum(samples_ms) / 1000
+    return {
+        "count": len(samples_ms),
+        "p50_ms": percentile(samples_ms, 0.5),
+        "p99_ms": percentile(samples_ms, 0.99),
+        "max_ms": samples_ms[-1] if samples_ms else 0.0,
+        "ops_per_second": len(samples_ms) / elapsed_seconds if elapsed_seconds > 0 else 0.0,
+    }
+
+
+def format_summary(name: str, summary: Dict[str, float]) -> str:
+    return (
+        f"{name:<44} {summary['count']:>7} {summary['p50_ms']:>10.3f} {summary['p99_ms']:>10.3f} "
+        f"{summary['max_ms']:>10.3f} {summary['ops_per_second']:>12.1f}"
+    )
+
+
+def format_header() -> str:
+    return f"{'benchmark':<44} {'count':>7} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10} {'ops/s':>12}"
@@ -0,0 +1,83 @@
+"""
+The benchmark cases as a pytest-benchmark suite.
+
+Run from the root of the repo with:
+    pytest benchmarks --benchmark-only
+
+Use --benchmark-autosave and --benchmark-compare-fail=median:25% to fail on regressions between runs.
+"""
+
+import logging
+
+import pytest
+
+from application.data.scoring_type import ScoringType
+from application.data.word_manager import WordManager
+from benchmarks import cases
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def word_manager() -> WordManager:
+    return WordManager()
+
+
+@pytest.fixture(autouse=True)
+def disable_info_logging():
+    # Per-guess logging would otherwise dominate the measurements
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_word_manager_load_compiled(benchmark):
+    benchmark(cases.word_manager_load_compiled())
+
+
+def test_word_manager_compile(benchmark):
+    benchmark.pedantic(cases.word_manager_compile(), rounds=3)
+
+
+@pytest.mark.parametrize("size", [(4, 4), (5, 5), (10, 10)])
+def test_board_generation(benchmark, word_manager, size):
+    benchmark(cases.board_generation(word_manager, *size))
+
+
+@pytest.mark.parametrize("case", cases.ADVERSARIAL_BOARDS)
+def test_board_solve(benchmark, word_manager, case):
+    benchmark(cases.board_solve(word_manager, case))
+
+
+@pytest.mark.parametrize("scoring_type", ScoringType)
+def test_score_state_preview(benchmark, word_manager, scoring_type):
+    benchmark(cases.score_state_preview(word_manager, scoring_type))
+
+
+@pytest.mark.parametrize("scoring_type", ScoringType)
+def test_end_game(benchmark, word_manager, scoring_type):
+    benchmark(cases.end_game(word_manager, scoring_type))
+
+
+@pytest.mark.parametrize("scoring_type", ScoringType)
+def test_guess_stream(benchmark, word_manager, scoring_type):
+    benchmark(cases.guess_stream(word_manager, scoring_type))
+
+
+@pytest.mark.parametrize("batched", [False, True], ids=["per_word", "batched"])
+@pytest.mark.parametrize("scoring_type", ScoringType)
+def test_round_scoring(benchmark, word_manager, scoring_type, batched):
+    benchmark(cases.round_scoring(word_manager, scoring_type, batched))
+
+
+@pytest.mark.parametrize("over_limit", [False, True], ids=["allowed", "rejected"])
+def test_rate_limiter_check(benchmark, over_limit):
+    benchmark(cases.rate_limiter_check(over_limit))
+
+
+def test_snapshot_save(benchmark, word_manager):
+    benchmark.pedantic(cases.snapshot_save(word_manager), rounds=3)
+
+
+def test_snapshot_restore(benchmark, word_manager):
+    benchmark.pedantic(cases.snapshot_restore(word_manager), rounds=3)
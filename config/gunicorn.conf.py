@@ -1,3 +1,24 @@
+import gc
+import os
+
 worker_class = 'eventlet'
-workers = 1
+# More than one worker needs REDIS_URL set so that game state is shared between workers
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
 timeout = 30
+
+# With PRELOAD_APP set the application and its dictionary are loaded once by the master process and
+# the workers are forked from it. Each worker starts serving games once it is forked and patched by eventlet.
+preload_app = os.environ.get('PRELOAD_APP', '') not in ('', '0')
+
+
+def when_ready(server):
+    if preload_app:
+        # Keep the garbage collector from writing to the preloaded objects shared with the workers
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    if preload_app:
+        from application import start_worker
+
+        start_worker(worker.wsgi)
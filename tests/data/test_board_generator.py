@@ -0,0 +1,68 @@
+from application.data.board_generator import BoardGenerator, BoardQuality
+from application.data.board_layout import BoardLayout
+from application.data.board_solver import BoardSolution
+from application.data.letter_distribution import DEFAULT_LETTERS
+from application.data.word_manager import WordManager
+
+WORDS = {"tea", "eat", "ate", "seat", "east", "teas", "eats", "sate", "stare", "tears", "rates", "treats"}
+
+
+def test_candidates_pass_letter_filters():
+    # A dictionary without any letters draws from the default English tiles
+    generator = BoardGenerator(WordManager(set()), seed=1)
+    candidates = generator.generate_candidates(500)
+
+    assert 0 < len(candidates) < 500
+    assert generator.candidates_filtered == 500 - len(candidates)
+    for tiles in candidates:
+        assert len(tiles) == 25
+        assert all(tile in DEFAULT_LETTERS for tile in tiles)
+        assert 6 <= sum(tile in "aeiou" for tile in tiles) <= 14
+        assert "q" not in tiles or "u" in tiles
+
+
+def test_boards_are_drawn_from_the_letters_of_the_dictionary():
+    # Too few letters for any board to pass the letter filters
+    generator = BoardGenerator(WordManager({"tea", "eat"}), quality=BoardQuality(min_words=1, min_long_words=0), seed=1)
+
+    tiles, solution = generator.generate()
+
+    assert set(tiles) <= {"t", "e", "a"}
+    assert solution.word_count >= 1
+
+
+def test_quality_bounds():
+    quality = BoardQuality(min_words=2, max_words=3, min_long_words=1, long_word_length=5)
+
+    assert not quality.accepts(BoardSolution({"tea": [0, 1, 2]}))
+    assert not quality.accepts(BoardSolution({"tea": [0, 1, 2], "eat": [1, 2, 0]}))
+    assert quality.accepts(BoardSolution({"tea": [0, 1, 2], "stare": [3, 0, 2, 4, 1]}))
+    assert not quality.accepts(BoardSolution({word: [] for word in ["tea", "eat", "ate", "stare"]}))
+
+
+def test_quality_scales_with_layout():
+    quality = BoardQuality(min_words=50, max_words=200, min_long_words=4).for_layout(BoardLayout.for_size(10, 10))
+
+    assert quality.min_words == 200
+    assert quality.max_words == 800
+    assert quality.min_long_words == 16
+
+
+def test_generate_returns_accepted_board_with_solution():
+    generator = BoardGenerator(WordManager(WORDS), quality=BoardQuality(min_words=1, min_long_words=0), seed=1)
+
+    tiles, solution = generator.generate()
+
+    assert solution.word_count >= 1
+    assert solution.paths == generator.solver.solve(tiles).paths
+
+
+def test_generate_falls_back_to_best_board():
+    quality = BoardQuality(min_words=1000)
+    generator = BoardGenerator(WordManager(WORDS), quality=quality, max_attempts=5, seed=1)
+
+    tiles, solution = generator.generate()
+
+    assert len(tiles) == 25
+    assert generator.boards_solved == 5
+    assert generator.boards_rejected == 5
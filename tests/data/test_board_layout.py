@@ -0,0 +1,53 @@
+import pytest
+
+from application.data.board_layout import BoardLayout
+
+
+class TestBoardLayout:
+    def test_neighbors_4x4(self):
+        layout = BoardLayout.for_size(4, 4)
+        assert layout.total_tiles == 16
+        assert layout.neighbors[0] == [1, 4, 5]
+        assert layout.neighbors[5] == [0, 1, 2, 4, 6, 8, 9, 10]
+        assert layout.neighbors[15] == [10, 11, 14]
+
+    def test_neighbors_rectangular(self):
+        layout = BoardLayout.for_size(2, 3)
+        assert layout.neighbors[0] == [1, 3, 4]
+        assert layout.neighbors[2] == [1, 4, 5]
+        assert layout.neighbors[4] == [0, 1, 2, 3, 5]
+
+    def test_are_neighbors_10x10(self):
+        layout = BoardLayout.for_size(10, 10)
+        assert layout.are_neighbors(9, 18)
+        assert layout.are_neighbors(99, 88)
+        assert not layout.are_neighbors(9, 10)
+        assert not layout.are_neighbors(0, 0)
+
+    def test_are_neighbors_default_size(self):
+        expected_neighbors = {
+            0: [1, 5, 6],
+            1: [0, 2, 5, 6, 7],
+            4: [3, 8, 9],
+            7: [1, 2, 3, 6, 8, 11, 12, 13],
+            20: [15, 16, 21],
+            23: [17, 18, 19, 22, 24],
+            24: [18, 19, 23],
+        }
+        layout = BoardLayout.for_size()
+        for tile, neighbors in expected_neighbors.items():
+            for other_tile in range(layout.total_tiles):
+                assert layout.are_neighbors(tile, other_tile) is (other_tile in neighbors)
+
+    def test_are_neighbors_out_of_bounds(self):
+        with pytest.raises(ValueError):
+            BoardLayout.for_size(4, 4).are_neighbors(0, 16)
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            BoardLayout.for_size(1, 5)
+        with pytest.raises(ValueError):
+            BoardLayout.for_size(5, 100)
+
+    def test_for_size_is_cached(self):
+        assert BoardLayout.for_size(6, 6) is BoardLayout.for_size(6, 6)
@@ -0,0 +1,122 @@
+import os
+
+from application.data.board_generator import BoardGenerator, BoardQuality
+from application.data.board_layout import BoardLayout
+from application.data.board_pool import BoardPool, decode_board, encode_board
+from application.data.board_solver import BoardSolution
+from application.data.word_manager import WordManager
+
+WORDS = {"tea", "eat", "ate", "seat", "east", "teas", "eats", "sate", "stare", "tears", "rates", "treats"}
+ANY_BOARD = BoardQuality(min_words=0, min_long_words=0)
+
+
+def _save_pool(directory, word_manager: WordManager = None, layout: BoardLayout = None, size: int = 2) -> BoardPool:
+    pool = BoardPool(_create_generator(word_manager, layout), size=size, directory=str(directory))
+    pool.refill()
+    pool.save()
+    return pool
+
+
+def _create_generator(word_manager: WordManager = None, layout: BoardLayout = None) -> BoardGenerator:
+    return BoardGenerator(word_manager if word_manager else WordManager(WORDS), layout, quality=ANY_BOARD, seed=1)
+
+
+def test_generate_counts_hits_and_misses():
+    pool = BoardPool(_create_generator(), size=2)
+
+    pool.generate()
+    assert pool.misses == 1
+
+    assert pool.refill() == 2
+    pool.generate()
+    assert pool.get_metrics() == {"size": 1, "hits": 1, "misses": 1, "boards_generated": 3, "boards_loaded": 0}
+
+
+def test_needs_refill_below_threshold():
+    pool = BoardPool(_create_generator(), size=4, refill_threshold=2)
+    assert pool.needs_refill()
+
+    pool.refill()
+    pool.generate()
+    pool.generate()
+    assert not pool.needs_refill()
+
+    pool.generate()
+    assert pool.needs_refill()
+    assert pool.refill() == 3
+
+
+def test_saved_boards_are_loaded_with_their_solutions(tmp_path):
+    word_manager = WordManager(WORDS)
+    saved = _save_pool(tmp_path, word_manager, size=3)
+    saved_boards = list(saved._boards)
+
+    loaded = BoardPool(_create_generator(word_manager), size=3, directory=str(tmp_path))
+    assert len(loaded) == 0
+    assert not loaded.needs_refill()
+    assert loaded.boards_loaded == 3
+
+    for saved_tiles, saved_solution in saved_boards:
+        tiles, solution = loaded.generate()
+        assert tiles == saved_tiles
+        assert solution.paths == saved_solution.paths
+        assert solution.max_score == saved_solution.max_score
+
+
+def test_pool_file_is_claimed_by_one_worker(tmp_path):
+    word_manager = WordManager(WORDS)
+    _save_pool(tmp_path, word_manager)
+
+    first = BoardPool(_create_generator(word_manager), size=2, directory=str(tmp_path))
+    second = BoardPool(_create_generator(word_manager), size=2, directory=str(tmp_path))
+    first.needs_refill()
+    second.needs_refill()
+
+    assert len(first) == 2
+    assert len(second) == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_refilling_does_not_save_boards_still_handed_out(tmp_path):
+    pool = BoardPool(_create_generator(), size=2, directory=str(tmp_path))
+    pool.refill()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_boards_for_another_dictionary_are_discarded(tmp_path):
+    _save_pool(tmp_path)
+
+    pool = BoardPool(_create_generator(WordManager(WORDS | {"rat"})), size=2, directory=str(tmp_path))
+
+    assert pool.needs_refill()
+    assert len(pool) == 0
+
+
+def test_pools_are_saved_per_board_size(tmp_path):
+    _save_pool(tmp_path)
+
+    pool = BoardPool(_create_generator(layout=BoardLayout.for_size(4, 4)), size=2, directory=str(tmp_path))
+
+    assert len(pool) == 0
+    assert pool.path.endswith("board_pool_english_4x4.pool")
+
+
+def test_pools_are_saved_per_dictionary(tmp_path):
+    _save_pool(tmp_path)
+
+    pool = BoardPool(_create_generator(WordManager(WORDS, name="short")), size=2, directory=str(tmp_path))
+
+    assert len(pool) == 0
+    assert pool.path.endswith("board_pool_short_5x5.pool")
+
+
+def test_boards_with_non_ascii_tiles_round_trip():
+    tiles = ["é", "t", "é", "x"]
+    solution = BoardSolution({"été": [0, 1, 2]})
+
+    (decoded_tiles, decoded_solution), offset = decode_board(encode_board(tiles, solution) + b"next", 0, len(tiles))
+
+    assert decoded_tiles == tiles
+    assert decoded_solution.paths == {"été": [0, 1, 2]}
+    assert offset == len(encode_board(tiles, solution))
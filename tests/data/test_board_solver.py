@@ -0,0 +1,41 @@
+from application.data.board_solver import BOARD_SEARCH_NODES, BoardSolver
+from application.data.board_layout import BoardLayout
+from application.data.word_trie import WordTrie
+
+
+class TestBoardSolver:
+    def setup_method(self):
+        self.tiles = [
+            "s", "a", "b", "e", "r",
+            "j", "t", "t", "s", "x",
+            "z", "z", "z", "z", "z",
+            "s", "z", "z", "z", "z",
+            "z", "z", "z", "z", "z"
+        ]
+        trie = WordTrie.from_words(["set", "states", "saber", "bats", "test", "jaba", "armory", "sabers"])
+        self.solution = BoardSolver(trie, BoardLayout.for_size().neighbors).solve(self.tiles)
+
+    def test_solve_finds_words_on_board(self):
+        assert sorted(self.solution.paths) == ["bats", "saber", "sabers", "set", "states"]
+        assert self.solution.word_count == 5
+
+    def test_solve_paths_spell_words(self):
+        for word, path in self.solution.paths.items():
+            assert "".join(self.tiles[tile] for tile in path) == word
+            assert len(set(path)) == len(path)
+            for first, second in zip(path, path[1:]):
+                assert second in BoardLayout.for_size().neighbors[first]
+
+    def test_max_score(self):
+        # set and bats score 1, saber scores 2 and sabers and states score 3
+        assert self.solution.max_score == 10
+
+    def test_search_nodes_are_measured(self):
+        searches = BOARD_SEARCH_NODES.get_count()
+        nodes = BOARD_SEARCH_NODES.get_sum()
+
+        BoardSolver(WordTrie.from_words(["set"]), BoardLayout.for_size().neighbors).solve(self.tiles)
+
+        assert BOARD_SEARCH_NODES.get_count() == searches + 1
+        # Every tile starts a search, and each s continues to its neighboring e
+        assert BOARD_SEARCH_NODES.get_sum() - nodes > len(self.tiles)
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from application.data.dictionary_registry import DictionaryInfo, DictionaryRegistry
+
+
+def _create_registry(directory, names, max_loaded: int = 2) -> DictionaryRegistry:
+    dictionaries = []
+    for name in names:
+        word_file = directory / f"{name}.txt"
+        word_file.write_text(f"{name}\ntea\n")
+        dictionaries.append(DictionaryInfo(name, name.title(), str(word_file)))
+    return DictionaryRegistry(dictionaries, max_loaded=max_loaded)
+
+
+def test_dictionaries_are_loaded_on_first_use(tmp_path):
+    registry = _create_registry(tmp_path, ["first", "second"])
+    assert registry.loads == 0
+
+    first = registry.get()
+
+    assert first.name == "first"
+    assert first.is_word("first")
+    assert not first.is_word("second")
+    assert registry.get("first") is first
+    assert registry.get("second").is_word("second")
+    assert registry.loads == 2
+
+
+def test_least_recently_used_dictionary_is_unloaded(tmp_path):
+    registry = _create_registry(tmp_path, ["first", "second", "third"])
+    unloaded = []
+    registry.add_unload_listener(unloaded.append)
+
+    first = registry.get("first")
+    registry.get("second")
+    registry.get("first")
+    registry.get("third")
+
+    assert unloaded == ["second"]
+    assert list(registry.loaded) == ["first", "third"]
+    assert registry.get("first") is first
+    assert registry.get_metrics() == {"loaded_dictionaries": 2, "dictionary_loads": 3, "dictionary_evictions": 1}
+
+
+def test_unknown_dictionary(tmp_path):
+    registry = _create_registry(tmp_path, ["first"])
+
+    assert "first" in registry
+    assert "missing" not in registry
+    with pytest.raises(KeyError):
+        registry.get("missing")
+    with pytest.raises(ValueError):
+        DictionaryRegistry(registry.get_dictionaries(), default_name="missing")
+
+
+def test_from_file(tmp_path):
+    (tmp_path / "lists").mkdir()
+    (tmp_path / "lists" / "spanish.txt").write_text("año\nniño\n")
+    (tmp_path / "lists" / "kids.txt").write_text("cat\n")
+    manifest = {
+        "default": "kids",
+        "dictionaries": [
+            {"name": "spanish", "title": "Español", "word_file": "lists/spanish.txt", "vowels": "aeiouáéíóú"},
+            {"name": "kids", "word_file": "lists/kids.txt"},
+        ],
+    }
+    (tmp_path / "dictionaries.json").write_text(json.dumps(manifest))
+
+    registry = DictionaryRegistry.from_file(str(tmp_path / "dictionaries.json"))
+
+    assert registry.default_name == "kids"
+    assert [info.title for info in registry.get_dictionaries()] == ["Español", "kids"]
+    spanish = registry.get("spanish")
+    assert spanish.is_word("niño")
+    assert spanish.vowels == "aeiouáéíóú"
+    assert "ñ" in spanish.letter_distribution.letters
+    assert registry.get().letter_distribution.letters == ["a", "c", "t"]
@@ -0,0 +1,188 @@
+import pytest
+
+from application.data.board_generator import BoardQuality
+from application.data.board_layout import BoardLayout
+from application.data.dictionary_registry import DictionaryInfo, DictionaryRegistry
+from application.data.game_manager import GameManager
+from application.data.word_manager import WordManager
+from application.util.scheduler import Scheduler
+from tests.data.test_word_manager import TestWordManager
+
+
+class TestGameManager:
+    def setup_method(self):
+        self.now = 0
+        scheduler = Scheduler(clock=lambda: self.now)
+        self.game_manager = GameManager(TestWordManager(), max_games=3, idle_ttl_seconds=60, scheduler=scheduler)
+
+    def test_get_game_state(self):
+        game_state = self.game_manager.create_game()
+        assert self.game_manager.get_game_state(game_state.game_name.lower()) is game_state
+        assert self.game_manager.get_game_state("NONE") is None
+
+    def test_capacity_evicts_least_recently_used(self):
+        first = self.game_manager.create_game_for_name("AAAA")
+        self.game_manager.create_game_for_name("BBBB")
+        self.game_manager.create_game_for_name("CCCC")
+
+        # Touching the first game makes the second game the least recently used
+        self.game_manager.get_game_state("AAAA")
+        self.game_manager.create_game_for_name("DDDD")
+
+        assert list(self.game_manager.games) == ["CCCC", "AAAA", "DDDD"]
+        assert self.game_manager.get_game_state("AAAA") is first
+        assert self.game_manager.capacity_evictions == 1
+
+    def test_expire_idle_games(self):
+        self.game_manager.create_game_for_name("AAAA").last_activity = 0
+        self.game_manager.create_game_for_name("BBBB").last_activity = 30 * 1000
+        self.game_manager.create_game_for_name("CCCC").last_activity = 90 * 1000
+
+        assert self.game_manager.expire_idle_games(now=100 * 1000) == 2
+        assert list(self.game_manager.games) == ["CCCC"]
+        assert self.game_manager.idle_evictions == 2
+
+    def test_expired_game_is_closed(self):
+        game_state = self.game_manager.create_game_for_name("AAAA")
+        game_state.round_scorer.add_guess("player", "word")
+        game_state.last_activity = 0
+
+        self.game_manager.expire_idle_games(now=100 * 1000)
+
+        assert not game_state.game_running
+        assert game_state.valid_guesses == {}
+
+    def test_expired_game_round_timer_is_cancelled(self):
+        game_state = self.game_manager.create_game_for_name("AAAA")
+        game_state.last_activity = -60 * 1000
+
+        self.game_manager.expire_idle_games()
+
+        assert len(self.game_manager.scheduler) == 0
+
+    def test_live_feed_is_coalesced(self):
+        live_feeds = []
+        self.game_manager.add_live_feed_listener(live_feeds.append)
+        live_game = self.game_manager.create_game_for_name("AAAA", live_feed=True)
+        game = self.game_manager.create_game_for_name("BBBB")
+        for game_state in (live_game, game):
+            game_state.new_board(["s", "e", "t", "a"] + ["z"] * 21)
+            game_state.guess_word("player", "set")
+            game_state.guess_words("other", ["set", "eat", "tea"])
+
+        assert self.game_manager.flush_live_feeds() == 1
+        assert live_feeds == [live_game]
+
+        # Nothing changed since the last tick
+        assert self.game_manager.flush_live_feeds() == 0
+        assert live_feeds == [live_game]
+
+    def test_live_feed_of_expired_game_is_dropped(self):
+        live_feeds = []
+        self.game_manager.add_live_feed_listener(live_feeds.append)
+        live_game = self.game_manager.create_game_for_name("AAAA", live_feed=True)
+        live_game.new_board(["s", "e", "t"] + ["z"] * 22)
+        live_game.guess_word("player", "set")
+        live_game.last_activity = 0
+
+        self.game_manager.expire_idle_games(now=100 * 1000)
+
+        assert self.game_manager.flush_live_feeds() == 0
+        assert live_feeds == []
+
+    def test_get_metrics(self):
+        self.game_manager.create_game_for_name("AAAA")
+        self.game_manager.create_game_for_name("BBBB")
+
+        metrics = self.game_manager.get_metrics()
+        assert metrics["live_games"] == 2
+        assert metrics["idle_evictions"] == 0
+        assert metrics["capacity_evictions"] == 0
+        assert metrics["estimated_bytes_per_game"] > 0
+
+    def test_board_pools_are_shared_by_board_size(self):
+        game_manager = GameManager(
+            WordManager({"tea", "eat"}), board_quality=BoardQuality(min_words=0, min_long_words=0)
+        )
+
+        first = game_manager.create_game_for_name("AAAA")
+        second = game_manager.create_game_for_name("BBBB")
+        large = game_manager.create_game_for_name("CCCC", layout=BoardLayout.for_size(6, 6))
+
+        assert first.board_pool is second.board_pool
+        assert large.board_pool is not first.board_pool
+        assert large.board_pool.layout.total_tiles == 36
+        assert len(large.game_tiles) == 36
+
+    def test_boards_are_random_without_board_quality(self):
+        assert self.game_manager.create_game().board_pool is None
+
+    def test_board_pool_metrics(self):
+        game_manager = GameManager(
+            WordManager({"tea", "eat"}), board_quality=BoardQuality(min_words=0, min_long_words=0), board_pool_size=2
+        )
+        game_manager.get_board_pool().refill()
+
+        game_manager.create_game_for_name("AAAA")
+
+        metrics = game_manager.get_metrics()
+        assert metrics["board_pool_english_5x5_size"] == 1
+        assert metrics["board_pool_english_5x5_hits"] == 1
+        assert metrics["board_pool_english_5x5_misses"] == 0
+        assert metrics["loaded_dictionaries"] == 1
+
+    def test_games_choose_their_dictionary(self, tmp_path):
+        game_manager = GameManager(
+            _create_dictionaries(tmp_path), board_quality=BoardQuality(min_words=0, min_long_words=0)
+        )
+
+        default = game_manager.create_game_for_name("AAAA")
+        short = game_manager.create_game_for_name("BBBB", dictionary="short")
+
+        assert default.word_manager.name == "english"
+        assert short.word_manager.name == "short"
+        assert short.get_record()["dictionary"] == "short"
+        assert short.board_pool is not default.board_pool
+        assert set(short.game_tiles) <= {"t", "e", "a"}
+        with pytest.raises(KeyError):
+            game_manager.create_game_for_name("CCCC", dictionary="missing")
+
+    def test_unloaded_dictionaries_lose_their_board_pools(self, tmp_path):
+        game_manager = GameManager(
+            _create_dictionaries(tmp_path, max_loaded=1), board_quality=BoardQuality(min_words=0, min_long_words=0)
+        )
+        english = game_manager.create_game_for_name("AAAA")
+
+        short = game_manager.create_game_for_name("BBBB", dictionary="short")
+
+        assert list(game_manager.board_pools) == [("short", 5, 5)]
+        assert game_manager.dictionaries.evictions == 1
+        # Games already playing the unloaded dictionary keep it
+        english.new_board()
+        assert english.word_manager.name == "english"
+        assert short.board_pool is game_manager.get_board_pool(dictionary="short")
+
+    def test_collect_metrics(self):
+        self.game_manager.create_game_for_name("AAAA").add_session("session-1", "player-1")
+        game_state = self.game_manager.create_game_for_name("BBBB")
+        game_state.add_session("session-2", "player-2")
+        game_state.add_session("session-3", "player-3")
+        self.game_manager.create_game_for_name("CCCC")
+
+        metrics = {metric.name: metric for metric in self.game_manager.collect_metrics()}
+
+        assert metrics["scrambled_words_live_games"].get() == 3
+        assert metrics["scrambled_words_active_rooms"].get() == 2
+        assert metrics["scrambled_words_players_per_room"].get_sum() == 3
+
+
+def _create_dictionaries(directory, max_loaded: int = 2) -> DictionaryRegistry:
+    (directory / "english.txt").write_text("tea\neat\nseat\nstare\n")
+    (directory / "short.txt").write_text("tea\neat\n")
+    return DictionaryRegistry(
+        [
+            DictionaryInfo("english", "English", str(directory / "english.txt")),
+            DictionaryInfo("short", "Short", str(directory / "short.txt")),
+        ],
+        max_loaded=max_loaded,
+    )
@@ -0,0 +1,152 @@
+from application.data.game_manager import GameManager
+from application.data.game_snapshot import decode_snapshot, encode_snapshot
+from application.data.scoring_type import ScoringType
+from application.data.word_manager import WordManager
+from application.util.scheduler import Scheduler
+from tests.data.test_word_manager import TestWordManager
+
+TILES = list("saberjttsxzzzzzszzzzzzzzz")
+
+
+class TestGameSnapshot:
+    def setup_method(self):
+        self.now = 0
+        self.word_manager = TestWordManager()
+        self.game_manager = self._create_game_manager()
+
+    def _create_game_manager(self) -> GameManager:
+        return GameManager(self.word_manager, scheduler=Scheduler(clock=lambda: self.now))
+
+    def test_games_are_restored(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        running = self.game_manager.create_game_for_name("RUNS", ScoringType.DISTRIBUTED_INTEGER, live_feed=True)
+        running.new_board(list(TILES))
+        running.guess_words("player", ["states", "set"])
+        running.guess_word("other", "set")
+        ended = self.game_manager.create_game_for_name("ENDS")
+        ended.new_board(list(TILES))
+        ended.guess_word("player", "states")
+        ended.end_game()
+
+        assert self.game_manager.save_snapshot(path) == 2
+        restarted = self._create_game_manager()
+        assert restarted.load_snapshot(path) == 2
+
+        assert list(restarted.games) == ["RUNS", "ENDS"]
+        restored = restarted.get_game_state("RUNS")
+        assert restored.game_tiles == TILES
+        assert restored.round_id == running.round_id
+        assert restored.expire_time == running.expire_time
+        assert restored.scoring_type == ScoringType.DISTRIBUTED_INTEGER
+        assert restored.live_feed
+        assert restored.game_running
+        assert restored.solution.paths == running.solution.paths
+        assert restored.get_game_state("player") == running.get_game_state("player")
+        assert restored.get_round_score("player") == running.get_round_score("player")
+        assert restored.guess_word("player", "set") is None
+        assert restored.guess_word("other", "states") is not None
+
+        restored_ended = restarted.get_game_state("ENDS")
+        assert not restored_ended.game_running
+        assert restored_ended.scores == {"player": 3}
+        assert restored_ended.get_score_state("player") == ended.get_score_state("player")
+
+        # Only the running round's timer is re-armed
+        assert len(restarted.scheduler) == 1
+
+    def test_round_timer_is_rearmed(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        game_state = self.game_manager.create_game_for_name("GAME")
+        game_state.new_board(list(TILES))
+        game_state.guess_word("player", "set")
+        self.game_manager.save_snapshot(path)
+
+        restarted = self._create_game_manager()
+        ended_games = []
+        restarted.add_round_end_listener(ended_games.append)
+        restarted.load_snapshot(path)
+
+        restarted.scheduler.run_due()
+        assert ended_games == []
+
+        self.now = game_state.expire_time
+        restarted.scheduler.run_due()
+        assert ended_games == [restarted.games["GAME"]]
+        assert restarted.games["GAME"].scores == {"player": 1}
+
+    def test_round_that_expired_while_down_is_ended(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        game_state = self.game_manager.create_game_for_name("GAME")
+        game_state.new_board(list(TILES))
+        game_state.guess_word("player", "set")
+        self.game_manager.save_snapshot(path)
+
+        self.now = game_state.expire_time + 60 * 1000
+        restarted = self._create_game_manager()
+        ended_games = []
+        restarted.add_round_end_listener(ended_games.append)
+        restarted.load_snapshot(path)
+
+        assert restarted.games["GAME"].game_running
+        restarted.scheduler.run_due()
+        assert ended_games == [restarted.games["GAME"]]
+        assert restarted.games["GAME"].scores == {"player": 1}
+
+    def test_boards_are_solved_again_with_another_dictionary(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        game_state = self.game_manager.create_game_for_name("GAME")
+        game_state.new_board(list(TILES))
+        self.game_manager.save_snapshot(path)
+        assert "states" in decode_snapshot(encode_snapshot([game_state.get_snapshot()]))[0].solution
+
+        restarted = GameManager(WordManager({"set", "sat"}), scheduler=Scheduler(clock=lambda: self.now))
+        restarted.load_snapshot(path)
+
+        assert set(restarted.games["GAME"].solution.paths) == {"set", "sat"}
+
+    def test_games_with_non_ascii_tiles_are_restored(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        word_manager = WordManager({"été"}, name="french")
+        game_manager = GameManager(word_manager, scheduler=Scheduler(clock=lambda: self.now))
+        tiles = list("étéx") + ["z"] * 21
+        game_manager.create_game_for_name("GAME").new_board(list(tiles))
+        game_manager.create_game_for_name("NEXT")
+        game_manager.save_snapshot(path)
+
+        restarted = GameManager(word_manager, scheduler=Scheduler(clock=lambda: self.now))
+
+        assert restarted.load_snapshot(path) == 2
+        assert restarted.games["GAME"].game_tiles == tiles
+        assert set(restarted.games["GAME"].solution.paths) == {"été"}
+
+    def test_snapshot_is_written_by_the_given_executor(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        self.game_manager.create_game_for_name("GAME").new_board(list(TILES))
+        executed = []
+
+        def execute(function, *args):
+            executed.append(function)
+            return function(*args)
+
+        assert self.game_manager.save_snapshot(path, execute) == 1
+
+        assert len(executed) == 1
+        assert self._create_game_manager().load_snapshot(path) == 1
+
+    def test_games_with_an_unknown_dictionary_are_not_restored(self, tmp_path):
+        path = str(tmp_path / "games.snapshot")
+        self.game_manager.create_game_for_name("GAME")
+        self.game_manager.save_snapshot(path)
+
+        restarted = GameManager(WordManager(set(), name="other"), scheduler=Scheduler(clock=lambda: self.now))
+
+        assert restarted.load_snapshot(path) == 0
+        assert len(restarted.games) == 0
+
+    def test_missing_or_unreadable_snapshot(self, tmp_path):
+        assert self.game_manager.load_snapshot(str(tmp_path / "missing.snapshot")) == 0
+
+        unreadable = tmp_path / "unreadable.snapshot"
+        unreadable.write_bytes(b"not a snapshot at all, just some bytes")
+        assert self.game_manager.load_snapshot(str(unreadable)) == 0
+        assert len(self.game_manager.games) == 0
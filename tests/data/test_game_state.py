@@ -1,13 +1,19 @@
-from typing import List
+import random
+import sys
+import threading
+from typing import Dict, List
 
 from application import WordManager
-from application.data.game_state import GameState
+from application.data.game_state import GUESSES, GameState, TOTAL_TIME_SECONDS
+from application.data.round_scorer import RoundScorer
+from application.data.scoring_type import ScoringType
+from application.util.scheduler import Scheduler
 from tests.data.test_word_manager import TestWordManager
 
 
 class TestGameState:
     def setup_method(self):
-        # Create a word manager that accepts any word
+        # Create a word manager that knows the words guessed by the tests
         word_manager = TestWordManager()
 
         tiles = [
@@ -29,57 +35,239 @@ class TestGameState:
         assert self.game_state.guess_word("player", "armory") is None
         assert self.game_state.guess_word("player", "test") is None
 
+    def test_guess_words(self):
+        self.game_state.guess_word("player", "set")
+        word_paths = self.game_state.guess_words("player", ["SET", "states", "armory", "States", "bats"])
+
+        assert word_paths[0] is None
+        assert word_paths[1] == [0, 6, 1, 7, 3, 8]
+        assert word_paths[2] is None
+        assert word_paths[3] is None
+        assert word_paths[4] is not None
+        assert self.game_state.valid_guesses["player"] == {"set", "states", "bats"}
+        assert self.game_state.get_round_score("player") == 5
+
+    def test_guess_words_after_game_ended(self):
+        self.game_state.end_game()
+        assert self.game_state.guess_words("player", ["set", "states"]) == [None, None]
+
+    def test_guesses_are_counted_by_result(self):
+        before = {result: GUESSES.get((result,)) for result in ["valid", "invalid", "duplicate"]}
+
+        self.game_state.guess_word("player", "set")
+        self.game_state.guess_word("player", "set")
+        self.game_state.guess_words("player", ["states", "armory", "set"])
+
+        assert GUESSES.get(("valid",)) - before["valid"] == 2
+        assert GUESSES.get(("invalid",)) - before["invalid"] == 1
+        assert GUESSES.get(("duplicate",)) - before["duplicate"] == 2
+
+    def test_get_game_state(self):
+        self.game_state.guess_word("player", "set")
+
+        game_state = self.game_state.get_game_state("player")
+
+        assert game_state["tiles"] == "saberjttsxzzzzzszzzzzzzzz"
+        assert game_state["player_guesses"] == ["set"]
+        assert game_state["player_total_score"] == 0
+        assert game_state["version"] == f"{self.game_state.round_id}:1"
+        assert "delta" not in game_state
+
+    def test_get_game_state_since_version(self):
+        self.game_state.guess_word("player", "set")
+        version = self.game_state.get_game_state("player")["version"]
+        self.game_state.guess_words("player", ["states", "bats"])
+
+        game_state = self.game_state.get_game_state("player", since_version=version)
+
+        assert game_state == {
+            "version": f"{self.game_state.round_id}:3",
+            "delta": True,
+            "player_guesses": ["states", "bats"],
+            "player_id": "player",
+            "player_total_score": 0,
+        }
+        assert self.game_state.get_version("player") == game_state["version"]
+
+    def test_get_game_state_since_unknown_version(self):
+        self.game_state.guess_word("player", "set")
+        version = self.game_state.get_version("player")
+        self.game_state.new_board(self.game_state.game_tiles)
+
+        for since_version in [version, f"{self.game_state.round_id}:5", f"{self.game_state.round_id}:x", "", 3]:
+            game_state = self.game_state.get_game_state("player", since_version=since_version)
+
+            assert "delta" not in game_state
+            assert game_state["tiles"] == "".join(self.game_state.game_tiles)
+            assert game_state["player_guesses"] == []
+
     def test_guess_word_unrecognized(self):
         self.game_state.word_manager = WordManager({"test"})
         assert self.game_state.guess_word("player", "word") is None
 
-    def test_word_is_on_board_valid(self):
-        assert self.game_state._word_is_on_board("set") is not None
-        assert self.game_state._word_is_on_board("sat") is not None
-        assert self.game_state._word_is_on_board("state") is not None
-        assert self.game_state._word_is_on_board("states") is not None
-        assert self.game_state._word_is_on_board("rest") is not None
-        assert self.game_state._word_is_on_board("saber") is not None
-        assert self.game_state._word_is_on_board("stab") is not None
-        assert self.game_state._word_is_on_board("best") is not None
-        assert self.game_state._word_is_on_board("bat") is not None
-        assert self.game_state._word_is_on_board("bats") is not None
+    def test_round_ends_at_expire_time(self):
+        now = [0]
+        scheduler = Scheduler(clock=lambda: now[0])
+        game_state = GameState("test", TestWordManager(), self.game_state.game_tiles, scheduler=scheduler)
+        assert game_state.expire_time == TOTAL_TIME_SECONDS * 1000
+
+        now[0] = game_state.expire_time - 1
+        scheduler.run_due()
+        assert game_state.guess_word("player", "set") is not None
 
-    def test_word_is_on_board_invalid(self):
-        assert self.game_state._word_is_on_board("armory") is None
+        now[0] = game_state.expire_time
+        scheduler.run_due()
+        assert game_state.guess_word("player", "sat") is None
 
-    def test_word_is_on_board_invalid_reuse(self):
-        assert self.game_state._word_is_on_board("test") is None
-        assert self.game_state._word_is_on_board("jaba") is None
+    def test_new_board_cancels_round_timer(self):
+        scheduler = Scheduler(clock=lambda: 0)
+        game_state = GameState("test", TestWordManager(), self.game_state.game_tiles, scheduler=scheduler)
+        game_state.new_board(self.game_state.game_tiles)
+        assert len(scheduler) == 1
 
-    def test_tiles_are_neighbors_0(self):
-        TestGameState._assert_neighbors(0, [1, 5, 6])
+    def test_end_game_scores_round_once(self):
+        ended_games = []
+        self.game_state.on_round_end = ended_games.append
+        self.game_state.guess_word("player", "states")
+        self.game_state.guess_word("player", "set")
+        self.game_state.guess_word("other", "set")
 
-    def test_tiles_are_neighbors_1(self):
-        TestGameState._assert_neighbors(1, [0, 2, 5, 6, 7])
+        assert self.game_state.get_score_state("player")["total_score"] == 3
+        self.game_state.end_game()
+        self.game_state.end_game()
 
-    def test_tiles_are_neighbors_4(self):
-        TestGameState._assert_neighbors(4, [3, 8, 9])
+        score_state = self.game_state.get_score_state("player")
+        assert score_state["scored_words"] == ["states"]
+        assert score_state["unscored_words"] == ["set"]
+        assert score_state["total_score"] == 3
+        assert self.game_state.get_score_state("player") is score_state
+        assert self.game_state.scores == {"player": 3, "other": 0}
+        assert ended_games == [self.game_state]
 
-    def test_tiles_are_neighbors_7(self):
-        TestGameState._assert_neighbors(7, [1, 2, 3, 6, 8, 11, 12, 13])
+    def test_get_leaderboard(self):
+        self.game_state.guess_word("player", "states")
+        self.game_state.guess_word("other", "set")
+        assert self.game_state.get_round_score("player") == 3
 
-    def test_tiles_are_neighbors_20(self):
-        TestGameState._assert_neighbors(20, [15, 16, 21])
+        leaderboard = self.game_state.get_leaderboard()
+        assert [entry["player_id"] for entry in leaderboard] == ["player", "other"]
+        assert [entry["total_score"] for entry in leaderboard] == [3, 1]
 
-    def test_tiles_are_neighbors_23(self):
-        TestGameState._assert_neighbors(23, [17, 18, 19, 22, 24])
+        self.game_state.end_game()
+        self.game_state.new_board(self.game_state.game_tiles)
+        assert self.game_state.get_leaderboard()[0] == {
+            "player_id": "player",
+            "word_count": 0,
+            "round_score": 0,
+            "total_score": 3,
+        }
 
-    def test_tiles_are_neighbors_24(self):
-        TestGameState._assert_neighbors(24, [18, 19, 23])
+    def test_get_live_feed(self):
+        self.game_state.guess_words("player", ["states", "set"])
+        self.game_state.guess_word("other", "set")
 
-    @staticmethod
-    def _assert_neighbors(starting_tile: int, neighbors: List[int]):
-        for i in range(0, 25):
-            if i == starting_tile:
-                continue
+        live_feed = self.game_state.get_live_feed(leaderboard_size=1)
+
+        assert live_feed["words_found"] == 2
+        assert live_feed["board_word_count"] == self.game_state.solution.word_count
+        assert live_feed["players"] == 2
+        assert live_feed["leaderboard"] == [
+            {"player_id": "player", "word_count": 2, "round_score": 3, "total_score": 3}
+        ]
 
-            if i in neighbors:
-                assert GameState._tiles_are_neighbors(starting_tile, i) is True
+    def test_live_updates(self):
+        updated_games = []
+        game_state = GameState(
+            "test", TestWordManager(), self.game_state.game_tiles, game_timer=False, on_live_update=updated_games.append
+        )
+
+        # Only games in live feed mode report their guesses
+        game_state.guess_word("player", "set")
+        assert updated_games == []
+
+        game_state.live_feed = True
+        game_state.guess_word("player", "set")
+        game_state.guess_word("player", "armory")
+        game_state.guess_words("player", ["set", "armory"])
+        assert updated_games == []
+
+        game_state.guess_word("player", "states")
+        game_state.guess_words("player", ["bats", "stab"])
+        assert updated_games == [game_state, game_state]
+
+
+class TestGameStateConcurrency:
+    PLAYERS = 16
+    SUBMISSIONS_PER_PLAYER = 250
+
+    def setup_method(self):
+        tiles = ["s", "a", "b", "e", "r", "j", "t", "t", "s", "x"] + ["z"] * 5 + ["s"] + ["z"] * 9
+        words = {"abet", "ate", "bat", "bats", "best", "bet", "bets", "sabe", "saber", "sabers", "sat", "set"}
+        words |= {"stab", "stat", "states", "stats", "tab", "tabs", "tat", "tats", "nope", "zzzzzz"}
+        self.game_state = GameState(
+            "test", WordManager(words), tiles, scoring_type=ScoringType.DISTRIBUTED_FRACTIONAL, game_timer=False
+        )
+        self.words = sorted(self.game_state.solution.paths) + ["nope", "zzzzzz"]
+
+        # Switch threads as often as possible to make interleaving likely
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def teardown_method(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def _submit_guesses(self, player_id: str, accepted: List[str], start: threading.Barrier):
+        rng = random.Random(player_id)
+        start.wait()
+        for submission in range(self.SUBMISSIONS_PER_PLAYER):
+            if submission % 5 == 0:
+                batch = rng.sample(self.words, 4)
+                for word, word_path in zip(batch, self.game_state.guess_words(player_id, batch)):
+                    if word_path is not None:
+                        accepted.append(word)
             else:
-                assert GameState._tiles_are_neighbors(starting_tile, i) is False
+                word = rng.choice(self.words)
+                if self.game_state.guess_word(player_id, word) is not None:
+                    accepted.append(word)
+
+    def _run_players(self, during=None) -> Dict[str, List[str]]:
+        accepted = {f"player-{player}": [] for player in range(self.PLAYERS)}
+        start = threading.Barrier(self.PLAYERS + 1)
+        threads = [
+            threading.Thread(target=self._submit_guesses, args=(player_id, words, start))
+            for player_id, words in accepted.items()
+        ]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        if during:
+            during()
+        for thread in threads:
+            thread.join()
+        return accepted
+
+    def test_concurrent_guesses_are_counted_once(self):
+        accepted = self._run_players()
+
+        expected_scorer = RoundScorer(ScoringType.DISTRIBUTED_FRACTIONAL)
+        for player_id, words in accepted.items():
+            # Each word is accepted at most once per player and every valid word is eventually accepted
+            assert len(words) == len(set(words))
+            assert set(words) == self.game_state.valid_guesses[player_id]
+            for word in words:
+                expected_scorer.add_guess(player_id, word)
+
+        for player_id in accepted:
+            assert self.game_state.get_round_score(player_id) == expected_scorer.get_round_score(player_id)
+        for word in self.game_state.solution.paths:
+            assert self.game_state.round_scorer.get_guesser_count(word) == expected_scorer.get_guesser_count(word)
+
+    def test_round_end_during_guesses(self):
+        accepted = self._run_players(during=self.game_state.end_game)
+
+        # Guesses accepted before the round ended are all scored and none are accepted after it
+        for player_id, words in accepted.items():
+            assert set(words) == self.game_state.valid_guesses.get(player_id, set())
+        for player_id, score_state in self.game_state.round_score_states.items():
+            assert score_state["total_score"] == self.game_state.get_round_score(player_id)
+        assert self.game_state.scores.keys() == self.game_state.round_score_states.keys()
@@ -0,0 +1,32 @@
+from application.data.letter_distribution import DEFAULT_DISTRIBUTION, LetterDistribution
+
+COMMON_WORDS = ["tea", "eat", "seat", "east", "stare", "tears", "rates", "rest", "use", "sue"]
+
+
+def test_letters_are_weighted_by_how_often_they_appear():
+    distribution = LetterDistribution.from_text("tea\nEAT\nsee\n")
+
+    assert distribution.letters == ["a", "e", "s", "t"]
+    assert distribution.weights == [2, 4, 1, 2]
+
+
+def test_rare_letters_and_companions():
+    distribution = LetterDistribution.from_text("\n".join(COMMON_WORDS * 20 + ["quit", "quiet", "quiz", "zest"]))
+
+    assert distribution.rare_letters == "iqz"
+    # Q is always followed by U, while I and Z are followed by different letters or end the word
+    assert distribution.companions == {"q": "u"}
+
+
+def test_text_without_letters_uses_the_default_distribution():
+    assert LetterDistribution.from_text("") is DEFAULT_DISTRIBUTION
+    assert LetterDistribution.from_text("1\n2\n") is DEFAULT_DISTRIBUTION
+
+
+def test_draw():
+    distribution = LetterDistribution.from_text("tea\neat\n")
+
+    tiles = distribution.draw(25)
+
+    assert len(tiles) == 25
+    assert set(tiles) <= {"t", "e", "a"}
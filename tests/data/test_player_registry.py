@@ -0,0 +1,70 @@
+from application.data.player_registry import PlayerRegistry, PlayerSession, get_player_id, is_valid_player_token
+
+PLAYER_TOKEN = "aVeryRandomPlayerToken_1"
+
+
+def test_same_token_is_same_player():
+    player_registry = PlayerRegistry()
+
+    first_player_id, first_issued_token = player_registry.identify("sid1", PLAYER_TOKEN)
+    # The player reconnects, possibly to another worker with its own registry
+    second_player_id, second_issued_token = PlayerRegistry().identify("sid2", PLAYER_TOKEN)
+
+    assert first_player_id == second_player_id == get_player_id(PLAYER_TOKEN)
+    assert first_issued_token is None
+    assert second_issued_token is None
+
+
+def test_player_id_does_not_reveal_token():
+    player_id, _ = PlayerRegistry().identify("sid1", PLAYER_TOKEN)
+
+    assert PLAYER_TOKEN not in player_id
+
+
+def test_players_sharing_an_address_are_told_apart():
+    player_registry = PlayerRegistry()
+
+    first_player_id, _ = player_registry.identify("sid1", "firstPlayerToken_123")
+    second_player_id, _ = player_registry.identify("sid2", "secondPlayerToken_123")
+
+    assert first_player_id != second_player_id
+
+
+def test_invalid_token_is_replaced():
+    player_registry = PlayerRegistry()
+
+    for player_token in [None, "", "short", "not a valid token!!", 12345, "x" * 65]:
+        player_id, issued_token = player_registry.identify("sid1", player_token)
+
+        assert is_valid_player_token(issued_token)
+        assert player_id == get_player_id(issued_token)
+
+
+def test_session_index():
+    player_registry = PlayerRegistry()
+    player_id, _ = player_registry.identify("sid1", PLAYER_TOKEN)
+
+    assert player_registry.get("sid1") == PlayerSession(player_id, None)
+    assert player_registry.join("sid1", "ROOM1") is None
+    assert player_registry.get("sid1") == PlayerSession(player_id, "ROOM1")
+    assert player_registry.get_player_id("sid1") == player_id
+
+    # Joining another room reports the room that was left
+    assert player_registry.join("sid1", "ROOM2") == "ROOM1"
+
+    # Identifying the session again keeps its room
+    player_registry.identify("sid1", PLAYER_TOKEN)
+    assert player_registry.get("sid1") == PlayerSession(player_id, "ROOM2")
+
+    assert player_registry.disconnect("sid1") == PlayerSession(player_id, "ROOM2")
+    assert player_registry.get("sid1") is None
+    assert player_registry.get_player_id("sid1") is None
+    assert player_registry.disconnect("sid1") is None
+    assert len(player_registry) == 0
+
+
+def test_join_unknown_session():
+    player_registry = PlayerRegistry()
+
+    assert player_registry.join("sid1", "ROOM1") is None
+    assert player_registry.get("sid1") is None
@@ -0,0 +1,159 @@
+import pytest
+
+from application.data.game_state import GameState
+from application.data.round_history import PlayerRound, RoundHistory, RoundSummary
+from tests.data.test_word_manager import TestWordManager
+
+TILES = list("saberjttsxzzzzzszzzzzzzzz")
+
+
+def _create_summary(round_id: str, tiles: str = "abcd", players=None) -> RoundSummary:
+    players = players if players is not None else [PlayerRound("player", ["bad", "cab"], 2, 5)]
+    return RoundSummary(
+        game_name="GAME",
+        round_id=round_id,
+        tiles=tiles,
+        rows=2,
+        columns=2,
+        scoring_type=0,
+        ended_at=1000,
+        board_word_count=10,
+        board_max_score=12,
+        words_found=len({word for player in players for word in player.words}),
+        players=players,
+    )
+
+
+def test_rounds_are_written_in_batches(tmp_path):
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"), batch_size=2)
+    for round_number in range(5):
+        round_history.record_round(_create_summary(f"round{round_number}"))
+    round_history.record_round(None)
+
+    # Nothing is written until the writer runs
+    assert len(round_history) == 5
+    assert round_history.get_player_history("player") == []
+
+    assert round_history.flush() == 5
+    assert len(round_history) == 0
+    assert round_history.rounds_written == 5
+    assert len(round_history.get_player_history("player")) == 5
+
+
+def test_failed_batches_stay_queued(tmp_path):
+    disk_full = True
+
+    def execute(function, *args):
+        if disk_full:
+            raise OSError("disk full")
+        return function(*args)
+
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"), execute=execute)
+    round_history.record_round(_create_summary("first"))
+
+    with pytest.raises(OSError):
+        round_history.flush()
+    assert len(round_history) == 1
+
+    disk_full = False
+    assert round_history.flush() == 1
+    assert len(round_history) == 0
+    assert len(round_history.get_player_history("player")) == 1
+
+
+def test_lookups_are_run_by_the_executor(tmp_path):
+    executed = []
+
+    def execute(function, *args):
+        executed.append(function.__name__)
+        return function(*args)
+
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"), execute=execute)
+    round_history.record_round(_create_summary("first"))
+    round_history.flush()
+    round_history.get_player_history("player")
+    round_history.get_board_stats("abcd")
+
+    assert executed == ["_write", "_select_player_history", "_select_board_stats"]
+
+
+def test_player_history_pages(tmp_path):
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"))
+    for round_number in range(5):
+        round_history.record_round(_create_summary(f"round{round_number}"))
+    round_history.record_round(_create_summary("other", players=[PlayerRound("other", ["dab"], 1, 1)]))
+    round_history.flush()
+
+    first_page = round_history.get_player_history("player", limit=3)
+    assert [entry["round_id"] for entry in first_page] == ["round4", "round3", "round2"]
+    assert first_page[0]["words"] == ["bad", "cab"]
+    assert first_page[0]["word_count"] == 2
+    assert first_page[0]["total_score"] == 5
+
+    second_page = round_history.get_player_history("player", limit=3, before_round_key=first_page[-1]["round_key"])
+    assert [entry["round_id"] for entry in second_page] == ["round1", "round0"]
+
+
+def test_board_stats(tmp_path):
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"))
+    round_history.record_round(_create_summary("first"))
+    round_history.record_round(
+        _create_summary("second", players=[PlayerRound("player", ["bad"], 1, 6), PlayerRound("other", [], 4, 4)])
+    )
+    round_history.record_round(_create_summary("another board", tiles="efgh"))
+    round_history.flush()
+
+    board_stats = round_history.get_board_stats("abcd")
+
+    assert board_stats["rounds"] == 2
+    assert board_stats["average_words_found"] == 1.5
+    assert board_stats["most_words_found"] == 2
+    assert board_stats["average_players"] == 1.5
+    assert board_stats["best_round_score"] == 4
+    assert round_history.get_board_stats("none")["rounds"] == 0
+
+
+def test_round_is_written_once(tmp_path):
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"))
+    round_history.record_round(_create_summary("round"))
+    round_history.record_round(_create_summary("round"))
+    round_history.flush()
+
+    assert len(round_history.get_player_history("player")) == 1
+
+
+def test_history_survives_restart(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    round_history = RoundHistory(path)
+    round_history.record_round(_create_summary("round"))
+    round_history.close()
+
+    assert len(RoundHistory(path).get_player_history("player")) == 1
+
+
+def test_finished_game_round(tmp_path):
+    round_history = RoundHistory(str(tmp_path / "history.sqlite3"))
+    game_state = GameState(
+        "GAME",
+        TestWordManager(),
+        list(TILES),
+        game_timer=False,
+        on_round_end=lambda ended: round_history.record_round(ended.get_round_summary()),
+    )
+    game_state.guess_word("player", "states")
+    game_state.guess_word("other", "set")
+
+    # A running round is not recorded
+    assert game_state.get_round_summary() is None
+
+    game_state.end_game()
+    round_history.flush()
+
+    history = round_history.get_player_history("player")
+    assert len(history) == 1
+    assert history[0]["round_id"] == game_state.round_id
+    assert history[0]["tiles"] == "".join(TILES)
+    assert history[0]["words"] == ["states"]
+    assert history[0]["round_score"] == 3
+    assert history[0]["total_score"] == 3
+    assert round_history.get_board_stats("".join(TILES))["rounds"] == 1
@@ -0,0 +1,107 @@
+import random
+
+from application.data.board_solver import BoardSolution
+from application.data.round_scorer import RoundScorer
+from application.data.scoring import Scoring
+from application.data.scoring_type import ScoringType
+
+
+class TestRoundScorer:
+    def test_classic_shared_word_is_worthless(self):
+        round_scorer = RoundScorer(ScoringType.CLASSIC)
+        round_scorer.add_guess("first", "states")
+        assert round_scorer.get_round_score("first") == 3
+
+        round_scorer.add_guess("second", "states")
+        assert round_scorer.get_round_score("first") == 0
+        assert round_scorer.get_round_score("second") == 0
+
+    def test_add_guess_twice(self):
+        round_scorer = RoundScorer(ScoringType.CLASSIC)
+        assert round_scorer.add_guess("player", "set")
+        assert not round_scorer.add_guess("player", "set")
+        assert round_scorer.get_round_score("player") == 1
+        assert round_scorer.get_guesser_count("set") == 1
+
+    def test_distributed_new_player_revalues_words_everyone_guessed(self):
+        round_scorer = RoundScorer(ScoringType.DISTRIBUTED_INTEGER)
+        round_scorer.add_guess("first", "saber")
+        round_scorer.add_guess("second", "saber")
+        assert round_scorer.get_round_score("first") == 0
+
+        # A third player makes "saber" no longer guessed by everyone
+        round_scorer.add_guess("third", "set")
+        assert round_scorer.get_round_score("first") == 1
+        assert round_scorer.get_round_score("second") == 1
+        assert round_scorer.get_round_score("third") == 1
+
+    def test_matches_scoring_from_scratch(self):
+        rng = random.Random(7)
+        words = ["a" * length for length in range(3, 11)] + ["b" * length for length in range(3, 11)]
+        players = [f"player-{index}" for index in range(6)]
+
+        for scoring_type in ScoringType:
+            round_scorer = RoundScorer(scoring_type)
+            for _ in range(60):
+                round_scorer.add_guess(rng.choice(players), rng.choice(words))
+
+                total_players = round_scorer.total_players
+                for player_id, player_words in round_scorer.player_words.items():
+                    expected = sum(
+                        Scoring.get_word_value(scoring_type, word, round_scorer.get_guesser_count(word), total_players)
+                        for word in player_words
+                    )
+                    assert round_scorer.get_round_score(player_id) == round(expected, 2)
+
+    def test_add_player_words_matches_adding_guesses(self):
+        rng = random.Random(11)
+        words = ["a" * length for length in range(3, 11)] + ["b" * length for length in range(3, 11)]
+        players = [f"player-{index}" for index in range(6)]
+
+        for scoring_type in ScoringType:
+            round_scorer = RoundScorer(scoring_type)
+            guess_log = {}
+            for _ in range(60):
+                player_id, word = rng.choice(players), rng.choice(words)
+                if round_scorer.add_guess(player_id, word):
+                    guess_log.setdefault(player_id, []).append(word)
+
+            restored = RoundScorer(scoring_type)
+            restored.add_player_words(guess_log)
+
+            assert restored.player_words == round_scorer.player_words
+            for word in words:
+                assert restored.get_word_value(word) == round_scorer.get_word_value(word)
+            for player_id in players:
+                assert restored.get_round_score(player_id) == round_scorer.get_round_score(player_id)
+
+            # Guesses added afterwards are scored as usual
+            round_scorer.add_guess("late", "aaa")
+            restored.add_guess("late", "aaa")
+            for player_id in players + ["late"]:
+                assert restored.get_round_score(player_id) == round_scorer.get_round_score(player_id)
+
+    def test_words_are_interned_to_solution_word_ids(self):
+        solution = BoardSolution({"set": [0, 1, 2], "states": [0, 1, 2, 3, 4, 5], "bats": [6, 7, 8, 9]})
+        round_scorer = RoundScorer(ScoringType.CLASSIC, solution)
+        round_scorer.add_guess("player", "states")
+        round_scorer.add_guess("player", "set")
+        round_scorer.add_guess("other", "set")
+
+        assert round_scorer.words is solution.words
+        assert round_scorer.player_guesses == [0b011, 0b001]
+        assert round_scorer.get_player_words("player") == ["states", "set"]
+        assert round_scorer.get_word_count("other") == 1
+        assert round_scorer.has_guessed("other", "set")
+        assert not round_scorer.has_guessed("other", "states")
+        assert not round_scorer.has_guessed("nobody", "set")
+        assert round_scorer.round_scores == {"player": 3, "other": 0}
+        assert round_scorer.words_found == 2
+
+        # A word that is not in the solution gets its own word ID without changing the solution
+        round_scorer.add_guess("other", "sabers")
+        assert round_scorer.word_ids["sabers"] == 3
+        assert "sabers" not in solution
+        assert solution.words == ["set", "states", "bats"]
+        assert round_scorer.get_player_words("other") == ["set", "sabers"]
+        assert round_scorer.get_round_score("other") == 3
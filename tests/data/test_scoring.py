@@ -1,3 +1,7 @@
+import random
+
+import numpy
+
 from application.data.scoring import Scoring
 from application.data.scoring_type import ScoringType
 
@@ -33,3 +37,39 @@ class TestScoring:
         assert 2 == Scoring.get_word_value(ScoringType.DISTRIBUTED_INTEGER, "a" * 7, 2, 4)
         assert 1 == Scoring.get_word_value(ScoringType.DISTRIBUTED_INTEGER, "a" * 7, 3, 4)
         assert 0 == Scoring.get_word_value(ScoringType.DISTRIBUTED_INTEGER, "a" * 7, 4, 4)
+
+    def test_value_table_matches_get_word_value(self):
+        for scoring_type in ScoringType:
+            table = Scoring.get_value_table(scoring_type, 600)
+            for word_length in range(1, 15):
+                for guessers in range(1, 601):
+                    expected = Scoring.get_word_value(scoring_type, "a" * word_length, guessers, 1000)
+                    assert table[min(word_length, 9), guessers] == expected
+
+    def test_score_room_matches_scoring_each_word(self):
+        rng = random.Random(3)
+        words = ["a" * length for length in range(3, 13)]
+        total_players = 500
+        guesses = sorted(
+            {(rng.randrange(total_players), rng.randrange(len(words))) for _ in range(2000)}
+            | {(player, 0) for player in range(total_players)}
+        )
+        guess_players = numpy.array([player for player, _ in guesses])
+        guess_words = numpy.array([word_id for _, word_id in guesses])
+        word_lengths = numpy.array([len(word) for word in words])
+
+        for scoring_type in ScoringType:
+            word_values, player_scores = Scoring.score_room(
+                scoring_type, word_lengths, guess_players, guess_words, total_players
+            )
+
+            guesser_counts = numpy.bincount(guess_words, minlength=len(words))
+            expected_scores = [0] * total_players
+            for word_id, word in enumerate(words):
+                expected = Scoring.get_word_value(scoring_type, word, guesser_counts[word_id], total_players)
+                assert word_values[word_id] == expected
+            for player, word_id in guesses:
+                expected_scores[player] += word_values[word_id]
+            # The word every player guessed is worth nothing
+            assert word_values[0] == 0
+            assert numpy.allclose(player_scores, expected_scores)
@@ -0,0 +1,218 @@
+import pytest
+
+from application.data.game_manager import GameManager
+from application.data.state_backend import MemoryStateBackend, RedisStateBackend, StateBackend
+from application.util.scheduler import Scheduler
+from tests.data.test_word_manager import TestWordManager
+
+TILES = [
+    "s", "a", "b", "e", "r",
+    "j", "t", "t", "s", "x",
+    "z", "z", "z", "z", "z",
+    "s", "z", "z", "z", "z",
+    "z", "z", "z", "z", "z"
+]
+
+
+class FakeRedis:
+    """
+    Stands in for a redis-py client created with decode_responses=True, supporting the commands the backend uses.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.data.setdefault(key, {})
+        if mapping:
+            values.update({name: str(item) for name, item in mapping.items()})
+        if field is not None:
+            values[field] = str(value)
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hdel(self, key, field):
+        self.data.get(key, {}).pop(field, None)
+
+    def hincrbyfloat(self, key, field, amount):
+        values = self.data.setdefault(key, {})
+        values[field] = str(float(values.get(field, 0)) + amount)
+
+    def sadd(self, key, member):
+        members = self.data.setdefault(key, set())
+        if member in members:
+            return 0
+        members.add(member)
+        return 1
+
+    def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(values)
+        return len(items)
+
+    def lrange(self, key, start, end):
+        stop = None if end == -1 else end + 1
+        return list(self.data.get(key, [])[start:stop])
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+
+        return queue
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryStateBackend(shared=True)
+    return RedisStateBackend(FakeRedis(), idle_ttl_seconds=60)
+
+
+class TestStateBackend:
+    @pytest.fixture(autouse=True)
+    def setup_workers(self, backend):
+        self.now = 0
+        word_manager = TestWordManager()
+
+        # Two workers sharing one backend, each with its own scheduler
+        self.first_worker = GameManager(word_manager, scheduler=Scheduler(lambda: self.now), backend=backend)
+        self.second_worker = GameManager(word_manager, scheduler=Scheduler(lambda: self.now), backend=backend)
+
+        self.first_worker.create_game_for_name("GAME").new_board(list(TILES))
+
+    def test_game_is_loaded_by_other_worker(self):
+        game_state = self.second_worker.get_game_state("GAME")
+        assert game_state.game_tiles == TILES
+        assert game_state.round_id == self.first_worker.get_game_state("GAME").round_id
+
+    def test_new_round_is_seen_by_other_worker(self):
+        self.second_worker.get_game_state("GAME")
+        self.first_worker.get_game_state("GAME").new_board(["a"] * 25)
+
+        assert self.second_worker.get_game_state("GAME").game_tiles == ["a"] * 25
+
+    def test_guess_through_both_workers(self):
+        assert self.first_worker.get_game_state("GAME").guess_word("player", "set") is not None
+        assert self.second_worker.get_game_state("GAME").guess_word("player", "set") is None
+        assert self.second_worker.get_game_state("GAME").guess_word("other", "states") is not None
+
+    def test_guess_words_through_both_workers(self):
+        self.first_worker.get_game_state("GAME").guess_word("player", "set")
+        word_paths = self.second_worker.get_game_state("GAME").guess_words("player", ["set", "states"])
+
+        assert word_paths[0] is None
+        assert word_paths[1] is not None
+
+    def test_guesses_keep_their_order(self, backend):
+        first_game = self.first_worker.get_game_state("GAME")
+        second_game = self.second_worker.get_game_state("GAME")
+        first_game.guess_words("player", ["states", "set"])
+        second_game.guess_word("player", "bats")
+        second_game.guess_word("player", "set")
+        first_game.guess_word("other", "saber")
+
+        expected = [("player", "states"), ("player", "set"), ("player", "bats"), ("other", "saber")]
+        assert backend.get_guesses("GAME", first_game.round_id) == expected
+
+    def test_round_is_scored_once_from_every_worker(self):
+        first_game = self.first_worker.get_game_state("GAME")
+        second_game = self.second_worker.get_game_state("GAME")
+        first_game.guess_word("player", "states")
+        second_game.guess_word("other", "states")
+        second_game.guess_word("other", "set")
+
+        ended_games = []
+        self.first_worker.add_round_end_listener(ended_games.append)
+        self.second_worker.add_round_end_listener(ended_games.append)
+        self.now = first_game.expire_time
+        self.first_worker.scheduler.run_due()
+        self.second_worker.scheduler.run_due()
+
+        assert len(ended_games) == 1
+        assert first_game.get_score_state("other")["scored_words"] == ["set"]
+        assert second_game.get_score_state("player")["unscored_words"] == ["states"]
+        assert first_game.get_scores() == {"player": 0, "other": 1}
+        assert second_game.get_game_state("other")["player_total_score"] == 1
+
+    def test_round_replaced_through_other_worker_is_not_ended(self):
+        first_game = self.first_worker.get_game_state("GAME")
+        first_game.guess_word("player", "states")
+        second_game = self.second_worker.get_game_state("GAME")
+        self.now = first_game.expire_time - 1
+        second_game.new_board(list(TILES))
+        second_game.guess_word("other", "set")
+
+        ended_games = []
+        self.first_worker.add_round_end_listener(ended_games.append)
+        self.second_worker.add_round_end_listener(ended_games.append)
+        self.now = first_game.expire_time
+        self.first_worker.scheduler.run_due()
+        self.second_worker.scheduler.run_due()
+
+        # The abandoned round is neither announced nor scored, and the new round is still running
+        assert ended_games == []
+        assert second_game.get_scores() == {}
+        assert self.first_worker.get_game_state("GAME").round_id == second_game.round_id
+        assert self.second_worker.get_game_state("GAME").game_running
+
+        self.now = second_game.expire_time
+        self.first_worker.scheduler.run_due()
+        self.second_worker.scheduler.run_due()
+        assert len(ended_games) == 1
+        assert second_game.get_scores() == {"other": 1}
+
+    def test_sessions_are_shared(self):
+        self.first_worker.get_game_state("GAME").add_session("first-session", "player")
+        self.second_worker.get_game_state("GAME").add_session("second-session", "other")
+        self.first_worker.remove_session("GAME", "first-session")
+
+        assert self.first_worker.get_game_state("GAME").get_sessions() == {"second-session": "other"}
+
+    def test_live_feed_counts_guesses_from_every_worker(self):
+        self.first_worker.create_game_for_name("LIVE", live_feed=True).new_board(list(TILES))
+        self.first_worker.get_game_state("LIVE").guess_word("player", "states")
+        self.second_worker.get_game_state("LIVE").guess_word("other", "set")
+
+        live_feed = self.second_worker.get_game_state("LIVE").get_live_feed()
+
+        assert self.second_worker.get_game_state("LIVE").live_feed
+        assert live_feed["words_found"] == 2
+        assert [entry["player_id"] for entry in live_feed["leaderboard"]] == ["player", "other"]
+
+
+def test_incomplete_backend_cannot_be_created():
+    class GameRecordsOnly(StateBackend):
+        def save_game(self, game_name, record):
+            pass
+
+    with pytest.raises(TypeError):
+        GameRecordsOnly()
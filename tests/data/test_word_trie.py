@@ -0,0 +1,56 @@
+import os
+
+from application.data.word_manager import WordManager
+from application.data.word_trie import WordTrie
+
+
+class TestWordTrie:
+    def setup_method(self):
+        self.trie = WordTrie.from_words(["set", "sets", "sat", "Saber", "stab", "best", "set", ""])
+
+    def test_is_word(self):
+        assert self.trie.is_word("set")
+        assert self.trie.is_word("sets")
+        assert self.trie.is_word("saber")
+        assert not self.trie.is_word("se")
+        assert not self.trie.is_word("bets")
+        assert not self.trie.is_word("")
+
+    def test_has_prefix(self):
+        assert self.trie.has_prefix("")
+        assert self.trie.has_prefix("sa")
+        assert self.trie.has_prefix("stab")
+        assert not self.trie.has_prefix("x")
+        assert not self.trie.has_prefix("stabs")
+
+    def test_words_with_prefix(self):
+        assert self.trie.words_with_prefix("s") == ["saber", "sat", "set", "sets", "stab"]
+        assert self.trie.words_with_prefix("se") == ["set", "sets"]
+        assert self.trie.words_with_prefix("s", limit=2) == ["saber", "sat"]
+        assert self.trie.words_with_prefix("q") == []
+
+    def test_word_count(self):
+        assert len(self.trie) == 6
+
+    def test_compile_and_load(self, tmp_path):
+        source = tmp_path / "words.txt"
+        source.write_text("apple\nApply\nbanana\n")
+        compiled = tmp_path / "words.trie"
+
+        WordTrie.compile_file(str(source), str(compiled))
+        trie = WordTrie.load(str(compiled))
+
+        assert trie.is_current(str(source))
+        assert trie.words_with_prefix("app") == ["apple", "apply"]
+        assert trie.is_word("banana")
+
+    def test_word_manager_recompiles_stale_file(self, tmp_path):
+        source = tmp_path / "words.txt"
+        source.write_text("apple\n")
+        assert WordManager(word_file=str(source)).is_word("Apple")
+
+        source.write_text("banana\n")
+        os.utime(source, ns=(0, 0))
+        word_manager = WordManager(word_file=str(source))
+        assert word_manager.is_word("banana")
+        assert not word_manager.is_word("apple")
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from application.util.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counter_render():
+    counter = Counter("guesses_total", "Guesses", ["result"])
+    counter.inc(label_values=("valid",))
+    counter.inc(2, label_values=("invalid",))
+    counter.inc(label_values=("valid",))
+
+    assert counter.render() == [
+        "# HELP guesses_total Guesses",
+        "# TYPE guesses_total counter",
+        'guesses_total{result="invalid"} 2',
+        'guesses_total{result="valid"} 2',
+    ]
+
+
+def test_unlabelled_metrics_start_at_zero():
+    assert Counter("events_total", "Events").render()[-1] == "events_total 0"
+    assert Gauge("rooms", "Rooms").render()[-1] == "rooms 0"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 5.65",
+        "latency_seconds_count 4",
+    ]
+    assert histogram.get_count() == 4
+
+
+def test_histogram_labels():
+    histogram = Histogram("event_seconds", "Events", ["event"], buckets=(1,))
+    histogram.observe(2, label_values=("guess",))
+
+    assert 'event_seconds_bucket{event="guess",le="+Inf"} 1' in histogram.render()
+    assert 'event_seconds_count{event="guess"} 1' in histogram.render()
+
+
+def test_label_values_are_escaped():
+    gauge = Gauge("rooms", "Rooms", ["name"])
+    gauge.set(1, label_values=('a "b"\\',))
+
+    assert gauge.render()[-1] == 'rooms{name="a \\"b\\"\\\\"} 1'
+
+
+def test_lock_is_created_on_first_use(monkeypatch):
+    counter = Counter("events_total", "Events")
+    # Stands in for eventlet patching threading between the metric's creation and its first use
+    monkeypatch.setattr(threading, "Lock", threading.RLock)
+    counter.inc()
+
+    assert isinstance(counter._lock, type(threading.RLock()))
+    assert counter.get() == 1
+
+
+def test_registry_render_includes_collectors():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events").inc()
+
+    def collect():
+        gauge = Gauge("rooms", "Rooms")
+        gauge.set(3)
+        return [gauge]
+
+    registry.register_collector("rooms", collect)
+    registry.register_collector("rooms", collect)
+
+    rendered = registry.render()
+    assert rendered.endswith("\n")
+    assert "events_total 1\n" in rendered
+    assert rendered.count("rooms 3\n") == 1
+
+
+def test_registry_rejects_duplicate_names():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events")
+
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events")
@@ -0,0 +1,75 @@
+import pytest
+
+from application.util.rate_limiter import ROOM_LIMIT, SESSION_LIMIT, RateLimit, RateLimiter
+
+
+class TestRateLimiter:
+    def setup_method(self):
+        self.now = 0.0
+        limits = {"guess": {SESSION_LIMIT: RateLimit(2, 3), ROOM_LIMIT: RateLimit(10, 5)}}
+        self.rate_limiter = RateLimiter(limits, clock=lambda: self.now)
+
+    def test_burst_then_rate(self):
+        assert [self.rate_limiter.check("guess", "session", "ROOM") for _ in range(4)] == [
+            None,
+            None,
+            None,
+            SESSION_LIMIT,
+        ]
+
+        # Two tokens are added each second
+        self.now = 0.5
+        assert self.rate_limiter.check("guess", "session", "ROOM") is None
+        assert self.rate_limiter.check("guess", "session", "ROOM") == SESSION_LIMIT
+
+        # The bucket never holds more than the burst
+        self.now = 60
+        assert [self.rate_limiter.check("guess", "session") for _ in range(4)][-1] == SESSION_LIMIT
+
+    def test_room_limit_is_shared_by_its_sessions(self):
+        results = [self.rate_limiter.check("guess", f"session-{index}", "ROOM") for index in range(6)]
+
+        assert results == [None] * 5 + [ROOM_LIMIT]
+        assert self.rate_limiter.check("guess", "other", "OTHER") is None
+
+    def test_sessions_over_their_limit_do_not_use_the_room_tokens(self):
+        for _ in range(10):
+            self.rate_limiter.check("guess", "bot", "ROOM")
+
+        # The bot took three of the room's five tokens before its own bucket ran out
+        assert [self.rate_limiter.check("guess", "player", "ROOM") for _ in range(3)] == [None, None, ROOM_LIMIT]
+
+    def test_events_take_their_cost_in_tokens(self):
+        assert self.rate_limiter.check("guess", "session", "ROOM", cost=2) is None
+        # A batch costing more than the tokens left takes none of them
+        assert self.rate_limiter.check("guess", "session", "ROOM", cost=2) == SESSION_LIMIT
+        assert self.rate_limiter.check("guess", "session", "ROOM") is None
+        assert self.rate_limiter.check("guess", "session", "ROOM") == SESSION_LIMIT
+
+        assert self.rate_limiter.check("guess", "other", "ROOM", cost=3) == ROOM_LIMIT
+
+    def test_events_without_limits_are_allowed(self):
+        assert all(self.rate_limiter.check("timer_expired", "session", "ROOM") is None for _ in range(100))
+
+    def test_prune_removes_refilled_buckets(self):
+        self.rate_limiter.check("guess", "idle", "ROOM")
+        self.now = 0.4
+        for _ in range(3):
+            self.rate_limiter.check("guess", "busy", "ROOM")
+
+        self.now = 0.9
+        assert self.rate_limiter.prune() == 2
+        assert list(self.rate_limiter.session_buckets["guess"].tokens) == ["busy"]
+        assert self.rate_limiter.check("guess", "busy", "ROOM") is None
+
+    def test_from_json_overrides_default_limits(self):
+        rate_limiter = RateLimiter.from_json(
+            '{"guess": {"session": [1, 1], "room": null}, "ping": {"session": [1, 2]}}'
+        )
+
+        assert rate_limiter.session_buckets["guess"].limit == RateLimit(1, 1)
+        assert "guess" not in rate_limiter.room_buckets
+        assert "new_game" in rate_limiter.room_buckets
+        assert rate_limiter.session_buckets["ping"].limit == RateLimit(1, 2)
+        with pytest.raises(ValueError):
+            RateLimiter.from_json('{"guess": {"player": [1, 1]}}')
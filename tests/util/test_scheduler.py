@@ -0,0 +1,53 @@
+from application.util.scheduler import Scheduler
+
+
+class TestScheduler:
+    def setup_method(self):
+        self.now = 0
+        self.fired = []
+        self.scheduler = Scheduler(clock=lambda: self.now)
+
+    def test_run_due_fires_in_deadline_order(self):
+        self.scheduler.schedule(200, lambda: self.fired.append("second"))
+        self.scheduler.schedule(100, lambda: self.fired.append("first"))
+        self.scheduler.schedule(300, lambda: self.fired.append("third"))
+
+        self.now = 250
+        assert self.scheduler.run_due() == 2
+        assert self.fired == ["first", "second"]
+        assert len(self.scheduler) == 1
+
+    def test_run_due_fires_once(self):
+        self.scheduler.schedule(100, lambda: self.fired.append("task"))
+
+        self.now = 100
+        self.scheduler.run_due()
+        self.scheduler.run_due()
+        assert self.fired == ["task"]
+
+    def test_cancel(self):
+        task = self.scheduler.schedule(100, lambda: self.fired.append("cancelled"))
+        self.scheduler.schedule(100, lambda: self.fired.append("kept"))
+        self.scheduler.cancel(task)
+        self.scheduler.cancel(task)
+
+        self.now = 100
+        assert self.scheduler.run_due() == 1
+        assert self.fired == ["kept"]
+        assert len(self.scheduler) == 0
+
+    def test_cancel_compacts(self):
+        tasks = [self.scheduler.schedule(deadline, lambda: None) for deadline in range(100)]
+        for task in tasks[:60]:
+            self.scheduler.cancel(task)
+
+        assert len(self.scheduler._heap) < 100
+        assert len(self.scheduler) == 40
+
+    def test_failing_task_does_not_stop_batch(self):
+        self.scheduler.schedule(100, lambda: 1 / 0)
+        self.scheduler.schedule(100, lambda: self.fired.append("task"))
+
+        self.now = 100
+        assert self.scheduler.run_due() == 2
+        assert self.fired == ["task"]
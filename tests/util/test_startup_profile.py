@@ -0,0 +1,30 @@
+from application.util.startup_profile import StartupProfile, get_memory_usage
+
+
+def test_phases_are_recorded():
+    startup_profile = StartupProfile()
+    with startup_profile.phase("first"):
+        pass
+    with startup_profile.phase("second"):
+        pass
+
+    phase_names = [phase.name for phase in startup_profile.phases]
+    assert phase_names[-2:] == ["first", "second"]
+    assert all(phase.seconds >= 0 for phase in startup_profile.phases)
+    assert all(phase.rss_bytes > 0 for phase in startup_profile.phases)
+    assert startup_profile.total_seconds == sum(phase.seconds for phase in startup_profile.phases)
+
+
+def test_disabled_profile_records_nothing():
+    startup_profile = StartupProfile(enabled=False)
+    with startup_profile.phase("first"):
+        pass
+
+    assert startup_profile.phases == []
+
+
+def test_memory_usage():
+    rss_bytes, private_bytes = get_memory_usage()
+
+    assert rss_bytes > 0
+    assert private_bytes is None or private_bytes > 0